@@ -0,0 +1,92 @@
+"""
+Compare le débit de ``date_utils.parse_date`` à l'ancienne version, qui
+passait chaque date par ``dateparser.parse``.
+
+Les dates sont générées comme dans un relevé : formats des parsers
+(jj/mm/aaaa, jj.mm.aa, jj.mm) et mêmes dates répétées sur plusieurs
+lignes. Le nouveau parse est mesuré cache vide puis cache chaud ; les
+résultats des deux versions sont comparés sur les dates avec année.
+
+Usage :
+    python benchmarks/bench_dates.py
+    python benchmarks/bench_dates.py --count 100000 --legacy-count 2000
+"""
+import argparse
+import os
+import random
+import sys
+import time
+from datetime import date, datetime
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_to_csv.utils import date_utils
+
+FORMATS = ("{d:02d}/{m:02d}/2024", "{d:02d}.{m:02d}.24", "{d:02d}.{m:02d}")
+
+
+def legacy_parse_date(date_str):
+    """``parse_date`` avant le chemin rapide"""
+    import dateparser
+
+    if len(date_str.split('/')) == 2:
+        date_str = f"{date_str}/{datetime.now().year}"
+    parsed = dateparser.parse(date_str, languages=['fr'], date_formats=['%d/%m/%Y', '%d-%m-%Y', '%m/%d/%Y'])
+    if not parsed:
+        raise ValueError(f"Format de date non reconnu: {date_str}")
+    return parsed
+
+
+def statement_dates(count, rng):
+    """Dates d'un relevé d'un an : une trentaine de transactions par date"""
+    dates = []
+    while len(dates) < count:
+        fmt = rng.choice(FORMATS)
+        value = fmt.format(d=rng.randint(1, 28), m=rng.randint(1, 12))
+        dates.extend([value] * rng.randint(1, 60))
+    return dates[:count]
+
+
+def throughput(parse, dates, **kwargs):
+    start = time.perf_counter()
+    for value in dates:
+        parse(value, **kwargs)
+    return len(dates) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000, help="dates pour parse_date")
+    parser.add_argument("--legacy-count", type=int, default=2000, help="dates pour l'ancienne version (lente)")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    dates = statement_dates(args.count, rng)
+    period = (date(2024, 1, 1), date(2024, 12, 31))
+
+    start = time.perf_counter()
+    import dateparser  # noqa: F401
+    import_time = time.perf_counter() - start
+
+    legacy = throughput(legacy_parse_date, dates[:args.legacy_count])
+    date_utils._parse_cached.cache_clear()
+    cold = throughput(date_utils.parse_date, dates, period=period)
+    warm = throughput(date_utils.parse_date, dates, period=period)
+
+    with_year = [value for value in set(dates) if value.count('/') == 2 or value.count('.') == 2]
+    mismatches = [value for value in with_year
+                  if legacy_parse_date(value) != date_utils.parse_date(value, period=period)]
+
+    print(f"Import de dateparser évité : {import_time * 1000:.0f} ms")
+    print(f"{'Version':<28} {'dates/s':>12} {'accélération':>13}")
+    print(f"{'dateparser (ancienne)':<28} {legacy:>12.0f} {'1.0x':>13}")
+    print(f"{'parse_date cache vide':<28} {cold:>12.0f} {cold / legacy:>12.0f}x")
+    print(f"{'parse_date cache chaud':<28} {warm:>12.0f} {warm / legacy:>12.0f}x")
+    print(f"Dates avec année différentes : {len(mismatches)}/{len(with_year)}")
+    if mismatches:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compare l'extraction de texte séquentielle et l'extraction parallèle.
+
+Les deux extractions utilisent le même moteur et ignorent le cache disque :
+sinon la seconde relirait le texte de la première.
+
+Usage :
+    python benchmarks/bench_extraction.py releve.pdf --workers 4
+    python benchmarks/bench_extraction.py releve.pdf --backend pdfplumber
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_to_csv.utils.backends import BACKENDS, select_backend
+from pdf_to_csv.utils.document import PdfDocument
+
+
+def time_extraction(pdf_path, workers, backend):
+    """Retourne (durée en secondes, texte par page) pour un nombre de workers"""
+    start = time.perf_counter()
+    with PdfDocument(pdf_path, workers=workers, disk_cache=None, backend=backend) as document:
+        texts = document.page_texts()
+    return time.perf_counter() - start, texts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("pdf_path")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--backend", choices=sorted(BACKENDS),
+                        help="Moteur d'extraction (défaut: le plus rapide installé)")
+    args = parser.parse_args()
+    backend = args.backend or select_backend()
+
+    serial_time, serial_texts = time_extraction(args.pdf_path, 1, backend)
+    parallel_time, parallel_texts = time_extraction(args.pdf_path, args.workers, backend)
+
+    if serial_texts != parallel_texts:
+        print("❌ Le texte extrait en parallèle diffère de l'extraction séquentielle")
+        return 1
+
+    print(f"Pages: {len(serial_texts)} (moteur {backend})")
+    print(f"Séquentiel: {serial_time:.2f} s")
+    print(f"Parallèle ({args.workers} workers): {parallel_time:.2f} s")
+    print(f"Accélération: x{serial_time / parallel_time:.2f}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
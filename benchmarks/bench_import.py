@@ -0,0 +1,81 @@
+"""
+Mesure le temps d'import des points d'entrée du convertisseur (``-X importtime``).
+
+Chaque module est importé dans un interpréteur neuf, comme au démarrage de
+la CLI ou d'un worker de conversion en lot. Le run échoue si un import
+dépasse le budget, ou s'il charge une dépendance lourde (OCR, pandas,
+dateparser...) qui ne devrait l'être qu'à la première utilisation.
+
+Usage :
+    python benchmarks/bench_import.py
+    python benchmarks/bench_import.py --budget-ms 100 --repeat 10
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Modules importés par une conversion de PDF texte
+ENTRY_POINTS = ("pdf_to_csv.cli", "pdf_to_csv.bank_parsers", "pdf_to_csv.utils.export_utils")
+
+# Dépendances lourdes, chargées seulement pour l'OCR, les DataFrame,
+# le Parquet, l'Excel ou dateparser
+LAZY_MODULES = ("cv2", "numpy", "pandas", "pdf2image", "pytesseract", "pyarrow", "openpyxl",
+                "dateparser", "pdfplumber", "pypdf", "pypdfium2")
+
+DEFAULT_BUDGET_MS = 150.0
+DEFAULT_REPEAT = 5
+
+IMPORTTIME_LINE = re.compile(r'import time:\s*\d+ \|\s*(\d+) \|\s*(\S+)$')
+
+
+def import_time_ms(module: str) -> float:
+    """Temps cumulé d'import de ``module`` dans un interpréteur neuf (ms)"""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                            cwd=ROOT, capture_output=True, text=True, check=True)
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line.strip())
+        if match and match.group(2) == module:
+            return int(match.group(1)) / 1000
+    raise RuntimeError(f"Temps d'import de {module} introuvable")
+
+
+def loaded_lazy_modules(module: str):
+    """Dépendances lourdes présentes dans ``sys.modules`` après l'import de ``module``"""
+    code = (f"import sys, {module}; "
+            f"print(' '.join(m for m in {LAZY_MODULES!r} if m in sys.modules))")
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT,
+                            capture_output=True, text=True, check=True)
+    return result.stdout.split()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help="temps d'import maximal par module (meilleur des essais)")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--modules", nargs="+", default=list(ENTRY_POINTS))
+    args = parser.parse_args()
+
+    failures = []
+    print(f"{'Module':<34} {'import ms':>10} {'budget':>8}  dépendances lourdes")
+    for module in args.modules:
+        elapsed = min(import_time_ms(module) for _ in range(args.repeat))
+        loaded = loaded_lazy_modules(module)
+        status = "OK" if elapsed <= args.budget_ms else "DÉPASSÉ"
+        print(f"{module:<34} {elapsed:>10.1f} {status:>8}  {', '.join(loaded) or '-'}")
+        if elapsed > args.budget_ms:
+            failures.append(f"{module} : {elapsed:.1f} ms > {args.budget_ms:.0f} ms")
+        if loaded:
+            failures.append(f"{module} importe {', '.join(loaded)}")
+
+    if failures:
+        print("\n❌ " + "\n❌ ".join(failures))
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
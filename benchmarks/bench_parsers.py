@@ -0,0 +1,299 @@
+"""
+Mesure le débit (lignes/s) et le pic mémoire du parsing de chaque banque.
+
+Le texte des relevés est synthétique et généré de façon déterministe : le
+benchmark ne lit aucun PDF et tourne hors ligne.
+
+Le débit brut dépend de la machine et de sa charge du moment. Chaque run du
+parser est donc précédé d'une boucle de calibration (regex et dictionnaires,
+comme un parser, mais indépendante du code du dépôt) sur un texte de même
+taille dont chaque ligne est reconnue : son coût ne dépend pas du format de
+la banque. C'est le débit relatif à cette boucle qui est comparé à la
+baseline. Le run
+échoue si ce débit relatif baisse de plus de ``--max-regression`` pourcents,
+et si la baisse se confirme quand la mesure est refaite.
+
+Usage :
+    python benchmarks/bench_parsers.py                   # compare à la baseline
+    python benchmarks/bench_parsers.py --save-baseline   # enregistre la baseline
+    python benchmarks/bench_parsers.py --banks BNP LCL --sizes 1000 10000
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import re
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_to_csv.bank_parsers import PARSERS
+
+SIZES = (1000, 10000, 100000)
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline_parsers.json")
+DEFAULT_MAX_REGRESSION = 25.0
+
+# Lignes parsées au minimum par mesure : les petits textes sont parsés
+# plusieurs fois, une mesure de quelques millisecondes étant trop bruitée
+MIN_RUN_LINES = 50000
+
+# Mesures par défaut (paires calibration / parser) : la médiane de leurs rapports est retenue
+DEFAULT_REPEAT = 7
+
+# Motif de la boucle de calibration
+CALIBRATION_PATTERN = re.compile(r'^(\d{2}/\d{2}/\d{4})\s+(.+?)\s+(\d{1,3}(?:\.\d{3})*,\d{2})$')
+
+LABELS = ["CARTE X{n} MAGASIN", "PRLV SEPA ASSURANCE {n}", "VIR SEPA RECU CLIENT {n}",
+          "COMMISSION TENUE DE COMPTE", "REM CHQ {n}", "PAIEMENT CB RESTAURANT {n}"]
+
+
+def _amount(rng, thousands_sep):
+    """Montant au format français, milliers séparés par ``thousands_sep``"""
+    value = rng.randint(1, 999999)
+    euros, cents = divmod(value, 100)
+    groups = f"{euros:,}".replace(",", thousands_sep)
+    return f"{groups},{cents:02d}"
+
+
+def _label(rng, n):
+    return rng.choice(LABELS).format(n=n)
+
+
+def societe_generale_text(line_count, rng):
+    lines = ["SOCIETE GENERALE", "RELEVÉ DE COMPTE", "Date Valeur Nature de l'opération Débit Crédit"]
+    n = 0
+    while len(lines) < line_count:
+        n += 1
+        date = f"{n % 28 + 1:02d}/{n % 12 + 1:02d}/2024"
+        lines.append(f"{date} {date} {_label(rng, n)} {_amount(rng, '.')}")
+        lines.append(f"DETAIL OPERATION {n}")
+        if n % 40 == 0:
+            lines.append(f"Page {n // 40} / suite>>")
+    return "\n".join(lines[:line_count])
+
+
+def cic_text(line_count, rng):
+    lines = ["Banque CIC", "Date Date valeur Opération Débit Crédit"]
+    n = 0
+    while len(lines) < line_count:
+        n += 1
+        date = f"{n % 28 + 1:02d}/{n % 12 + 1:02d}/2024"
+        lines.append(f"{date} {date} {_label(rng, n)} {_amount(rng, '.')}")
+        lines.append(f"REF {n}")
+    return "\n".join(lines[:line_count])
+
+
+def credit_mutuel_text(line_count, rng):
+    lines = ["Crédit Mutuel", "Date Date valeur Opération Débit EUROS Crédit EUROS"]
+    n = 0
+    while len(lines) < line_count:
+        n += 1
+        date = f"{n % 28 + 1:02d}/{n % 12 + 1:02d}/2024"
+        lines.append(f"{date} {date} {_label(rng, n)} {_amount(rng, ' ')}")
+        lines.append(f"ICS : FR{n:08d} RUM : R{n}")
+        if n % 40 == 0:
+            lines.append("<<Suite au verso>>")
+    return "\n".join(lines[:line_count])
+
+
+def lcl_text(line_count, rng):
+    lines = ["LCL", "ECRITURES DE LA PERIODE"]
+    n = 0
+    while len(lines) < line_count:
+        n += 1
+        day = f"{n % 28 + 1:02d}.{n % 12 + 1:02d}"
+        credit = " ." if n % 4 == 0 else ""
+        lines.append(f"{day} {_label(rng, n)} {day}.24 {_amount(rng, ' ')}{credit}")
+        if n % 5 == 0:
+            lines.append(f"REF. {n:010d}")
+    return "\n".join(lines[:line_count])
+
+
+def bnp_text(line_count, rng):
+    sections = ["VIREMENTS RECUS", "PAIEMENTS PAR CARTES", "VIREMENTS EMIS",
+                "PRELEVEMENTS, AMORTISSEMENTS DE PRETS"]
+    lines = ["BNP PARIBAS", "RELEVE DE VOTRE COMPTE"]
+    n = 0
+    while len(lines) < line_count:
+        lines.append(sections[n // 50 % len(sections)])
+        for _ in range(50):
+            n += 1
+            date = f"{n % 28 + 1:02d}.{n % 12 + 1:02d}.24"
+            lines.append(f"{date} {_label(rng, n)} {date} {_amount(rng, ' ')}")
+            lines.append(f"REF {n}")
+        lines.append("Sous total...")
+    return "\n".join(lines[:line_count])
+
+
+GENERATORS = {
+    "SOCIETE_GENERALE": societe_generale_text,
+    "CIC": cic_text,
+    "CREDIT_MUTUEL": credit_mutuel_text,
+    "LCL": lcl_text,
+    "BNP": bnp_text,
+}
+
+
+def synthetic_text(bank, line_count):
+    """Texte de relevé synthétique, identique d'un run à l'autre"""
+    return GENERATORS[bank](line_count, random.Random(f"{bank}-{line_count}"))
+
+
+def calibration_text(line_count):
+    """Texte de la calibration : une transaction reconnue par ``CALIBRATION_PATTERN`` par ligne"""
+    rng = random.Random(f"calibration-{line_count}")
+    return [f"{n % 28 + 1:02d}/{n % 12 + 1:02d}/2024 {_label(rng, n)} {_amount(rng, '.')}"
+            for n in range(line_count)]
+
+
+def run_parser(bank, text):
+    # Aucun fichier n'est ouvert : le texte est parsé directement
+    parser = PARSERS[bank]("synthetic.pdf")
+    return parser._extract_from_text(text)
+
+
+def calibration(lines):
+    """Travail de référence, figé : regex et dictionnaires ligne à ligne, sur le texte mesuré"""
+    transactions = []
+    for line in lines:
+        match = CALIBRATION_PATTERN.match(line.strip())
+        if match:
+            date, label, amount = match.groups()
+            transactions.append({'DATE': date, 'LIBELLE': ' '.join(label.split()),
+                                 'MONTANT': amount.replace('.', '').replace(',', '.')})
+    return transactions
+
+
+def bench(bank, line_count, repeat):
+    """
+    Meilleur débit sur ``repeat`` runs et débit relatif à la calibration,
+    puis pic mémoire d'un run sous tracemalloc.
+
+    Calibration et parser sont mesurés en alternance ; le débit relatif est
+    la médiane des rapports de chaque paire, pour que les deux mesures d'un
+    rapport subissent la même charge de la machine.
+    """
+    text = synthetic_text(bank, line_count)
+    lines = calibration_text(line_count)
+    runs = max(1, MIN_RUN_LINES // line_count)
+    best = None
+    ratios = []
+    # Le ramasse-miettes se déclencherait à des moments différents dans la
+    # calibration et dans le parser : il est suspendu pendant les mesures
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(runs):
+                calibration(lines)
+            calibration_time = (time.perf_counter() - start) / runs
+            start = time.perf_counter()
+            for _ in range(runs):
+                transactions = run_parser(bank, text)
+            elapsed = (time.perf_counter() - start) / runs
+            best = elapsed if best is None else min(best, elapsed)
+            ratios.append(calibration_time / elapsed)
+    finally:
+        gc.enable()
+
+    tracemalloc.start()
+    run_parser(bank, text)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "lines_per_sec": line_count / best,
+        "relative": statistics.median(ratios),
+        "seconds": best,
+        "peak_mb": peak / (1024 * 1024),
+        "transactions": len(transactions),
+    }
+
+
+def machine():
+    return {"python": platform.python_version(), "machine": platform.machine(),
+            "processor": platform.processor() or platform.machine()}
+
+
+def compare(results, baseline, max_regression):
+    """Liste des régressions de débit relatif au-delà de ``max_regression`` pourcents"""
+    regressions = []
+    for key, result in results.items():
+        reference = baseline.get("results", {}).get(key)
+        if reference is None or "relative" not in reference:
+            continue
+        change = (result["relative"] / reference["relative"] - 1) * 100
+        result["change_pct"] = change
+        if change < -max_regression:
+            regressions.append((key, change))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--banks", nargs="+", choices=list(GENERATORS), default=list(GENERATORS))
+    parser.add_argument("--sizes", nargs="+", type=int, default=list(SIZES))
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT,
+                        help=f"Mesures par parser et taille (défaut: {DEFAULT_REPEAT})")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Enregistre les résultats comme nouvelle baseline")
+    parser.add_argument("--max-regression", type=float, default=DEFAULT_MAX_REGRESSION,
+                        help=f"Baisse de débit tolérée en %% (défaut: {DEFAULT_MAX_REGRESSION:g})")
+    args = parser.parse_args()
+
+    results = {}
+    for bank in args.banks:
+        for size in args.sizes:
+            results[f"{bank}/{size}"] = bench(bank, size, args.repeat)
+
+    baseline = {}
+    if not args.save_baseline and os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        if baseline.get("machine") != machine():
+            print(f"ℹ️ Baseline mesurée sur une autre machine ({baseline.get('machine')}) : "
+                  "seul le débit relatif à la calibration est comparé")
+    regressions = compare(results, baseline, args.max_regression)
+    if regressions:
+        # Un pic de charge peut fausser une mesure : seules les baisses
+        # retrouvées à la seconde mesure sont retenues
+        retry = {key: bench(key.split("/")[0], int(key.split("/")[1]), args.repeat)
+                 for key, _ in regressions}
+        confirmed = dict(compare(retry, baseline, args.max_regression))
+        regressions = [(key, max(change, confirmed[key])) for key, change in regressions
+                       if key in confirmed]
+
+    print(f"{'Parser/lignes':<26} {'lignes/s':>12} {'relatif':>8} {'durée':>9} {'pic Mo':>8} "
+          f"{'trans.':>7} {'écart':>8}")
+    for key, result in results.items():
+        change = f"{result['change_pct']:+.1f}%" if "change_pct" in result else "-"
+        print(f"{key:<26} {result['lines_per_sec']:>12,.0f} {result['relative']:>8.3f} "
+              f"{result['seconds']:>8.3f}s {result['peak_mb']:>8.2f} {result['transactions']:>7} {change:>8}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"machine": machine(), "results": results}, f, indent=2)
+            f.write("\n")
+        print(f"Baseline enregistrée dans {args.baseline}")
+        return 0
+
+    if not baseline:
+        print("Aucune baseline : lancer avec --save-baseline pour en créer une")
+        return 0
+    if regressions:
+        for key, change in regressions:
+            print(f"❌ Régression de débit {key} : {change:.1f}% (tolérance -{args.max_regression:g}%)")
+        return 1
+    print(f"✅ Aucune régression au-delà de {args.max_regression:g}%")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,138 @@
+"""
+Mesure la chaîne complète sur un corpus synthétique : vitesse et exactitude.
+
+Chaque PDF du corpus (voir corpus.py) passe par get_parser, l'extraction des
+pages, le parsing, le DataFrame et le CSV ; les transactions obtenues sont
+comparées à la vérité terrain ``<banque>.csv``. Les variantes scannées
+nécessitent Tesseract et poppler.
+
+Usage :
+    python benchmarks/corpus.py -o corpus/ --pages 20
+    python benchmarks/bench_pipeline.py corpus/
+    python benchmarks/bench_pipeline.py corpus/ --json resultats.json
+    python benchmarks/bench_pipeline.py corpus/ --layout    # mode colonnes
+    python benchmarks/bench_pipeline.py corpus/ --backend pdfplumber
+"""
+import argparse
+import csv
+import glob
+import json
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Le cache disque fausserait les mesures
+os.environ.setdefault("PDF_TO_CSV_CACHE", "0")
+
+from pdf_to_csv.bank_parsers import get_parser
+from pdf_to_csv.utils.backends import BACKENDS
+from pdf_to_csv.utils.export_utils import transactions_to_dataframe
+from pdf_to_csv.utils.metrics import collect_metrics, stage
+
+
+def _cents(value):
+    if value in (None, ""):
+        return 0
+    return round(float(value) * 100)
+
+
+def _key(transaction):
+    """Clé de comparaison : jour/mois (format propre à chaque banque) et montants"""
+    day_month = str(transaction.get("DATE") or "")[:5].replace(".", "/")
+    return day_month, _cents(transaction.get("DEBIT")), _cents(transaction.get("CREDIT"))
+
+
+def accuracy(parsed, truth):
+    """Rappel, précision et part des libellés exacts parmi les transactions retrouvées"""
+    expected = Counter(_key(t) for t in truth)
+    found = Counter(_key(t) for t in parsed)
+    matched = sum((expected & found).values())
+    labels = Counter((_key(t), t["LIBELLE"]) for t in truth) & \
+        Counter((_key(t), t.get("LIBELLE")) for t in parsed)
+    return {
+        "recall": matched / len(truth) if truth else 1.0,
+        "precision": matched / len(parsed) if parsed else 1.0,
+        "exact_labels": sum(labels.values()) / matched if matched else 0.0,
+    }
+
+
+def truth_path(pdf_path):
+    stem = os.path.splitext(pdf_path)[0]
+    if stem.endswith("_scanned"):
+        stem = stem[:-len("_scanned")]
+    return stem + ".csv"
+
+
+def run(pdf_path, layout=False, backend=None):
+    """Convertit un PDF comme l'application et retourne mesures et exactitude"""
+    with open(truth_path(pdf_path), encoding="utf-8") as f:
+        truth = list(csv.DictReader(f, delimiter=";"))
+
+    start = time.perf_counter()
+    with collect_metrics() as metrics:
+        parser = get_parser(pdf_path, layout=layout, backend=backend)
+        transactions = parser.extract_transactions()
+        df = transactions_to_dataframe(transactions)
+        with stage("csv", items=len(df)):
+            df.to_csv(sep=";", decimal=",", index=False)
+    duration = time.perf_counter() - start
+
+    pages = parser.document.page_count
+    return dict(
+        file=os.path.basename(pdf_path),
+        backend=parser.document.backend,
+        pages=pages,
+        transactions=len(transactions),
+        seconds=duration,
+        pages_per_sec=pages / duration,
+        ocr_pages=parser.document.ocr_page_count,
+        metrics=metrics.to_dict(),
+        **accuracy(transactions, truth),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("corpus_dir")
+    parser.add_argument("--no-scanned", action="store_true", help="Ignore les variantes scannées")
+    parser.add_argument("--layout", action="store_true",
+                        help="Extraction par position des colonnes")
+    parser.add_argument("--backend", choices=sorted(BACKENDS),
+                        help="Moteur d'extraction imposé (défaut: le plus rapide accepté)")
+    parser.add_argument("--json", metavar="FICHIER", help="Écrit les résultats détaillés en JSON")
+    args = parser.parse_args()
+
+    pdf_paths = sorted(glob.glob(os.path.join(args.corpus_dir, "*.pdf")))
+    if args.no_scanned:
+        pdf_paths = [p for p in pdf_paths if not p.endswith("_scanned.pdf")]
+    pdf_paths = [p for p in pdf_paths if os.path.exists(truth_path(p))]
+    if not pdf_paths:
+        print("Aucun PDF avec vérité terrain dans le corpus")
+        return 1
+
+    results = []
+    print(f"{'Fichier':<30} {'pages':>5} {'trans.':>6} {'durée':>8} {'pages/s':>8} "
+          f"{'rappel':>7} {'précis.':>7} {'libellés':>8}")
+    for pdf_path in pdf_paths:
+        try:
+            result = run(pdf_path, args.layout, args.backend)
+        except Exception as e:
+            print(f"{os.path.basename(pdf_path):<30} ❌ {e}")
+            results.append({"file": os.path.basename(pdf_path), "error": str(e)})
+            continue
+        results.append(result)
+        print(f"{result['file']:<30} {result['pages']:>5} {result['transactions']:>6} "
+              f"{result['seconds']:>7.2f}s {result['pages_per_sec']:>8.1f} "
+              f"{result['recall']:>7.1%} {result['precision']:>7.1%} {result['exact_labels']:>8.1%}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
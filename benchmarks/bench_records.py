@@ -0,0 +1,80 @@
+"""
+Compare la mémoire et le temps de conversion des transactions stockées en
+liste de dictionnaires et en ``TransactionTable``.
+
+Les transactions sont synthétiques (dates, libellés et montants répétés comme
+dans un relevé réel). Pour chaque taille, le benchmark mesure les octets
+alloués par transaction (tracemalloc), le temps de construction du stockage
+et celui du DataFrame d'export.
+
+Usage :
+    python benchmarks/bench_records.py
+    python benchmarks/bench_records.py --sizes 10000 100000 1000000
+"""
+import argparse
+import gc
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pdf_to_csv.utils.export_utils import transactions_to_dataframe
+from pdf_to_csv.utils.records import TransactionTable
+
+SIZES = (10000, 100000)
+
+LABELS = ["CARTE X{n} MAGASIN", "PRLV SEPA ASSURANCE", "VIR SEPA RECU CLIENT",
+          "COMMISSION TENUE DE COMPTE", "REM CHQ {n}", "PAIEMENT CB RESTAURANT"]
+
+
+def transactions(count, rng):
+    """Transactions au format des parsers, chaînes recréées à chaque ligne comme en sortie de regex"""
+    for n in range(count):
+        date = f"{n % 28 + 1:02d}/{n % 12 + 1:02d}/2024"
+        euros, cents = divmod(rng.randint(1, 999999), 100)
+        amount = f"{euros}.{cents:02d}"
+        debit = n % 3 != 0
+        yield {
+            "DATE": date,
+            "DATE_VALEUR": "".join(date),
+            "LIBELLE": rng.choice(LABELS).format(n=n % 500),
+            "DEBIT": amount if debit else None,
+            "CREDIT": None if debit else amount,
+        }
+
+
+def measure(build, count, seed):
+    """(octets par transaction, durée de construction, stockage)"""
+    rng = random.Random(seed)
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    storage = build(transactions(count, rng))
+    elapsed = time.perf_counter() - start
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return size / count, elapsed, storage
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'Stockage/transactions':<28} {'octets/tr.':>11} {'construction':>13} {'DataFrame':>10}")
+    for size in args.sizes:
+        for name, build in (("liste de dict", list), ("TransactionTable", TransactionTable)):
+            per_row, elapsed, storage = measure(build, size, args.seed)
+            start = time.perf_counter()
+            transactions_to_dataframe(storage)
+            to_df = time.perf_counter() - start
+            print(f"{name + '/' + str(size):<28} {per_row:>11.0f} {elapsed:>12.3f}s {to_df:>9.3f}s")
+            del storage
+
+
+if __name__ == "__main__":
+    main()
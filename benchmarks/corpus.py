@@ -0,0 +1,371 @@
+"""
+Génère un corpus de relevés PDF synthétiques pour les tests de bout en bout.
+
+Pour chaque banque (mise en page propre à chaque établissement) :
+    <banque>.pdf          relevé avec couche texte
+    <banque>_scanned.pdf  même relevé, pages rastérisées (aucune couche texte)
+    <banque>.csv          vérité terrain : transactions réellement imprimées
+
+Aucune donnée client : libellés et montants sont tirés au hasard avec une
+graine fixe, le corpus est identique d'une génération à l'autre. Les PDF
+texte sont écrits directement (police Helvetica standard) et les variantes
+scannées rendues avec Pillow, déjà installé avec pdfplumber.
+
+Usage :
+    python benchmarks/corpus.py -o corpus/ --pages 10 --per-page 30
+    python benchmarks/corpus.py -o corpus/ --banks BNP LCL --no-scanned
+"""
+import argparse
+import csv
+import datetime
+import os
+import random
+import zlib
+from typing import Dict, List, Tuple
+
+# Format A4 en points
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842
+FONT_SIZE = 8
+LINE_HEIGHT = 11
+TOP_MARGIN = 60
+BOTTOM_MARGIN = 60
+
+SCAN_DPI = 200
+
+BANKS = ("SOCIETE_GENERALE", "CIC", "CREDIT_MUTUEL", "LCL", "BNP")
+
+# Libellés : jamais terminés par un nombre, qui se confondrait avec un
+# montant à milliers séparés par des espaces
+DEBIT_LABELS = ["CARTE X{n} SUPERMARCHE CENTRE", "PRLV SEPA ASSURANCE HABITATION",
+                "PAIEMENT CB RESTAURANT DU PORT", "FACTURE TELEPHONE MOBILE",
+                "CHEQUE N{n} EMIS", "COMMISSION TENUE DE COMPTE"]
+CREDIT_LABELS = ["VIR SEPA RECU CLIENT {n} DUPONT", "REM CHQ {n} BORDEREAU",
+                 "VIR INST RECU SALAIRE", "REMBOURST SINISTRE ASSURANCE"]
+DETAILS = ["REF {n} FACTURE MENSUELLE", "MOTIF LOYER ET CHARGES", "DE M. MARTIN PAUL"]
+
+# Page = liste de (x, y, texte) ; y mesuré depuis le bas de la page (repère PDF)
+Page = List[Tuple[float, float, str]]
+
+
+def make_transactions(count: int, seed: str, start: datetime.date = datetime.date(2024, 1, 2)) -> List[Dict]:
+    """Transactions synthétiques triées par date, reproductibles pour une graine donnée"""
+    rng = random.Random(seed)
+    transactions = []
+    date = start
+    for n in range(1, count + 1):
+        date += datetime.timedelta(days=rng.random() < 0.3)
+        credit = rng.random() < 0.3
+        label = rng.choice(CREDIT_LABELS if credit else DEBIT_LABELS).format(n=n)
+        detail = rng.choice(DETAILS).format(n=n) if rng.random() < 0.4 else None
+        transactions.append({
+            "date": date,
+            "value_date": date + datetime.timedelta(days=rng.choice((0, 0, 1, 2))),
+            "label": label,
+            "detail": detail,
+            "cents": rng.randint(100, 250000 if credit else 80000),
+            "credit": credit,
+        })
+    return transactions
+
+
+def _amount(cents: int, thousands_sep: str) -> str:
+    """Montant au format français, milliers séparés par ``thousands_sep``"""
+    euros, rest = divmod(cents, 100)
+    return f"{euros:,}".replace(",", thousands_sep) + f",{rest:02d}"
+
+
+def _dotted(date: datetime.date) -> str:
+    return f"{date:%d.%m.%y}"
+
+
+# --- Mises en page par banque ---
+# Chaque banque fournit son en-tête de première page, l'en-tête de colonnes
+# répété sur chaque page, le pied de page, les cellules d'une transaction et
+# la position des lignes de détail du libellé.
+
+def _slashed_row(t, thousands_sep):
+    amount_x = 510 if t["credit"] else 440
+    return [(40, f"{t['date']:%d/%m/%Y}"), (95, f"{t['value_date']:%d/%m/%Y}"),
+            (150, t["label"]), (amount_x, _amount(t["cents"], thousands_sep))]
+
+
+LAYOUTS = {
+    "SOCIETE_GENERALE": {
+        "first_header": ["SOCIETE GENERALE", "RELEVÉ DE COMPTE COURANT",
+                         "du 01/01/2024 au 31/12/2024 - envoi n°12"],
+        "columns": [(40, "Date"), (95, "Valeur"), (150, "Nature de l'opération"),
+                    (440, "Débit"), (510, "Crédit")],
+        "footer": "RELEVÉ DE COMPTE - Page {page}/{pages}",
+        "row": lambda t: _slashed_row(t, "."),
+        "label_x": 150,
+        "multiline": True,
+    },
+    "CIC": {
+        "first_header": ["Banque CIC", "EXTRAIT DE COMPTE COURANT"],
+        "columns": [(40, "Date"), (95, "Date valeur"), (150, "Opération"),
+                    (440, "Débit EUROS"), (510, "Crédit EUROS")],
+        "footer": None,
+        "row": lambda t: _slashed_row(t, "."),
+        "label_x": 150,
+        "multiline": True,
+    },
+    "CREDIT_MUTUEL": {
+        "first_header": ["Crédit Mutuel", "EXTRAIT DE COMPTE COURANT"],
+        "columns": [(40, "Date"), (95, "Date valeur"), (150, "Opération"),
+                    (440, "Débit EUROS"), (510, "Crédit EUROS")],
+        "footer": "<<Suite au verso>>",
+        "row": lambda t: _slashed_row(t, " "),
+        "label_x": 150,
+        "multiline": True,
+    },
+    "LCL": {
+        "first_header": ["LCL - LE CREDIT LYONNAIS", "RELEVE DE COMPTE COURANT",
+                         "ECRITURES DE LA PERIODE"],
+        "columns": [(40, "DATE"), (80, "LIBELLE"), (380, "VALEUR"), (440, "DEBIT"), (510, "CREDIT")],
+        "footer": "Page {page} / {pages}",
+        # Les crédits LCL sont suivis d'un point dans la colonne crédit
+        "row": lambda t: [(40, f"{t['date']:%d.%m}"), (80, t["label"]),
+                          (380, _dotted(t["value_date"])),
+                          (510, _amount(t["cents"], " ") + " .") if t["credit"]
+                          else (440, _amount(t["cents"], " "))],
+        "label_x": 80,
+        "multiline": False,
+    },
+    "BNP": {
+        "first_header": ["BNP PARIBAS", "RELEVE DE VOTRE COMPTE CHEQUES",
+                         "PERIODE DU 01.01.2024 AU 31.12.2024"],
+        "columns": [(40, "DATE COMPTABLE"), (120, "NATURE DES OPERATIONS"),
+                    (380, "DATE DE VALEUR"), (450, "DEBIT"), (515, "CREDIT")],
+        "footer": "BNP PARIBAS SA - Page {page}/{pages}",
+        "row": lambda t: [(40, _dotted(t["date"])), (120, t["label"]),
+                          (380, _dotted(t["value_date"])),
+                          (515 if t["credit"] else 450, _amount(t["cents"], " "))],
+        "label_x": 120,
+        "multiline": True,
+    },
+}
+
+# Sections BNP : le sens du montant dépend de la section
+BNP_CREDIT_SECTION = "VIREMENTS RECUS"
+BNP_DEBIT_SECTION = "PAIEMENTS PAR CARTES"
+
+
+def _statement_lines(bank: str, transactions: List[Dict]) -> List[List[Tuple[float, str]]]:
+    """Lignes du corps du relevé (cellules par ligne), hors en-têtes et pieds de page"""
+    layout = LAYOUTS[bank]
+    rows = []
+
+    def add(transaction):
+        rows.append(layout["row"](transaction))
+        if layout["multiline"] and transaction["detail"]:
+            rows.append([(layout["label_x"], transaction["detail"])])
+
+    if bank != "BNP":
+        for transaction in transactions:
+            add(transaction)
+        return rows
+
+    # BNP : opérations regroupées par section et par bloc de 20, comme sur
+    # plusieurs pages de relevé
+    for start in range(0, len(transactions), 20):
+        block = transactions[start:start + 20]
+        for section, credit in ((BNP_CREDIT_SECTION, True), (BNP_DEBIT_SECTION, False)):
+            items = [t for t in block if t["credit"] == credit]
+            if not items:
+                continue
+            rows.append([(40, section)])
+            for transaction in items:
+                add(transaction)
+            rows.append([(40, "Sous total...")])
+    return rows
+
+
+def _truth_order(bank: str, transactions: List[Dict]) -> List[Dict]:
+    """Transactions dans l'ordre où elles sont imprimées"""
+    if bank != "BNP":
+        return transactions
+    ordered = []
+    for start in range(0, len(transactions), 20):
+        block = transactions[start:start + 20]
+        ordered += [t for t in block if t["credit"]] + [t for t in block if not t["credit"]]
+    return ordered
+
+
+def layout_pages(bank: str, transactions: List[Dict], per_page: int) -> List[Page]:
+    """Découpe le relevé en pages d'au plus ``per_page`` lignes de corps"""
+    layout = LAYOUTS[bank]
+    body = _statement_lines(bank, transactions)
+    chunks = [body[i:i + per_page] for i in range(0, len(body), per_page)] or [[]]
+    pages = []
+    for number, chunk in enumerate(chunks, start=1):
+        page: Page = []
+        y = PAGE_HEIGHT - TOP_MARGIN
+        if number == 1:
+            for text in layout["first_header"]:
+                page.append((40, y, text))
+                y -= LINE_HEIGHT
+            y -= LINE_HEIGHT
+        page += [(x, y, text) for x, text in layout["columns"]]
+        y -= LINE_HEIGHT * 1.5
+        for cells in chunk:
+            page += [(x, y, text) for x, text in cells]
+            y -= LINE_HEIGHT
+        if layout["footer"]:
+            page.append((40, BOTTOM_MARGIN / 2, layout["footer"].format(page=number, pages=len(chunks))))
+        pages.append(page)
+    return pages
+
+
+def truth_rows(bank: str, transactions: List[Dict]) -> List[Dict]:
+    """Vérité terrain : une ligne par transaction imprimée, montants au format décimal"""
+    rows = []
+    for t in _truth_order(bank, transactions):
+        label = t["label"]
+        if LAYOUTS[bank]["multiline"] and t["detail"]:
+            label += " " + t["detail"]
+        amount = f"{t['cents'] // 100}.{t['cents'] % 100:02d}"
+        rows.append({
+            "DATE": f"{t['date']:%d/%m/%Y}",
+            "DATE_VALEUR": f"{t['value_date']:%d/%m/%Y}",
+            "LIBELLE": label,
+            "DEBIT": "" if t["credit"] else amount,
+            "CREDIT": amount if t["credit"] else "",
+        })
+    return rows
+
+
+def _pdf_string(text: str) -> bytes:
+    data = text.encode("cp1252", errors="replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def write_text_pdf(pages: List[Page], path: str):
+    """Écrit un PDF minimal avec couche texte (Helvetica, encodage WinAnsi)"""
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # arbre des pages, complété une fois les pages numérotées
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+    page_ids = []
+    for page in pages:
+        content = b"".join(
+            b"BT /F1 %d Tf %.2f %.2f Td %s Tj ET\n" % (FONT_SIZE, x, y, _pdf_string(text))
+            for x, y, text in page
+        )
+        stream = zlib.compress(content)
+        objects.append(b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % len(stream)
+                       + stream + b"\nendstream")
+        objects.append(b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %d %d] "
+                       b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>"
+                       % (PAGE_WIDTH, PAGE_HEIGHT, len(objects)))
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        offsets = []
+        for number, body in enumerate(objects, start=1):
+            offsets.append(f.tell())
+            f.write(b"%d 0 obj\n" % number + body + b"\nendobj\n")
+        xref = f.tell()
+        f.write(b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1))
+        for offset in offsets:
+            f.write(b"%010d 00000 n \n" % offset)
+        f.write(b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+                % (len(objects) + 1, xref))
+
+
+def _scan_font(dpi: int):
+    from PIL import ImageFont
+
+    size = max(8, round(FONT_SIZE * dpi / 72))
+    for name in ("DejaVuSans.ttf", "Arial.ttf", "LiberationSans-Regular.ttf"):
+        try:
+            return ImageFont.truetype(name, size)
+        except OSError:
+            pass
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:
+        # Pillow < 10.1 : police bitmap de taille fixe
+        return ImageFont.load_default()
+
+
+def write_scanned_pdf(pages: List[Page], path: str, dpi: int = SCAN_DPI):
+    """Écrit la variante scannée : une image en niveaux de gris par page, sans couche texte"""
+    from PIL import Image, ImageDraw
+
+    scale = dpi / 72
+    font = _scan_font(dpi)
+    images = []
+    for page in pages:
+        image = Image.new("L", (round(PAGE_WIDTH * scale), round(PAGE_HEIGHT * scale)), 255)
+        draw = ImageDraw.Draw(image)
+        for x, y, text in page:
+            draw.text((x * scale, (PAGE_HEIGHT - y - FONT_SIZE) * scale), text, fill=0, font=font)
+        images.append(image)
+    images[0].save(path, "PDF", resolution=dpi, save_all=True, append_images=images[1:])
+
+
+def write_truth_csv(rows: List[Dict], path: str):
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["DATE", "DATE_VALEUR", "LIBELLE", "DEBIT", "CREDIT"],
+                                delimiter=";", lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def generate(output_dir: str, banks=BANKS, pages: int = 3, per_page: int = 30,
+             scanned: bool = True, dpi: int = SCAN_DPI) -> List[str]:
+    """
+    Génère le corpus dans ``output_dir``.
+
+    ``per_page`` est le nombre de lignes d'opérations par page : le nombre de
+    transactions est le plus grand qui tient sur ``pages`` pages.
+
+    :return: Chemins des PDF générés
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for bank in banks:
+        # Plus grand nombre de transactions tenant sur ``pages`` pages (lignes
+        # de détail et en-têtes de section BNP comprises)
+        candidates = make_transactions(pages * per_page, seed=f"{bank}-{pages}-{per_page}")
+        low, high = 1, len(candidates)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if len(layout_pages(bank, candidates[:middle], per_page)) <= pages:
+                low = middle
+            else:
+                high = middle - 1
+        transactions = candidates[:low]
+        layout = layout_pages(bank, transactions, per_page)
+
+        stem = os.path.join(output_dir, bank.lower())
+        write_text_pdf(layout, stem + ".pdf")
+        write_truth_csv(truth_rows(bank, transactions), stem + ".csv")
+        written.append(stem + ".pdf")
+        if scanned:
+            write_scanned_pdf(layout, stem + "_scanned.pdf", dpi)
+            written.append(stem + "_scanned.pdf")
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("-o", "--output-dir", default="corpus")
+    parser.add_argument("--banks", nargs="+", choices=BANKS, default=list(BANKS))
+    parser.add_argument("--pages", type=int, default=3, help="Pages par relevé")
+    parser.add_argument("--per-page", type=int, default=30, help="Lignes d'opérations par page")
+    parser.add_argument("--no-scanned", action="store_true", help="Sans variantes scannées")
+    parser.add_argument("--dpi", type=int, default=SCAN_DPI, help="Résolution des variantes scannées")
+    args = parser.parse_args()
+
+    for path in generate(args.output_dir, args.banks, args.pages, args.per_page,
+                         not args.no_scanned, args.dpi):
+        print(path)
+
+
+if __name__ == "__main__":
+    main()
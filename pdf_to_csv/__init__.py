@@ -0,0 +1,5 @@
+import logging
+
+# Bibliothèque silencieuse par défaut : les messages ne sont affichés que si
+# l'application configure logging (option --verbose de la CLI)
+logging.getLogger(__name__).addHandler(logging.NullHandler())
@@ -1,52 +1,104 @@
-import pdfplumber
-from pdf_to_csv.utils.ocr_utils import extract_text_from_scanned_pdf
+from pdf_to_csv.utils.backends import FORCED_BACKEND, select_backend
+from pdf_to_csv.utils.document import PdfDocument
+from pdf_to_csv.utils.metrics import stage
+from pdf_to_csv.utils.ocr_utils import OcrUnavailableError
+from .base import BankParser
+from .detection import AmbiguousBankError, detect_bank
 from .societe_generale import SocieteGeneraleParser
 from .cic import CicParser
 from .credit_mutuel import CreditMutuelParser
 from .lcl import LclParser
 from .bnp import BnpParserImproved as BnpParser
 
-def get_parser(pdf_path):
-    """Détecte le type de relevé et retourne le parser approprié"""
+# Parser associé à chaque banque du registre de signatures (detection.py)
+PARSERS = {
+    "SOCIETE_GENERALE": SocieteGeneraleParser,
+    "CIC": CicParser,
+    "CREDIT_MUTUEL": CreditMutuelParser,
+    "LCL": LclParser,
+    "BNP": BnpParser,
+}
+
+
+def _detection_backend(backend=None) -> str:
+    """
+    Moteur de la détection : celui que retiendra le parser, quelle que soit
+    la banque, pour que la page 1 lue par la détection lui serve telle quelle.
+    """
+    accepted = set(BankParser.TEXT_BACKENDS)
+    for parser_class in PARSERS.values():
+        accepted &= set(parser_class.TEXT_BACKENDS)
+    return select_backend(accepted or BankParser.TEXT_BACKENDS, backend or FORCED_BACKEND)
+
+
+def _detect(document: PdfDocument):
+    """
+    Banque du document, par paliers de coût croissant (None si non reconnue).
+
+    :raises OcrUnavailableError: page 1 scannée (ou illisible) et OCR impossible
+    """
+    bank = None
+    scanned = True
     try:
-        with pdfplumber.open(pdf_path) as pdf:
-            first_page = pdf.pages[0]
-            text = first_page.extract_text() or ""
-            
-            # Détection Société Générale
-            if "SOCIETE GENERALE" in text or "Société Générale" in text:
-                return SocieteGeneraleParser(pdf_path)
-            
-            # Détection CIC
-            if "CIC" in text or "Banque CIC" in text:
-                return CicParser(pdf_path)
-            
-            # Détection Crédit Mutuel
-            if "CREDIT MUTUEL" in text or "Crédit Mutuel" in text:
-                return CreditMutuelParser(pdf_path)
-            
-            # Détection LCL
-            if "CREDIT LYONNAIS" in text or "Crédit Lyonnais" in text or "LCL" in text:
-                return LclParser(pdf_path)
-            
-            # Détection BNP Paribas
-            if "BNP PARIBAS" in text:
-                return BnpParser(pdf_path)
-                
-            raise ValueError("Format de relevé non supporté")
-            
-    except Exception as e:
-        # Handle scanned PDFs
-        text = extract_text_from_scanned_pdf(pdf_path)
-        if "SOCIETE GENERALE" in text or "Société Générale" in text:
-            return SocieteGeneraleParser(pdf_path)
-        elif "CIC" in text or "Banque CIC" in text:
-            return CicParser(pdf_path)
-        elif "CREDIT MUTUEL" in text or "Crédit Mutuel" in text:
-            return CreditMutuelParser(pdf_path)
-        elif "CREDIT LYONNAIS" in text or "Crédit Lyonnais" in text or "LCL" in text:
-            return LclParser(pdf_path)
-        elif "BNP PARIBAS" in text:
-            return BnpParser(pdf_path)
-            
+        bank = detect_bank(document.region_text(0))
+        if bank is None:
+            text, scanned = document.text_layer(0)
+            bank = detect_bank(text)
+    except AmbiguousBankError:
+        document.close()
+        raise
+    except Exception:
+        # PDF illisible par pdfplumber : détection par OCR
+        document.close()
+
+    if bank is None:
+        bank = detect_bank(document.ocr_header(0))
+    if bank is None:
+        try:
+            text = document.ocr_page(0)
+        except Exception as e:
+            # PDF sans couche texte lisible : l'erreur de l'OCR est la seule cause
+            raise OcrUnavailableError(f"Page 1 sans texte lisible, OCR impossible : {e}") from e
+        bank = detect_bank(text)
+    if bank is None and scanned and document.ocr_failed:
+        raise OcrUnavailableError("Page 1 sans texte lisible et OCR indisponible : installer "
+                                  "Tesseract (langue fra) et poppler pour convertir ce relevé")
+    return bank
+
+
+def get_parser(pdf_path, workers=None, layout=None, backend=None):
+    """
+    Détecte le type de relevé et retourne le parser approprié.
+
+    Le document ouvert pour la détection est transmis au parser : la première
+    page n'est pas ré-extraite lors du parsing. ``workers`` fixe le nombre de
+    processus utilisés pour extraire les pages restantes.
+
+    ``pdf_path`` peut être un chemin, le contenu du PDF (bytes) ou un fichier
+    ouvert en binaire : un contenu en mémoire n'est écrit sur disque (dans un
+    fichier temporaire unique) que pour l'OCR.
+
+    La détection procède par paliers, du moins coûteux au plus coûteux, et
+    s'arrête dès qu'une banque est reconnue : en-tête et pied de la page 1,
+    page 1 entière, puis pour un PDF scanné l'OCR basse résolution du
+    bandeau d'en-tête et enfin l'OCR de la page entière. Une égalité entre
+    plusieurs banques lève AmbiguousBankError ; un relevé scanné sans OCR
+    disponible lève OcrUnavailableError.
+
+    ``layout`` active l'extraction par position des colonnes (voir
+    ``BankParser._iter_layout_transactions``) ; par défaut, variable
+    d'environnement ``PDF_TO_CSV_LAYOUT``.
+
+    La détection lit le texte avec le moteur des parsers (le plus rapide de
+    leurs ``TEXT_BACKENDS``, pdfplumber par défaut) : la page 1 qu'elle a
+    extraite n'est pas relue par un autre moteur lors du parsing.
+    ``backend`` (ou ``PDF_TO_CSV_BACKEND``) impose un moteur pour toute la
+    conversion.
+    """
+    document = PdfDocument(pdf_path, workers, backend=_detection_backend(backend))
+    with stage("detection"):
+        bank = _detect(document)
+    if bank is None:
         raise ValueError("Format de relevé non reconnu après OCR")
+
+    return PARSERS[bank](pdf_path, document, layout=layout, backend=backend)
@@ -0,0 +1,339 @@
+import logging
+import os
+from functools import cached_property
+from typing import Iterator, List, Dict, Optional, Tuple
+from pdf_to_csv.utils.backends import FORCED_BACKEND, select_backend
+from pdf_to_csv.utils.date_utils import Period, statement_period
+from pdf_to_csv.utils.document import PdfDocument, PdfSource
+from pdf_to_csv.utils.layout import DATE_TOKEN, assign_cells, find_columns, parse_amount, row_cells
+from pdf_to_csv.utils.metrics import count, stage
+from pdf_to_csv.utils.records import TransactionTable
+
+logger = logging.getLogger(__name__)
+
+# Lignes de fin de page reportées sur la page suivante quand aucune
+# transaction n'y commence (début de transaction coupé par le saut de page)
+STREAM_TAIL_LINES = 5
+
+# Extraction par position des colonnes (``PDF_TO_CSV_LAYOUT=1`` pour l'activer
+# par défaut)
+DEFAULT_LAYOUT = os.environ.get("PDF_TO_CSV_LAYOUT", "0") == "1"
+
+
+class BankParser:
+    """Socle commun des parsers : extraction du texte puis parsing par banque"""
+
+    # À incrémenter à chaque changement du parsing : invalide les transactions
+    # en cache disque sans ré-extraire le texte des pages
+    VERSION = 1
+
+    # Clé de la banque dans le registre PARSERS (colonne BANQUE des exports typés)
+    BANK: Optional[str] = None
+
+    # Moteurs d'extraction dont le texte convient au parsing de la banque ;
+    # le plus rapide installé est retenu (voir backends.select_backend).
+    # pypdf et PDFium rendent le texte dans l'ordre du flux de contenu, pas
+    # dans l'ordre visuel : sur un relevé dont le flux est écrit colonne par
+    # colonne, aucune transaction n'est reconnue (et rien ne le signale). Ils
+    # ne sont donc utilisés que s'ils sont imposés (``PDF_TO_CSV_BACKEND``,
+    # ``--backend``) pour des relevés dont on a vérifié le texte.
+    TEXT_BACKENDS: Tuple[str, ...] = ("pdfplumber",)
+
+    # Mode colonnes : intitulé de chaque colonne du tableau des transactions
+    # (None si la banque ne le prend pas en charge)
+    TABLE_COLUMNS: Optional[Dict[str, str]] = None
+    # Les lignes sans date prolongent le libellé de la transaction précédente
+    LAYOUT_MULTILINE = True
+
+    def __init__(self, pdf_path: PdfSource, document: Optional[PdfDocument] = None,
+                 workers: Optional[int] = None, layout: Optional[bool] = None,
+                 backend: Optional[str] = None):
+        """
+        :param pdf_path: Chemin du fichier PDF à parser, ou son contenu
+                         (bytes / fichier ouvert en binaire)
+        :param document: Document déjà ouvert (par ``get_parser``), réutilisé
+                         pour ne pas ré-extraire les pages déjà lues
+        :param workers: Nombre de processus d'extraction si aucun document
+                        n'est fourni
+        :param layout: Extraction par position des colonnes plutôt que par
+                       texte (``PDF_TO_CSV_LAYOUT`` par défaut)
+        :param backend: Moteur d'extraction imposé (``PDF_TO_CSV_BACKEND`` par
+                        défaut) ; sinon le plus rapide de ``TEXT_BACKENDS``
+        """
+        self.pdf_path = pdf_path
+        self.document = document if document is not None else PdfDocument(pdf_path, workers)
+        self.document.use_backend(select_backend(self.TEXT_BACKENDS, backend or FORCED_BACKEND))
+        layout = DEFAULT_LAYOUT if layout is None else layout
+        self.layout = layout and self.TABLE_COLUMNS is not None
+
+    @cached_property
+    def period(self) -> Optional[Period]:
+        """
+        Période du relevé (« du ... au ... »), lue une fois dans l'en-tête de
+        la première page ; None si elle n'y figure pas.
+
+        Les exports typés en tirent l'année des dates qui n'en ont pas (LCL).
+        """
+        try:
+            return statement_period(self.document.region_text(0))
+        except Exception as e:
+            logger.debug("Période du relevé illisible: %s", e)
+            return None
+
+    @property
+    def backend(self) -> str:
+        """Mode d'extraction, partie de la clé du cache des transactions"""
+        return self.document.backend + ("-layout" if self.layout else "")
+
+    def extract_transactions(self) -> TransactionTable:
+        """
+        Extrait les transactions depuis le PDF bancaire (via le cache disque).
+
+        Les transactions sont retournées en table compacte par colonnes, qui
+        se parcourt comme une liste de dictionnaires.
+        """
+        cache = self.document.disk_cache
+        key = self._cache_key()
+        if key is None:
+            return TransactionTable(self._extract_from_pdf(self.pdf_path))
+
+        transactions = cache.get_transactions(*key)
+        if transactions is None:
+            transactions = self._extract_from_pdf(self.pdf_path)
+            if transactions:
+                cache.put_transactions(*key, transactions)
+        return TransactionTable(transactions)
+
+    def _cache_key(self) -> Optional[Tuple]:
+        """Clé des transactions dans le cache disque (None sans cache)"""
+        if self.document.disk_cache is None:
+            return None
+        sha256 = self.document.sha256
+        if sha256 is None:
+            return None
+        return (sha256, self.backend, type(self).__name__, self.VERSION)
+
+    def iter_transactions(self) -> Iterator[Dict]:
+        """
+        Produit les transactions au fil des pages, sans construire le texte complet.
+
+        En mode colonnes, si aucun tableau de transactions n'est reconnu, le
+        document est relu en mode texte. Les transactions déjà en cache disque
+        sont relues sans ouvrir le PDF ; sinon elles y sont écrites au fil du
+        parcours (sans être conservées en mémoire), et l'entrée n'est publiée
+        qu'une fois le document entièrement parcouru.
+        """
+        cache = self.document.disk_cache
+        key = self._cache_key()
+        if key is None:
+            yield from self._iter_transactions()
+            return
+
+        cached = cache.get_transactions(*key)
+        if cached is not None:
+            yield from cached
+            return
+        writer = cache.transaction_writer(*key)
+        complete = False
+        try:
+            for transaction in self._iter_transactions():
+                writer.write(transaction)
+                yield transaction
+            complete = writer.count > 0
+        finally:
+            writer.close(commit=complete)
+
+    def _iter_transactions(self) -> Iterator[Dict]:
+        """Transactions au fil des pages, sans passer par le cache des transactions"""
+        if self.layout:
+            found = False
+            for transaction in self._iter_layout_transactions():
+                found = True
+                yield transaction
+            if found:
+                self.document.close()
+                return
+            logger.info("Tableau des transactions non reconnu, extraction par texte")
+        yield from self._iter_text_transactions()
+
+    def _iter_text_transactions(self) -> Iterator[Dict]:
+        """
+        Mode texte : les transactions sont parsées page par page.
+
+        La dernière transaction d'une page peut se poursuivre sur la suivante :
+        ses lignes sont reportées (avec l'en-tête de section en cours) et
+        re-parsées avec la page suivante. Seules ces lignes restent en mémoire
+        d'une page à l'autre.
+        """
+        carry: List[str] = []
+        context: Optional[str] = None
+        try:
+            for page_text in self.document.iter_page_texts(cache=False):
+                lines = carry + page_text.split('\n')
+                with stage("parsing"):
+                    transactions = self._parse_lines(lines)
+                    complete = []
+                    if transactions:
+                        last_start = max(t['_line'] for t in transactions)
+                        complete = self._finalize_transactions(sorted(
+                            (t for t in transactions if t['_line'] < last_start),
+                            key=lambda t: t['_line']))
+                    else:
+                        last_start = max(0, len(lines) - STREAM_TAIL_LINES)
+                count("parsing", len(complete))
+                yield from complete
+                for line in lines[:last_start]:
+                    if self._is_context_line(line):
+                        context = line
+                carry = lines[last_start:]
+                if context is not None:
+                    carry.insert(0, context)
+        finally:
+            self.document.close()
+        with stage("parsing"):
+            remaining = self._finalize_transactions(self._parse_lines(carry))
+        count("parsing", len(remaining))
+        yield from remaining
+
+    def _extract_from_pdf(self, pdf_path: PdfSource) -> List[Dict]:
+        """Extrait le texte du PDF et parse les transactions"""
+        if self.layout:
+            transactions = list(self._iter_layout_transactions())
+            if transactions:
+                self.document.close()
+                return transactions
+            logger.info("Tableau des transactions non reconnu, extraction par texte")
+        try:
+            try:
+                full_text = self.document.full_text()
+            finally:
+                self.document.close()
+            return self._extract_from_text(full_text)
+        except Exception as e:
+            # Un moteur plus tolérant aux PDF mal formés prend le relais
+            backend = self.document.backend
+            fallback = "pypdf" if backend != "pypdf" else "pdfplumber"
+            logger.warning("Erreur %s: %s, tentative avec %s...", backend, e, fallback)
+            try:
+                self.document.use_backend(fallback)
+                try:
+                    full_text = self.document.full_text()
+                finally:
+                    self.document.close()
+                return self._extract_from_text(full_text)
+            except Exception as e2:
+                logger.warning("Erreur %s: %s", fallback, e2)
+                return []
+
+    def _iter_layout_transactions(self) -> Iterator[Dict]:
+        """
+        Mode colonnes : transactions lues d'après la position des mots.
+
+        Les colonnes sont apprises sur la ligne d'en-tête du tableau
+        (``TABLE_COLUMNS``) et conservées tant qu'un nouvel en-tête ne les
+        redéfinit pas : les lignes au-dessus du premier en-tête sont ignorées.
+        Chaque mot est affecté à une colonne par sa position, le sens débit /
+        crédit découle donc de la colonne du montant. Une ligne datée ouvre une
+        transaction ; une ligne sans date la prolonge ; un texte dans la
+        colonne date sans date (titre de section, sous-total, pied de page) la
+        clôt et est transmis à ``_layout_context``.
+
+        Une page sans couche texte est lue en mode texte (OCR).
+        """
+        columns = None
+        current = None
+        for index, rows in self.document.iter_page_rows():
+            if rows is None:
+                if current is not None:
+                    yield from self._finalize_transactions([current])
+                    current = None
+                with stage("parsing"):
+                    transactions = self._finalize_transactions(
+                        self._parse_lines(self.document.page_text(index).split('\n')))
+                count("parsing", len(transactions))
+                yield from transactions
+                continue
+
+            completed = []
+            with stage("parsing"):
+                for row in rows:
+                    header = find_columns(row, self.TABLE_COLUMNS)
+                    if header is not None:
+                        columns = header
+                        continue
+                    if columns is None:
+                        continue
+                    cells = assign_cells(row_cells(row), columns)
+                    dates = DATE_TOKEN.findall(cells.get('DATE', ''))
+                    if dates and cells['DATE'].startswith(dates[0]):
+                        if current is not None:
+                            completed.append(current)
+                        if len(dates) > 1 and 'DATE_VALEUR' not in cells:
+                            cells['DATE_VALEUR'] = dates[1]
+                        cells['DATE'] = dates[0]
+                        current = self._layout_transaction(cells)
+                    elif 'DATE' in cells:
+                        if current is not None:
+                            completed.append(current)
+                            current = None
+                        self._layout_context(' '.join(word['text'] for word in row))
+                    elif current is not None:
+                        self._extend_layout_transaction(current, cells)
+                completed = self._finalize_transactions(completed)
+            count("parsing", len(completed))
+            yield from completed
+        if current is not None:
+            yield from self._finalize_transactions([current])
+
+    def _layout_transaction(self, cells: Dict[str, str]) -> Dict:
+        """Transaction construite à partir des cellules d'une ligne datée"""
+        return {
+            'DATE': cells['DATE'],
+            'DATE_VALEUR': cells.get('DATE_VALEUR'),
+            'LIBELLE': ' '.join(cells.get('LIBELLE', '').split()),
+            'DEBIT': parse_amount(cells.get('DEBIT')),
+            'CREDIT': parse_amount(cells.get('CREDIT')),
+        }
+
+    def _extend_layout_transaction(self, transaction: Dict, cells: Dict[str, str]):
+        """Complète une transaction avec une ligne sans date (suite du libellé, montant décalé)"""
+        for field in ('DEBIT', 'CREDIT'):
+            if transaction[field] is None and transaction['DEBIT' if field == 'CREDIT' else 'CREDIT'] is None:
+                transaction[field] = parse_amount(cells.get(field))
+        label = self._clean_layout_label(cells.get('LIBELLE', ''))
+        if self.LAYOUT_MULTILINE and label:
+            transaction['LIBELLE'] = f"{transaction['LIBELLE']} {label}".strip()
+
+    def _clean_layout_label(self, label: str) -> str:
+        """Nettoie une ligne de suite de libellé (mode colonnes)"""
+        return ' '.join(label.split())
+
+    def _layout_context(self, text: str):
+        """Ligne hors transaction du tableau (titre de section, sous-total...)"""
+
+    def _extract_from_text(self, text: str) -> List[Dict]:
+        """Parse les transactions depuis le texte brut"""
+        with stage("parsing"):
+            transactions = self._finalize_transactions(self._parse_lines(text.split('\n')))
+        count("parsing", len(transactions))
+        return transactions
+
+    def _parse_lines(self, lines: List[str]) -> List[Dict]:
+        """
+        Parse les transactions d'une suite de lignes.
+
+        Chaque transaction porte la clé technique ``_line`` : l'index de sa
+        première ligne dans ``lines``.
+        """
+        raise NotImplementedError
+
+    def _finalize_transactions(self, transactions: List[Dict]) -> List[Dict]:
+        """Supprime les clés techniques (préfixe ``_``) des transactions, sans les recopier"""
+        for transaction in transactions:
+            for key in [key for key in transaction if key[0] == '_']:
+                del transaction[key]
+        return transactions
+
+    def _is_context_line(self, line: str) -> bool:
+        """Indique si la ligne ouvre une section dont dépend le parsing des suivantes"""
+        return False
@@ -1,126 +1,86 @@
+import logging
 import re
-import pandas as pd
-import pdfplumber
-import pypdf
 from typing import List, Dict, Optional
-from datetime import datetime
+from pdf_to_csv.utils.records import as_table
+from .base import BankParser
+from .rules import BNP_DESCRIPTION_STOP, BNP_SECTION_END, BNP_SECTION_HEADER, BNP_SECTIONS, BNP_SKIP
 
-class BnpParserImproved:
-    def __init__(self, pdf_path: str):
-        """
-        Initialisation du parser BNP Paribas amélioré
-        
-        :param pdf_path: Chemin du fichier PDF à parser
+logger = logging.getLogger(__name__)
+
+class BnpParserImproved(BankParser):
+    # Version 2 : sections répétées sur plusieurs pages prises en compte
+    VERSION = 2
+
+    BANK = "BNP"
+
+    TABLE_COLUMNS = {'DATE': "DATE COMPTABLE", 'LIBELLE': "NATURE DES OPERATIONS",
+                     'DATE_VALEUR': "DATE DE VALEUR", 'DEBIT': "DEBIT", 'CREDIT': "CREDIT"}
+    # Section en cours en mode colonnes
+    _layout_section: Optional[str] = None
+
+    def _parse_lines(self, lines: List[str]) -> List[Dict]:
         """
-        self.pdf_path = pdf_path
-        
-    def extract_transactions(self) -> List[Dict]:
-        """Extrait les transactions depuis le PDF bancaire BNP Paribas"""
-        return self._extract_from_pdf(self.pdf_path)
-    
-    def _extract_from_pdf(self, pdf_path: str) -> List[Dict]:
-        """Extrait le texte du PDF et parse les transactions"""
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                full_text = "\n".join(page.extract_text() for page in pdf.pages if page.extract_text())
-            return self._extract_from_text(full_text)
-        except Exception as e:
-            print(f"Erreur pdfplumber: {e}, tentative avec pypdf...")
-            try:
-                with open(pdf_path, 'rb') as f:
-                    pdf = pypdf.PdfReader(f)
-                    full_text = "\n".join(page.extract_text() for page in pdf.pages if page.extract_text())
-                return self._extract_from_text(full_text)
-            except Exception as e2:
-                print(f"Erreur lors du traitement du PDF: {e2}")
-                return []
+        Parse les transactions en un seul passage sur les lignes du texte extrait.
 
-    def _extract_from_text(self, text: str) -> List[Dict]:
-        """Parse les transactions depuis le texte extrait"""
-        print("=== DÉBUT DU PARSING ===")
-        transactions = []
-        lines = text.split('\n')
-        
-        # Debug: afficher les premières lignes
-        print("=== PREMIÈRES LIGNES ===")
-        for i, line in enumerate(lines[:30]):
-            if line.strip():
-                print(f"{i:2d}: {line}")
-        
-        # Sections à traiter
-        sections_config = {
-            "VIREMENTS RECUS": {"type": "credit", "keywords": ["VIR SEPA RECU"]},
-            "AUTRES OPERATIONS CREDIT": {"type": "credit", "keywords": ["REMBOURST"]},
-            "PAIEMENTS PAR CARTES": {"type": "debit", "keywords": ["DU "]},
-            "VIREMENTS EMIS": {"type": "debit", "keywords": ["VIREMENT SEPA EMIS"]},
-            "PRELEVEMENTS, AMORTISSEMENTS DE PRETS": {"type": "debit", "keywords": ["PRLV SEPA"]},
-            "AUTRES OPERATIONS DEBIT": {"type": "debit", "keywords": ["COMMISSIONS"]}
-        }
-        
-        for section_name, config in sections_config.items():
-            print(f"\n=== TRAITEMENT SECTION: {section_name} ===")
-            section_transactions = self._parse_section_improved(lines, section_name, config)
-            print(f"Trouvé {len(section_transactions)} transactions")
-            transactions.extend(section_transactions)
-            
-            # Debug: afficher les premières transactions trouvées
-            for i, trans in enumerate(section_transactions[:3]):
-                print(f"  {i+1}. {trans['DATE']} | {trans['LIBELLE'][:50]} | D:{trans.get('DEBIT')} C:{trans.get('CREDIT')}")
-        
-        print(f"\n=== TOTAL: {len(transactions)} transactions extraites ===")
-        return self._validate_transactions(transactions)
-    
-    def _parse_section_improved(self, lines: List[str], section_name: str, config: Dict) -> List[Dict]:
-        """Parse une section avec une approche améliorée"""
+        La section courante est suivie par une machine à états : un en-tête de
+        section l'ouvre (et ferme la précédente), « Sous total... » ou
+        « TOTAL DES OPERATIONS » la ferme. Chaque occurrence d'une section est
+        traitée, y compris lorsqu'elle se répète sur les pages suivantes.
+        """
         transactions = []
+        section_name = None
         
-        # Trouver le début de la section
-        start_index = -1
-        for i, line in enumerate(lines):
-            if section_name in line:
-                start_index = i + 1
-                print(f"Section '{section_name}' trouvée ligne {i}")
-                break
-        
-        if start_index == -1:
-            print(f"Section '{section_name}' non trouvée")
-            return transactions
-        
-        # Trouver la fin de la section
-        end_index = len(lines)
-        for i in range(start_index, len(lines)):
-            line = lines[i].strip()
-            if "Sous total..." in line or self._is_new_section(line):
-                end_index = i
-                print(f"Fin de section à la ligne {i}: '{line[:50]}'")
-                break
-        
-        # Parser les lignes de la section
-        i = start_index
-        while i < end_index:
+        i = 0
+        while i < len(lines):
             line = lines[i].strip()
             
-            if not line or self._is_skip_line(line):
+            # Changement d'état : ouverture ou fermeture de section
+            if BNP_SECTION_END.matches(line):
+                section_name = BNP_SECTION_HEADER.find(line)
+                if section_name:
+                    logger.debug("Section '%s' trouvée ligne %d", section_name, i)
+                else:
+                    logger.debug("Fin de section à la ligne %d: '%s'", i, line[:50])
                 i += 1
                 continue
             
-            print(f"  Analyse ligne {i}: {line}")
+            if section_name is None or not line or self._is_skip_line(line):
+                i += 1
+                continue
             
             # Essayer de parser la transaction
-            transaction = self._parse_transaction_line(line, lines, i, end_index, config)
+            transaction = self._parse_transaction_line(line, lines, i, BNP_SECTIONS[section_name])
             
             if transaction:
                 transaction['SECTION'] = section_name
+                transaction['_line'] = i
                 transactions.append(transaction)
                 i = transaction.get('_next_line', i + 1)
-                print(f"    ✓ Transaction trouvée: {transaction['LIBELLE'][:40]}")
+                logger.debug("Ligne %d, transaction trouvée: %s", i, transaction['LIBELLE'][:40])
             else:
+                logger.debug("Ligne %d ignorée: %s", i, line)
                 i += 1
-                print(f"    ✗ Ligne ignorée")
         
+        logger.debug("%d transactions extraites", len(transactions))
         return transactions
+
+    def _layout_context(self, text: str):
+        # Titre de section, ou sous-total / total qui la ferme
+        if BNP_SECTION_END.matches(text.strip()):
+            self._layout_section = BNP_SECTION_HEADER.find(text.strip())
+
+    def _layout_transaction(self, cells: Dict[str, str]) -> Dict:
+        transaction = super()._layout_transaction(cells)
+        transaction['DATE'] = self._convert_date_format(transaction['DATE'])
+        transaction['DATE_VALEUR'] = self._convert_date_format(transaction['DATE_VALEUR'] or transaction['DATE'])
+        transaction['SECTION'] = self._layout_section or 'UNKNOWN'
+        return transaction
+
+    def _is_context_line(self, line: str) -> bool:
+        # En-têtes et fins de section : état de la machine reporté d'une page à l'autre
+        return BNP_SECTION_END.matches(line.strip())
     
-    def _parse_transaction_line(self, line: str, lines: List[str], line_index: int, end_index: int, config: Dict) -> Optional[Dict]:
+    def _parse_transaction_line(self, line: str, lines: List[str], line_index: int, config: Dict) -> Optional[Dict]:
         """Parse une ligne de transaction avec plusieurs patterns"""
         
         # Pattern principal: DATE DESCRIPTION DATE MONTANT
@@ -147,14 +107,14 @@ class BnpParserImproved:
                     else:  # Le 3ème groupe est une date
                         date_comptable, description, date_valeur = groups
                         # Chercher le montant sur la ligne suivante ou dans la même ligne
-                        montant = self._find_amount_in_context(lines, line_index, end_index)
+                        montant = self._find_amount_in_context(lines, line_index)
                         if not montant:
                             continue
                 else:  # Ligne incomplète, chercher le montant ailleurs
                     date_comptable = groups[0]
                     description = groups[1]
                     date_valeur = date_comptable
-                    montant = self._find_amount_in_context(lines, line_index, end_index)
+                    montant = self._find_amount_in_context(lines, line_index)
                     if not montant:
                         continue
                 
@@ -162,13 +122,9 @@ class BnpParserImproved:
                 full_description = description.strip()
                 next_line_idx = line_index + 1
                 
-                while next_line_idx < end_index and next_line_idx < len(lines):
+                while next_line_idx < len(lines):
                     next_line = lines[next_line_idx].strip()
-                    if (not next_line or 
-                        re.match(r'^\d{2}\.\d{2}\.\d{2}', next_line) or
-                        "Sous total..." in next_line or
-                        self._is_skip_line(next_line) or
-                        re.match(r'^\d{1,3}(?:\s\d{3})*,\d{2}$', next_line)):
+                    if not next_line or BNP_DESCRIPTION_STOP.matches(next_line):
                         break
                     
                     full_description += " " + next_line
@@ -188,53 +144,21 @@ class BnpParserImproved:
         
         return None
     
-    def _find_amount_in_context(self, lines: List[str], start_idx: int, end_idx: int) -> Optional[str]:
-        """Cherche un montant dans les lignes suivantes"""
-        for i in range(start_idx, min(start_idx + 3, end_idx, len(lines))):
+    def _find_amount_in_context(self, lines: List[str], start_idx: int) -> Optional[str]:
+        """Cherche un montant dans les lignes suivantes, sans dépasser la fin de section"""
+        for i in range(start_idx, min(start_idx + 3, len(lines))):
             line = lines[i].strip()
+            if i > start_idx and BNP_SECTION_END.matches(line):
+                break
             # Chercher un montant dans la ligne
             amount_match = re.search(r'\b(\d{1,3}(?:\s\d{3})*,\d{2})\b', line)
             if amount_match:
                 return amount_match.group(1)
         return None
     
-    def _is_new_section(self, line: str) -> bool:
-        """Vérifie si une ligne marque le début d'une nouvelle section"""
-        section_keywords = [
-            "VIREMENTS RECUS", "AUTRES OPERATIONS CREDIT", "PAIEMENTS PAR CARTES",
-            "VIREMENTS EMIS", "PRELEVEMENTS, AMORTISSEMENTS DE PRETS", 
-            "AUTRES OPERATIONS DEBIT", "TOTAL DES OPERATIONS"
-        ]
-        return any(keyword in line for keyword in section_keywords)
-    
     def _is_skip_line(self, line: str) -> bool:
         """Détermine si une ligne doit être ignorée"""
-        skip_patterns = [
-            r"^- CARTE N°",
-            r"^Page \d+",
-            r"^BNP PARIBAS SA",
-            r"^3478",
-            r"^P\.",
-            r"^\d{12}$",
-            r"^SORPSITSPREPFC",
-            "RELEVE DE VOTRE COMPTE",
-            "Raison sociale",
-            "RIB :",
-            "IBAN :",
-            "BIC :",
-            "Les sommes déposées",
-            "www.garantiedesdepots.fr",
-            "Relevé N°",
-            "PERIODE DU",
-            "Solde au",
-            "Votre chargé d'Affaires",
-            "DATE COMPTABLE",
-            "NATURE DES OPERATIONS",
-            "DATE DE VALEUR",
-            "DEBIT CREDIT"
-        ]
-        
-        return any(re.match(pattern, line) or pattern in line for pattern in skip_patterns)
+        return BNP_SKIP.matches(line)
     
     def _convert_date_format(self, date_str: str) -> str:
         """Convertit le format de date BNP (dd.mm.yy) vers dd/mm/yyyy"""
@@ -260,25 +184,6 @@ class BnpParserImproved:
         # Format BNP: "1 234,56" -> "1234.56"
         cleaned = amount.replace(' ', '').replace(',', '.')
         return cleaned
-    
-    def _validate_transactions(self, transactions: List[Dict]) -> List[Dict]:
-        """Valide et complète les transactions"""
-        validated_transactions = []
-        
-        for transaction in transactions:
-            validated_transaction = {
-                'DATE': transaction.get('DATE', ''),
-                'DATE_VALEUR': transaction.get('DATE_VALEUR', ''),
-                'LIBELLE': transaction.get('LIBELLE', ''),
-                'DEBIT': transaction.get('DEBIT'),
-                'CREDIT': transaction.get('CREDIT'),
-                'SECTION': transaction.get('SECTION', 'UNKNOWN')
-            }
-            # Supprimer les clés techniques
-            validated_transaction = {k: v for k, v in validated_transaction.items() if not k.startswith('_')}
-            validated_transactions.append(validated_transaction)
-        
-        return validated_transactions
 
 def save_to_csv_improved(transactions: List[Dict], output_path: str = 'transactions_bnp_improved.csv'):
     """Sauvegarde améliorée des transactions en CSV"""
@@ -287,7 +192,8 @@ def save_to_csv_improved(transactions: List[Dict], output_path: str = 'transacti
         return
 
     try:
-        df = pd.DataFrame(transactions)
+        import pandas as pd
+        df = as_table(transactions).to_dataframe()
         
         print(f"📊 DataFrame créé avec {len(df)} lignes et colonnes: {list(df.columns)}")
         
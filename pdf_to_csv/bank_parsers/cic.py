@@ -1,33 +1,28 @@
+import logging
 import re
-import pandas as pd
-import pdfplumber
-import pypdf
 from typing import List, Dict, Optional
+from pdf_to_csv.utils.records import as_table
+from .base import BankParser
+from .rules import CIC_CREDIT_KEYWORDS, CIC_DEBIT_KEYWORDS, CIC_SKIP, CIC_STOP
 
-class CicParser:
-    def __init__(self, pdf_path: str):
-        self.pdf_path = pdf_path
-        
-    def extract_transactions(self) -> List[Dict]:
-        """Extrait les transactions depuis le PDF bancaire"""
-        return self._extract_from_pdf(self.pdf_path)
-    
-    def _extract_from_pdf(self, pdf_path: str) -> List[Dict]:
-        """Extrait le texte du PDF et parse les transactions"""
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                full_text = "\n".join(page.extract_text() for page in pdf.pages)
-            return self._extract_from_text(full_text)
-        except Exception as e:
-            print(f"Erreur pdfplumber: {e}, tentative avec pypdf...")
-            try:
-                with open(pdf_path, 'rb') as f:
-                    pdf = pypdf.PdfReader(f)
-                    full_text = "\n".join(page.extract_text() for page in pdf.pages)
-                return self._extract_from_text(full_text)
-            except Exception as e2:
-                print(f"Erreur pypdf: {e2}")
-                return []
+logger = logging.getLogger(__name__)
+
+class CicParser(BankParser):
+    # Format détecté (CIC ou Crédit Mutuel), conservé d'une page à l'autre
+    _bank_format = "UNKNOWN"
+
+    BANK = "CIC"
+
+    # Lignes datées avant l'en-tête du tableau conservées (format Crédit Mutuel)
+    VERSION = 2
+
+    # Mode colonnes : le sens du montant découle de sa colonne, sans mots-clés
+    TABLE_COLUMNS = {'DATE': "Date", 'DATE_VALEUR': "Date valeur", 'LIBELLE': "Opération",
+                     'DEBIT': "Débit", 'CREDIT': "Crédit"}
+
+    def _clean_layout_label(self, label: str) -> str:
+        label = re.sub(r'ICS\s*:\s*\S+\s*RUM\s*:\s*\S+', '', ' '.join(label.split()))
+        return label.strip()
 
     def _detect_bank_format(self, text: str) -> str:
         """Détecte le format de la banque"""
@@ -38,30 +33,28 @@ class CicParser:
         else:
             return "UNKNOWN"
 
-    def _extract_from_text(self, text: str) -> List[Dict]:
+    def _parse_lines(self, lines: List[str]) -> List[Dict]:
         """Parse les transactions selon le format détecté"""
-        bank_format = self._detect_bank_format(text)
+        bank_format = self._bank_format
+        if bank_format == "UNKNOWN":
+            bank_format = self._bank_format = self._detect_bank_format("\n".join(lines))
         
         if bank_format == "CREDIT_MUTUEL":
-            return self._parse_credit_mutuel(text)
+            return self._parse_credit_mutuel(lines)
         elif bank_format == "CIC":
-            return self._parse_cic(text)
+            return self._parse_cic(lines)
         else:
-            print("Format de banque non reconnu, tentative avec le parser générique...")
-            return self._parse_generic(text)
+            logger.warning("Format de banque non reconnu, tentative avec le parser générique...")
+            return self._parse_generic(lines)
 
-    def _parse_credit_mutuel(self, text: str) -> List[Dict]:
+    def _parse_credit_mutuel(self, lines: List[str]) -> List[Dict]:
         """Parse spécifique pour Crédit Mutuel"""
         transactions = []
-        lines = text.split('\n')
-        
-        # Recherche de la section des transactions
-        start_index = 0
-        for i, line in enumerate(lines):
-            if "Date Date valeur Opération Débit EUROS Crédit EUROS" in line:
-                start_index = i + 1
-                break
-        
+
+        # Pas de saut jusqu'à l'en-tête « Date Date valeur Opération... » :
+        # au fil des pages, les lignes reportées de la page précédente le
+        # précèdent. L'en-tête, non daté, n'est jamais pris pour une transaction.
+
         # Pattern pour les transactions Crédit Mutuel
         # Format: Date Date_valeur Description Montant_débit Montant_crédit
         trans_pattern = re.compile(
@@ -71,19 +64,12 @@ class CicParser:
             r'(\d{1,3}(?:\.\d{3})*,\d{2}))?$'  # Montant (optionnel)
         )
         
-        i = start_index
+        i = 0
         while i < len(lines):
             line = lines[i].strip()
             
             # Ignorer les lignes non pertinentes
-            if (not line or 
-                "Page" in line or
-                "Sous réserve" in line or
-                "Total des mouvements" in line or
-                "SOLDE CREDITEUR" in line or
-                "<<Suite au verso>>" in line or
-                "Information sur la protection" in line or
-                "Date Date valeur" in line):
+            if not line or CIC_SKIP.matches(line):
                 i += 1
                 continue
             
@@ -102,10 +88,7 @@ class CicParser:
                     # Arrêter si nouvelle transaction ou ligne de contrôle
                     if (trans_pattern.match(next_line) or
                         not next_line or
-                        any(keyword in next_line for keyword in [
-                            "Page", "Sous réserve", "Total des mouvements",
-                            "SOLDE CREDITEUR", "<<Suite", "Date Date valeur"
-                        ])):
+                        CIC_STOP.matches(next_line)):
                         break
                     
                     # Vérifier si c'est un montant isolé (crédit)
@@ -132,15 +115,10 @@ class CicParser:
                     description_upper = description.upper()
                     
                     # Opérations typiquement créditrices
-                    if any(keyword in description_upper for keyword in [
-                        'REMCB', 'REM CHQ', 'VRST', 'VIR INST'
-                    ]):
+                    if CIC_CREDIT_KEYWORDS.matches(description_upper):
                         credit = montant
                     # Opérations typiquement débitrices
-                    elif any(keyword in description_upper for keyword in [
-                        'PAIEMENT CB', 'PAIEMENT PSC', 'CHEQUE', 'PRLV SEPA',
-                        'COMCB', 'FACT'
-                    ]):
+                    elif CIC_DEBIT_KEYWORDS.matches(description_upper):
                         debit = montant
                     else:
                         # Par défaut, considérer comme débit
@@ -156,7 +134,8 @@ class CicParser:
                     'DATE_VALEUR': date_val,
                     'LIBELLE': description,
                     'DEBIT': self._clean_amount(debit),
-                    'CREDIT': self._clean_amount(credit)
+                    'CREDIT': self._clean_amount(credit),
+                    '_line': i
                 })
                 
                 i = j
@@ -165,10 +144,9 @@ class CicParser:
         
         return transactions
 
-    def _parse_cic(self, text: str) -> List[Dict]:
+    def _parse_cic(self, lines: List[str]) -> List[Dict]:
         """Parse spécifique pour CIC (code original adapté)"""
         transactions = []
-        lines = text.split('\n')
         
         # Pattern pour les lignes de transaction CIC
         trans_pattern = re.compile(
@@ -216,7 +194,8 @@ class CicParser:
                     'DATE_VALEUR': date_val,
                     'LIBELLE': re.sub(r'\s+', ' ', description).strip(),
                     'DEBIT': self._clean_amount(debit),
-                    'CREDIT': self._clean_amount(credit)
+                    'CREDIT': self._clean_amount(credit),
+                    '_line': i
                 })
                 
                 i = j
@@ -225,7 +204,7 @@ class CicParser:
                 
         return transactions
 
-    def _parse_generic(self, text: str) -> List[Dict]:
+    def _parse_generic(self, lines: List[str]) -> List[Dict]:
         """Parser générique pour formats non reconnus"""
         # Implémentation basique pour autres formats
         return []
@@ -242,7 +221,8 @@ def save_to_csv(transactions: List[Dict], output_path: str = 'transactions_banca
         print("Aucune transaction à exporter")
         return
     
-    df = pd.DataFrame(transactions)
+    import pandas as pd
+    df = as_table(transactions).to_dataframe()
     
     # Conversion des types
     try:
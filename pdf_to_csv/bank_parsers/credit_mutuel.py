@@ -1,38 +1,23 @@
 import re
-import pandas as pd
-import pdfplumber
-import pypdf
 from typing import List, Dict
+from pdf_to_csv.utils.records import as_table
+from .base import BankParser
+from .rules import CREDIT_MUTUEL_SKIP
 
-class CreditMutuelParser:
-    def __init__(self, pdf_path: str):
-        self.pdf_path = pdf_path
-        
-    def extract_transactions(self) -> List[Dict]:
-        """Extrait les transactions depuis le PDF Crédit Mutuel"""
-        return self._extract_from_pdf(self.pdf_path)
-    
-    def _extract_from_pdf(self, pdf_path: str) -> List[Dict]:
-        """Extrait le texte du PDF et parse les transactions"""
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                full_text = "\n".join(page.extract_text() for page in pdf.pages)
-            return self._extract_from_text(full_text)
-        except Exception as e:
-            print(f"Erreur pdfplumber: {e}, tentative avec pypdf...")
-            try:
-                with open(pdf_path, 'rb') as f:
-                    pdf = pypdf.PdfReader(f)
-                    full_text = "\n".join(page.extract_text() for page in pdf.pages)
-                return self._extract_from_text(full_text)
-            except Exception as e2:
-                print(f"Erreur pypdf: {e2}")
-                return []
+class CreditMutuelParser(BankParser):
+    BANK = "CREDIT_MUTUEL"
+
+    TABLE_COLUMNS = {'DATE': "Date", 'DATE_VALEUR': "Date valeur", 'LIBELLE': "Opération",
+                     'DEBIT': "Débit", 'CREDIT': "Crédit"}
+
+    def _clean_layout_label(self, label: str) -> str:
+        label = re.sub(r'ICS : \S+ RUM : \S+', '', ' '.join(label.split()))  # Supprime ICS/RUM
+        label = re.sub(r'CARTE \d{4}', '', label)  # Supprime numéro de carte
+        return ' '.join(label.split())
 
-    def _extract_from_text(self, text: str) -> List[Dict]:
-        """Parse les transactions depuis le texte brut"""
+    def _parse_lines(self, lines: List[str]) -> List[Dict]:
+        """Parse les transactions depuis les lignes du texte brut"""
         transactions = []
-        lines = text.split('\n')
         
         # Pattern pour les lignes de transaction Crédit Mutuel
         # Format: Date Date_valeur Opération Débit Crédit
@@ -64,21 +49,7 @@ class CreditMutuelParser:
                         
                     # Ignorer les lignes non pertinentes
                     if (next_line and 
-                        not any(x in next_line for x in [
-                            'Date', 'Opération', 'Débit', 'Crédit',
-                            'Information sur la protection', 
-                            'Crédit Mutuel',
-                            'Sous réserve des extournes',
-                            'Page \\d',
-                            'Total des mouvements',
-                            'SOLDE CREDITEUR',
-                            '<<Suite au verso>>',
-                            '(GE) : protégé par la Garantie de l\'Etat',
-                            '(GD) : protégé par la Garantie des Dépôts',
-                            'www.garantiedesdepots.fr',
-                            'IBAN :',
-                            'BIC :'
-                        ]) and
+                        not CREDIT_MUTUEL_SKIP.matches(next_line) and
                         len(description) < 200):
                         
                         # Nettoyage des espaces multiples et éléments parasites
@@ -100,7 +71,8 @@ class CreditMutuelParser:
                     'DATE_VALEUR': date_val,
                     'LIBELLE': description,
                     'DEBIT': clean_amount(debit),
-                    'CREDIT': clean_amount(credit)
+                    'CREDIT': clean_amount(credit),
+                    '_line': i
                 })
                 
                 i = j  # Avancer à la ligne suivante
@@ -115,7 +87,8 @@ def save_to_csv(transactions: List[Dict], output_path: str = 'transactions_credi
         print("Aucune transaction à exporter")
         return
     
-    df = pd.DataFrame(transactions)
+    import pandas as pd
+    df = as_table(transactions).to_dataframe()
     
     # Conversion des types
     df['DATE'] = pd.to_datetime(df['DATE'], format='%d/%m/%Y')
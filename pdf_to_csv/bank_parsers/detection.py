@@ -0,0 +1,83 @@
+import re
+from typing import Dict, Optional
+
+# Signatures par banque : (motif, poids). Les raisons sociales complètes
+# pèsent plus que les sigles, qui ne sont reconnus que comme mots entiers
+# (« CIC » ou « LCL » au milieu d'un autre mot ne comptent pas).
+BANK_SIGNATURES = {
+    "SOCIETE_GENERALE": [
+        (r"(?i:soci[eé]t[eé] g[eé]n[eé]rale)", 10),
+        (r"(?i:societegenerale\.fr)", 8),
+    ],
+    "CIC": [
+        (r"Banque CIC\b", 10),
+        (r"(?i:cr[eé]dit industriel et commercial)", 10),
+        (r"(?i:\bcic\.fr\b)", 8),
+        (r"\bCIC\b", 6),
+    ],
+    "CREDIT_MUTUEL": [
+        (r"(?i:cr[eé]dit mutuel)", 10),
+        (r"(?i:creditmutuel\.fr)", 8),
+    ],
+    "LCL": [
+        (r"(?i:cr[eé]dit lyonnais)", 10),
+        (r"(?i:\blcl\.fr\b)", 8),
+        (r"\bLCL\b", 6),
+    ],
+    "BNP": [
+        (r"(?i:bnp paribas)", 10),
+        (r"(?i:mabanque\.bnpparibas)", 8),
+    ],
+}
+
+# Score minimal pour retenir une banque
+MIN_SCORE = 6
+
+# Toutes les signatures compilées en une seule alternative à groupes nommés :
+# un seul passage sur le texte, quel que soit le nombre de signatures
+_GROUPS = {}
+_alternatives = []
+for _bank, _signatures in BANK_SIGNATURES.items():
+    for _pattern, _weight in _signatures:
+        _name = f"s{len(_GROUPS)}"
+        _GROUPS[_name] = (_bank, _weight)
+        _alternatives.append(f"(?P<{_name}>{_pattern})")
+SIGNATURE_PATTERN = re.compile("|".join(_alternatives))
+
+
+class AmbiguousBankError(ValueError):
+    """Plusieurs banques obtiennent le meilleur score de détection"""
+
+    def __init__(self, scores: Dict[str, int]):
+        self.scores = scores
+        candidates = ", ".join(f"{bank} ({score})" for bank, score in
+                               sorted(scores.items(), key=lambda item: -item[1]) if score)
+        super().__init__(f"Banque ambiguë, plusieurs signatures reconnues : {candidates}")
+
+
+def score_banks(text: str) -> Dict[str, int]:
+    """Score de chaque banque : somme des poids des signatures distinctes trouvées"""
+    scores = dict.fromkeys(BANK_SIGNATURES, 0)
+    seen = set()
+    for match in SIGNATURE_PATTERN.finditer(text):
+        name = match.lastgroup
+        if name not in seen:
+            seen.add(name)
+            bank, weight = _GROUPS[name]
+            scores[bank] += weight
+    return scores
+
+
+def detect_bank(text: str) -> Optional[str]:
+    """
+    Retourne la banque la mieux notée, ou None si aucune n'atteint MIN_SCORE.
+
+    Lève AmbiguousBankError si plusieurs banques sont à égalité en tête.
+    """
+    scores = score_banks(text)
+    ranked = sorted((score for score in scores.values() if score >= MIN_SCORE), reverse=True)
+    if not ranked:
+        return None
+    if len(ranked) > 1 and ranked[0] == ranked[1]:
+        raise AmbiguousBankError(scores)
+    return max(scores, key=scores.get)
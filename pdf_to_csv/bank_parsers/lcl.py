@@ -1,37 +1,20 @@
 import re
-import pdfplumber
-import pypdf
 from typing import List, Dict
+from pdf_to_csv.utils.records import as_table
+from .base import BankParser
+from .rules import LCL_SECTION, LCL_SKIP
 
-class LclParser:
-    def __init__(self, pdf_path: str):
-        self.pdf_path = pdf_path
-        
-    def extract_transactions(self) -> List[Dict]:
-        """Extrait les transactions depuis le PDF LCL"""
-        return self._extract_from_pdf(self.pdf_path)
-    
-    def _extract_from_pdf(self, pdf_path: str) -> List[Dict]:
-        """Extrait le texte du PDF et parse les transactions"""
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                full_text = "\n".join(page.extract_text() for page in pdf.pages)
-            return self._extract_from_text(full_text)
-        except Exception as e:
-            print(f"Erreur pdfplumber: {e}, tentative avec pypdf...")
-            try:
-                with open(pdf_path, 'rb') as f:
-                    pdf = pypdf.PdfReader(f)
-                    full_text = "\n".join(page.extract_text() for page in pdf.pages)
-                return self._extract_from_text(full_text)
-            except Exception as e2:
-                print(f"Erreur pypdf: {e2}")
-                return []
+class LclParser(BankParser):
+    BANK = "LCL"
+
+    TABLE_COLUMNS = {'DATE': "DATE", 'LIBELLE': "LIBELLE", 'DATE_VALEUR': "VALEUR",
+                     'DEBIT': "DEBIT", 'CREDIT': "CREDIT"}
+    # Les lignes de référence sous une écriture ne font pas partie du libellé
+    LAYOUT_MULTILINE = False
 
-    def _extract_from_text(self, text: str) -> List[Dict]:
-        """Parse les transactions depuis le texte brut"""
+    def _parse_lines(self, lines: List[str]) -> List[Dict]:
+        """Parse les transactions depuis les lignes du texte brut"""
         transactions = []
-        lines = text.split('\n')
         
         # Pattern pour les lignes de transaction LCL
         # Format: Date Libellé Date_valeur Montant
@@ -43,16 +26,13 @@ class LclParser:
             r'(\.)?$'                     # Point final pour crédit
         )
         
-        # Pattern pour détecter les sections à ignorer
-        ignore_pattern = re.compile(r'^(Page \d|LIBELLE:|REF\.|ID\.|MANDAT:)')
-        
         in_transactions_section = False
         
         for i, line in enumerate(lines):
             line = line.strip()
             
             # Détecter le début de la section des transactions
-            if "ECRITURES DE LA PERIODE" in line:
+            if LCL_SECTION in line:
                 in_transactions_section = True
                 continue
                 
@@ -60,7 +40,7 @@ class LclParser:
                 continue
                 
             # Ignorer les lignes de référence/mandat
-            if ignore_pattern.match(line):
+            if LCL_SKIP.matches(line):
                 continue
                 
             match = trans_pattern.match(line)
@@ -79,11 +59,15 @@ class LclParser:
                     'DATE_VALEUR': date_val,
                     'LIBELLE': description,
                     'DEBIT': None if is_credit else amount_clean,
-                    'CREDIT': amount_clean if is_credit else None
+                    'CREDIT': amount_clean if is_credit else None,
+                    '_line': i
                 })
                 
         return transactions
 
+    def _is_context_line(self, line: str) -> bool:
+        return LCL_SECTION in line
+
 def save_to_csv(transactions: List[Dict], output_path: str = 'transactions_lcl.csv'):
     """Sauvegarde les transactions en CSV"""
     if not transactions:
@@ -91,7 +75,7 @@ def save_to_csv(transactions: List[Dict], output_path: str = 'transactions_lcl.c
         return
     
     import pandas as pd
-    df = pd.DataFrame(transactions)
+    df = as_table(transactions).to_dataframe()
     
     # Conversion des types
     df['DATE'] = pd.to_datetime(df['DATE'], format='%d.%m')
@@ -0,0 +1,141 @@
+import re
+from typing import Iterable, Optional
+
+
+class LineRules:
+    """
+    Règles de classement d'une ligne, compilées une fois en une seule expression.
+
+    - ``contains`` : chaînes littérales recherchées n'importe où dans la ligne
+    - ``prefixes`` : expressions régulières ancrées en début de ligne
+
+    Toutes les règles forment une seule alternative : une ligne est testée en
+    un passage, quel que soit le nombre de règles.
+    """
+
+    def __init__(self, contains: Iterable[str] = (), prefixes: Iterable[str] = (),
+                 ignore_case: bool = False):
+        self.contains = tuple(contains)
+        self.prefixes = tuple(prefixes)
+        self.ignore_case = ignore_case
+        alternatives = [f"^(?:{prefix})" for prefix in self.prefixes]
+        alternatives += [re.escape(text) for text in self.contains]
+        # (?!) : aucune règle, aucune ligne reconnue
+        self.pattern = re.compile("|".join(alternatives) or "(?!)",
+                                  re.IGNORECASE if ignore_case else 0)
+
+    def matches(self, line: str) -> bool:
+        """Indique si au moins une règle reconnaît la ligne"""
+        return self.pattern.search(line) is not None
+
+    def find(self, line: str) -> Optional[str]:
+        """Texte reconnu par la première règle qui s'applique, ou None"""
+        match = self.pattern.search(line)
+        return match.group() if match else None
+
+    def extend(self, contains: Iterable[str] = (), prefixes: Iterable[str] = ()) -> "LineRules":
+        """Nouvelles règles : celles-ci complétées par ``contains`` et ``prefixes``"""
+        return LineRules(self.contains + tuple(contains), self.prefixes + tuple(prefixes),
+                         self.ignore_case)
+
+
+# --- Société Générale ---
+
+# Lignes d'en-tête et de pied de page exclues des libellés multilignes
+SG_SKIP = LineRules(contains=[
+    'Date', 'Valeur', 'Nature', 'Débit', 'Crédit',
+    'RELEVÉ DE COMPTE', 'COMPTE D\'ENTREPRISE',
+    'Page \\d', 'envoi n°',
+    'VOS CONTACTS', 'Votre Banque à Distance',
+    'TOTAUX DES MOUVEMENTS', 'NOUVEAU SOLDE',
+    '*Opération exonérée', 'PROGRAMME DE FIDÉLITÉ',
+    'Rappel des seuils', 'suite>>',
+])
+
+# Intitulés de colonnes : un montant isolé qui les contient n'est pas un crédit
+SG_AMOUNT_LABELS = LineRules(contains=['débit', 'date', 'valeur'], ignore_case=True)
+
+# --- Crédit Mutuel ---
+
+CREDIT_MUTUEL_SKIP = LineRules(contains=[
+    'Date', 'Opération', 'Débit', 'Crédit',
+    'Information sur la protection',
+    'Crédit Mutuel',
+    'Sous réserve des extournes',
+    'Page \\d',
+    'Total des mouvements',
+    'SOLDE CREDITEUR',
+    '<<Suite au verso>>',
+    '(GE) : protégé par la Garantie de l\'Etat',
+    '(GD) : protégé par la Garantie des Dépôts',
+    'www.garantiedesdepots.fr',
+    'IBAN :',
+    'BIC :',
+])
+
+# --- LCL ---
+
+LCL_SECTION = "ECRITURES DE LA PERIODE"
+
+# Lignes de référence / mandat
+LCL_SKIP = LineRules(prefixes=[r'Page \d', 'LIBELLE:', r'REF\.', r'ID\.', 'MANDAT:'])
+
+# --- CIC (relevés au format CIC ou Crédit Mutuel) ---
+
+CIC_SKIP = LineRules(contains=[
+    "Page", "Sous réserve", "Total des mouvements", "SOLDE CREDITEUR",
+    "<<Suite au verso>>", "Information sur la protection", "Date Date valeur",
+])
+
+# Fin d'un libellé multiligne
+CIC_STOP = LineRules(contains=[
+    "Page", "Sous réserve", "Total des mouvements",
+    "SOLDE CREDITEUR", "<<Suite", "Date Date valeur",
+])
+
+# Opérations typiquement créditrices / débitrices (libellé en majuscules)
+CIC_CREDIT_KEYWORDS = LineRules(contains=['REMCB', 'REM CHQ', 'VRST', 'VIR INST'])
+CIC_DEBIT_KEYWORDS = LineRules(contains=[
+    'PAIEMENT CB', 'PAIEMENT PSC', 'CHEQUE', 'PRLV SEPA', 'COMCB', 'FACT',
+])
+
+# --- BNP Paribas ---
+
+BNP_DATE = r"\d{2}\.\d{2}\.\d{2}"
+BNP_AMOUNT = r"\d{1,3}(?:\s\d{3})*,\d{2}"
+
+# Sections d'opérations et sens des montants
+BNP_SECTIONS = {
+    "VIREMENTS RECUS": {"type": "credit", "keywords": ["VIR SEPA RECU"]},
+    "AUTRES OPERATIONS CREDIT": {"type": "credit", "keywords": ["REMBOURST"]},
+    "PAIEMENTS PAR CARTES": {"type": "debit", "keywords": ["DU "]},
+    "VIREMENTS EMIS": {"type": "debit", "keywords": ["VIREMENT SEPA EMIS"]},
+    "PRELEVEMENTS, AMORTISSEMENTS DE PRETS": {"type": "debit", "keywords": ["PRLV SEPA"]},
+    "AUTRES OPERATIONS DEBIT": {"type": "debit", "keywords": ["COMMISSIONS"]},
+}
+
+# En-tête ouvrant une section (``find`` renvoie son nom)
+BNP_SECTION_HEADER = LineRules(contains=list(BNP_SECTIONS))
+
+# Fin de section : début d'une autre section, total ou sous-total
+BNP_SECTION_END = BNP_SECTION_HEADER.extend(contains=["TOTAL DES OPERATIONS", "Sous total..."])
+
+BNP_SKIP = LineRules(
+    prefixes=[
+        "- CARTE N°", r"Page \d+", "BNP PARIBAS SA", "3478", r"P\.",
+        r"\d{12}$", "SORPSITSPREPFC",
+    ],
+    contains=[
+        "RELEVE DE VOTRE COMPTE", "Raison sociale", "RIB :", "IBAN :", "BIC :",
+        "Les sommes déposées", "www.garantiedesdepots.fr", "Relevé N°",
+        "PERIODE DU", "Solde au", "Votre chargé d'Affaires", "DATE COMPTABLE",
+        "NATURE DES OPERATIONS", "DATE DE VALEUR", "DEBIT CREDIT",
+    ],
+)
+
+# Fin d'un libellé multiligne : nouvelle opération, fin de section, ligne
+# ignorée ou montant isolé (la ligne vide est testée à part)
+BNP_DESCRIPTION_STOP = BNP_SKIP.extend(
+    contains=BNP_SECTION_END.contains,
+    prefixes=[BNP_DATE, BNP_AMOUNT + "$"],
+)
@@ -1,38 +1,18 @@
 import re
-import pandas as pd
-import pdfplumber
-import pypdf
 from typing import List, Dict
+from pdf_to_csv.utils.records import as_table
+from .base import BankParser
+from .rules import SG_AMOUNT_LABELS, SG_SKIP
 
-class SocieteGeneraleParser:
-    def __init__(self, pdf_path: str):
-        self.pdf_path = pdf_path
-        
-    def extract_transactions(self) -> List[Dict]:
-        """Extrait les transactions depuis le PDF Société Générale"""
-        return self._extract_from_pdf(self.pdf_path)
-    
-    def _extract_from_pdf(self, pdf_path: str) -> List[Dict]:
-        """Extrait le texte du PDF et parse les transactions"""
-        try:
-            with pdfplumber.open(pdf_path) as pdf:
-                full_text = "\n".join(page.extract_text() for page in pdf.pages)
-            return self._extract_from_text(full_text)
-        except Exception as e:
-            print(f"Erreur pdfplumber: {e}, tentative avec pypdf...")
-            try:
-                with open(pdf_path, 'rb') as f:
-                    pdf = pypdf.PdfReader(f)
-                    full_text = "\n".join(page.extract_text() for page in pdf.pages)
-                return self._extract_from_text(full_text)
-            except Exception as e2:
-                print(f"Erreur pypdf: {e2}")
-                return []
+class SocieteGeneraleParser(BankParser):
+    BANK = "SOCIETE_GENERALE"
+
+    TABLE_COLUMNS = {'DATE': "Date", 'DATE_VALEUR': "Valeur", 'LIBELLE': "Nature",
+                     'DEBIT': "Débit", 'CREDIT': "Crédit"}
 
-    def _extract_from_text(self, text: str) -> List[Dict]:
-        """Parse les transactions depuis le texte brut"""
+    def _parse_lines(self, lines: List[str]) -> List[Dict]:
+        """Parse les transactions depuis les lignes du texte brut"""
         transactions = []
-        lines = text.split('\n')
         
         # Pattern pour les lignes de transaction Société Générale
         trans_pattern = re.compile(
@@ -63,15 +43,7 @@ class SocieteGeneraleParser:
                         
                     # Ignorer les lignes non pertinentes
                     if (next_line and 
-                        not any(x in next_line for x in [
-                            'Date', 'Valeur', 'Nature', 'Débit', 'Crédit',
-                            'RELEVÉ DE COMPTE', 'COMPTE D\'ENTREPRISE',
-                            'Page \\d', 'envoi n°', 
-                            'VOS CONTACTS', 'Votre Banque à Distance',
-                            'TOTAUX DES MOUVEMENTS', 'NOUVEAU SOLDE',
-                            '*Opération exonérée', 'PROGRAMME DE FIDÉLITÉ',
-                            'Rappel des seuils', 'suite>>'
-                        ]) and
+                        not SG_SKIP.matches(next_line) and
                         len(description) < 200):  # Limite de longueur
                         
                         # Nettoyage des espaces et éléments parasites
@@ -90,7 +62,7 @@ class SocieteGeneraleParser:
                 for k in range(j, min(j+3, len(lines))):
                     next_line = lines[k].strip()
                     credit_match = re.match(r'^(\d{1,3}(?:\.\d{3})*,\d{2})$', next_line)
-                    if credit_match and not any(x in next_line.lower() for x in ['débit', 'date', 'valeur']):
+                    if credit_match and not SG_AMOUNT_LABELS.matches(next_line):
                         credit = credit_match.group()
                         j = k + 1
                         break
@@ -108,7 +80,8 @@ class SocieteGeneraleParser:
                     'DATE_VALEUR': date_val,
                     'LIBELLE': description,
                     'DEBIT': clean_amount(debit),
-                    'CREDIT': clean_amount(credit)
+                    'CREDIT': clean_amount(credit),
+                    '_line': i
                 })
                 
                 i = j  # Avancer à la ligne suivante
@@ -123,7 +96,8 @@ def save_to_csv(transactions: List[Dict], output_path: str = 'transactions_sg.cs
         print("Aucune transaction à exporter")
         return
     
-    df = pd.DataFrame(transactions)
+    import pandas as pd
+    df = as_table(transactions).to_dataframe()
     
     # Conversion des types
     df['DATE'] = pd.to_datetime(df['DATE'], format='%d/%m/%Y')
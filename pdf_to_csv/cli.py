@@ -0,0 +1,342 @@
+"""
+Conversion en lot de relevés bancaires PDF, sans interface Streamlit.
+
+Exemples :
+    pdf-to-csv releves/ -o sorties/
+    pdf-to-csv "archives/**/*.pdf" --merge toutes_transactions.csv --jobs 4
+    pdf-to-csv releves/ --metrics metriques.prom -v
+    pdf-to-csv releves/ --parquet   # + un Parquet typé par relevé
+    pdf-to-csv releves/ --merge-excel releves.xlsx   # un classeur, une feuille par relevé
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import ExitStack
+from typing import Dict, List, Optional
+
+MANIFEST_NAME = ".pdf_to_csv_manifest.json"
+
+
+def collect_inputs(patterns: List[str]) -> List[str]:
+    """Résout fichiers, motifs glob et répertoires en une liste de PDF sans doublon"""
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            matches = glob.glob(os.path.join(pattern, "**", "*"), recursive=True)
+            matches = [m for m in matches if m.lower().endswith(".pdf")]
+        elif os.path.isfile(pattern):
+            matches = [pattern]
+        else:
+            matches = glob.glob(pattern, recursive=True)
+        for match in sorted(matches):
+            path = os.path.abspath(match)
+            if os.path.isfile(path) and path not in paths:
+                paths.append(path)
+    return paths
+
+
+def file_signature(pdf_path: str) -> Dict:
+    """Taille et date de modification, pour détecter un fichier modifié depuis le dernier run"""
+    stat = os.stat(pdf_path)
+    return {"size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def load_manifest(manifest_path: str) -> Dict:
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest: Dict, manifest_path: str):
+    """Écriture atomique : un run interrompu ne laisse jamais un manifeste tronqué"""
+    tmp_path = manifest_path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, ensure_ascii=False)
+    os.replace(tmp_path, manifest_path)
+
+
+def conversion_options(args: argparse.Namespace) -> Dict:
+    """
+    Options qui changent le contenu des sorties, enregistrées dans le manifeste.
+
+    Le mode colonnes et le moteur retiennent la valeur des variables
+    d'environnement quand l'option n'est pas donnée.
+    """
+    from pdf_to_csv.bank_parsers.base import DEFAULT_LAYOUT
+    from pdf_to_csv.utils.backends import FORCED_BACKEND
+
+    return {
+        "sep": args.sep,
+        "decimal": args.decimal,
+        "layout": DEFAULT_LAYOUT if args.layout is None else args.layout,
+        "backend": args.backend or FORCED_BACKEND,
+        "excel_sections": bool(args.excel and args.excel_sections),
+    }
+
+
+def is_done(entry: Dict, pdf_path: str, output: str, parquet: bool = False, excel: bool = False,
+            options: Optional[Dict] = None) -> bool:
+    """
+    Un fichier est déjà traité si son entrée est OK, inchangée, ses sorties
+    présentes à l'emplacement attendu (``output`` : un autre répertoire de
+    sortie ou un renommage pour éviter une collision le déplace) et produites
+    avec les mêmes ``options`` (voir ``conversion_options``)
+    """
+    return (entry.get("status") == "ok"
+            and entry.get("signature") == file_signature(pdf_path)
+            and entry.get("options") == options
+            and entry.get("output") == output
+            and os.path.exists(output)
+            and (not parquet or os.path.exists(entry.get("parquet", "")))
+            and (not excel or os.path.exists(entry.get("excel", ""))))
+
+
+def output_paths(pdf_paths: List[str], output_dir: str) -> Dict[str, str]:
+    """Associe à chaque PDF un fichier CSV de sortie, sans collision de noms"""
+    outputs = {}
+    used = set()
+    for pdf_path in pdf_paths:
+        stem = os.path.splitext(os.path.basename(pdf_path))[0]
+        name = stem
+        index = 2
+        while name in used:
+            name = f"{stem}_{index}"
+            index += 1
+        used.add(name)
+        outputs[pdf_path] = os.path.join(output_dir, name + ".csv")
+    return outputs
+
+
+def convert_file(pdf_path: str, output_path: str, sep: str, decimal: str,
+                 layout: Optional[bool] = None, backend: Optional[str] = None,
+                 parquet: bool = False, excel: bool = False, excel_sections: bool = False) -> Dict:
+    """
+    Convertit un PDF en CSV (exécuté dans un processus du pool).
+
+    Avec ``parquet`` et ``excel``, les transactions sont aussi écrites
+    typées dans un Parquet et un classeur Excel à côté du CSV, pendant le
+    même passage ; ``excel_sections`` met chaque section dans sa feuille.
+    """
+    from pdf_to_csv.bank_parsers import get_parser
+    from pdf_to_csv.utils.export_utils import ExcelStreamWriter, ParquetStreamWriter, write_csv_stream
+    from pdf_to_csv.utils.metrics import collect_metrics
+
+    start = time.perf_counter()
+    with collect_metrics() as metrics:
+        try:
+            parser = get_parser(pdf_path, workers=1, layout=layout, backend=backend)
+            transactions = parser.iter_transactions()
+            with ExitStack() as stack:
+                if parquet:
+                    parquet_path = os.path.splitext(output_path)[0] + ".parquet"
+                    writer = stack.enter_context(
+                        ParquetStreamWriter(parquet_path, parser.BANK, period=parser.period))
+                    transactions = writer.tee(transactions)
+                if excel:
+                    excel_path = os.path.splitext(output_path)[0] + ".xlsx"
+                    workbook = stack.enter_context(
+                        ExcelStreamWriter(excel_path, parser.BANK, excel_sections, period=parser.period))
+                    transactions = workbook.tee(transactions)
+                count = write_csv_stream(transactions, output_path, sep, decimal)
+            entry = {
+                "status": "ok",
+                "bank": type(parser).__name__,
+                "transactions": count,
+                "output": output_path,
+            }
+            if parquet:
+                entry["parquet"] = parquet_path
+            if excel:
+                entry["excel"] = excel_path
+        except Exception as e:
+            logging.getLogger(__name__).debug("Échec de conversion de %s", pdf_path, exc_info=True)
+            entry = {
+                "status": "error",
+                "error": str(e),
+                "transactions": 0,
+                "output": output_path,
+            }
+    entry["duration"] = time.perf_counter() - start
+    entry["metrics"] = metrics.to_dict()
+    return entry
+
+
+def write_metrics(results: Dict[str, Dict], metrics_path: str):
+    """
+    Écrit les métriques par étape des fichiers convertis pendant ce run.
+
+    Format texte Prometheus si le fichier se termine par ``.prom``, JSON sinon.
+    """
+    from pdf_to_csv.utils.metrics import metrics_to_prometheus
+
+    converted = {p: e for p, e in results.items() if "metrics" in e and e["status"] != "skipped"}
+    with open(metrics_path, "w", encoding="utf-8") as f:
+        if metrics_path.endswith(".prom"):
+            f.write(metrics_to_prometheus([
+                ({"file": os.path.basename(p), "status": e["status"]}, e["metrics"])
+                for p, e in converted.items()
+            ]))
+        else:
+            json.dump({p: e["metrics"] for p, e in converted.items()}, f, indent=2, ensure_ascii=False)
+
+
+def configure_logging(verbosity: int):
+    """Active les messages de la bibliothèque (-v : INFO, -vv : DEBUG) ; silencieux sinon"""
+    if verbosity:
+        # Seuls les messages de pdf_to_csv sont détaillés, pas ceux de pdfminer
+        logging.basicConfig(format="%(asctime)s %(processName)s %(name)s %(levelname)s %(message)s")
+        logging.getLogger("pdf_to_csv").setLevel(logging.DEBUG if verbosity > 1 else logging.INFO)
+
+
+def merge_outputs(entries: List[Dict], merge_path: str, sep: str):
+    """Concatène les CSV individuels dans un seul fichier avec une colonne SOURCE"""
+    import pandas as pd
+
+    frames = []
+    for pdf_path, entry in entries:
+        df = pd.read_csv(entry["output"], sep=sep, dtype=str, keep_default_na=False)
+        df.insert(0, "SOURCE", os.path.basename(pdf_path))
+        frames.append(df)
+    merged = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    merged.to_csv(merge_path, sep=sep, index=False)
+
+
+def merge_excel(entries: List[Dict], merge_path: str, sep: str):
+    """
+    Écrit les transactions de tous les relevés dans un classeur Excel, une
+    feuille par relevé. Les CSV individuels sont relus ligne à ligne : la
+    mémoire reste constante quel que soit le nombre de transactions.
+    """
+    import csv
+    from pdf_to_csv.utils.export_utils import ExcelStreamWriter
+
+    with ExcelStreamWriter(merge_path) as writer:
+        for pdf_path, entry in entries:
+            # Nom du CSV : unique même pour deux PDF homonymes
+            sheet = os.path.splitext(os.path.basename(entry["output"]))[0]
+            with open(entry["output"], newline="", encoding="utf-8") as f:
+                for row in csv.DictReader(f, delimiter=sep):
+                    writer.write(row, sheet)
+
+
+def print_summary(results: Dict[str, Dict]):
+    """Affiche le bilan par fichier : statut, nombre de transactions, durée"""
+    width = max([len(os.path.basename(p)) for p in results] + [7])
+    print(f"\n{'Fichier'.ljust(width)}  {'Statut':<8} {'Trans.':>7} {'Durée':>8}")
+    for pdf_path, entry in results.items():
+        status = entry["status"]
+        line = (f"{os.path.basename(pdf_path).ljust(width)}  {status:<8} "
+                f"{entry.get('transactions', 0):>7} {entry.get('duration', 0):>7.2f}s")
+        if status == "error":
+            line += f"  {entry.get('error', '')}"
+        print(line)
+    failed = sum(1 for e in results.values() if e["status"] == "error")
+    print(f"\n{len(results)} fichier(s), {failed} en erreur")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    from pdf_to_csv.utils.backends import BACKENDS
+
+    parser = argparse.ArgumentParser(
+        prog="pdf-to-csv",
+        description="Convertit des relevés bancaires PDF en CSV.",
+    )
+    parser.add_argument("inputs", nargs="+", help="Fichiers PDF, motifs glob ou répertoires")
+    parser.add_argument("-o", "--output-dir", default=".",
+                        help="Répertoire des CSV par fichier et du manifeste (défaut: .)")
+    parser.add_argument("--merge", metavar="FICHIER",
+                        help="Écrit aussi toutes les transactions dans un seul CSV")
+    parser.add_argument("-j", "--jobs", type=int, default=os.cpu_count(),
+                        help="Nombre de processus de conversion")
+    parser.add_argument("--sep", default=";", help="Séparateur de champ (défaut: ;)")
+    parser.add_argument("--decimal", default=",", help="Séparateur décimal (défaut: ,)")
+    parser.add_argument("--force", action="store_true",
+                        help="Reconvertit aussi les fichiers déjà traités")
+    parser.add_argument("--layout", action="store_true", default=None,
+                        help="Lit les colonnes du tableau d'après la position des mots")
+    parser.add_argument("--backend", choices=sorted(BACKENDS),
+                        help="Moteur d'extraction du texte (défaut: celui des parsers, pdfplumber)")
+    parser.add_argument("--parquet", action="store_true",
+                        help="Écrit aussi un Parquet typé (dates, centimes) par relevé")
+    parser.add_argument("--excel", action="store_true",
+                        help="Écrit aussi un classeur Excel (.xlsx) par relevé")
+    parser.add_argument("--excel-sections", action="store_true",
+                        help="Une feuille par section dans les classeurs Excel par relevé")
+    parser.add_argument("--merge-excel", metavar="FICHIER",
+                        help="Écrit aussi toutes les transactions dans un classeur Excel, une feuille par relevé")
+    parser.add_argument("--metrics", metavar="FICHIER",
+                        help="Écrit les temps et compteurs par étape (JSON, ou Prometheus si .prom)")
+    parser.add_argument("-v", "--verbose", action="count", default=0,
+                        help="Affiche les messages de traitement (-vv pour le détail)")
+    return parser
+
+
+def main(argv=None) -> int:
+    args = build_arg_parser().parse_args(argv)
+    configure_logging(args.verbose)
+
+    pdf_paths = collect_inputs(args.inputs)
+    if not pdf_paths:
+        print("Aucun fichier PDF trouvé", file=sys.stderr)
+        return 1
+
+    os.makedirs(args.output_dir, exist_ok=True)
+    manifest_path = os.path.join(args.output_dir, MANIFEST_NAME)
+    manifest = {} if args.force else load_manifest(manifest_path)
+    outputs = output_paths(pdf_paths, args.output_dir)
+
+    options = conversion_options(args)
+    results = {}
+    pending = []
+    for pdf_path in pdf_paths:
+        entry = manifest.get(pdf_path, {})
+        if is_done(entry, pdf_path, outputs[pdf_path], args.parquet, args.excel, options):
+            results[pdf_path] = dict(entry, status="skipped")
+        else:
+            pending.append(pdf_path)
+
+    with ProcessPoolExecutor(max_workers=max(1, args.jobs), initializer=configure_logging,
+                             initargs=(args.verbose,)) as executor:
+        futures = {
+            executor.submit(convert_file, pdf_path, outputs[pdf_path], args.sep, args.decimal,
+                            args.layout, args.backend, args.parquet, args.excel,
+                            args.excel_sections): pdf_path
+            for pdf_path in pending
+        }
+        for future in as_completed(futures):
+            pdf_path = futures[future]
+            entry = future.result()
+            entry["signature"] = file_signature(pdf_path)
+            entry["options"] = options
+            manifest[pdf_path] = entry
+            results[pdf_path] = entry
+            # Manifeste mis à jour après chaque fichier pour pouvoir reprendre
+            save_manifest(manifest, manifest_path)
+
+    results = {pdf_path: results[pdf_path] for pdf_path in pdf_paths}
+
+    if args.merge:
+        done = [(p, e) for p, e in results.items() if e["status"] in ("ok", "skipped")]
+        merge_outputs(done, args.merge, args.sep)
+        print(f"Transactions fusionnées dans {args.merge}")
+
+    if args.merge_excel:
+        done = [(p, e) for p, e in results.items() if e["status"] in ("ok", "skipped")]
+        merge_excel(done, args.merge_excel, args.sep)
+        print(f"Transactions fusionnées dans {args.merge_excel}")
+
+    if args.metrics:
+        write_metrics(results, args.metrics)
+
+    print_summary(results)
+    return 1 if any(e["status"] == "error" for e in results.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
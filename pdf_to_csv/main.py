@@ -1,59 +1,106 @@
 import sys
 import os
+import time
+import hashlib
+import json
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 import streamlit as st
-import pandas as pd
 from pdf_to_csv.bank_parsers import get_parser
-import os
-from pdf_to_csv.utils.date_utils import parse_date
-from pdf_to_csv.utils.ocr_utils import extract_text_from_scanned_pdf
+from pdf_to_csv.utils.export_utils import excel_bytes, parquet_bytes, transactions_to_dataframe
+from pdf_to_csv.utils.metrics import collect_metrics, merge_metrics, metrics_to_prometheus, stage
+from pdf_to_csv.utils.normalize import normalize_transactions
 
 st.set_page_config(page_title="PDF Bancaire vers CSV", layout="wide")
 
+@st.cache_data(show_spinner=False, max_entries=32)
+def parse_pdf(content_hash, _pdf_bytes, _run, layout=False):
+    """
+    Détecte la banque, extrait les transactions et calcule les totaux.
+
+    Mis en cache sur l'empreinte du fichier : changer une option de formatage
+    ne relance pas l'analyse. ``_run`` (non haché) est marqué quand l'analyse
+    est réellement exécutée, pour distinguer un résultat issu du cache.
+    ``layout`` active l'extraction par position des colonnes.
+    """
+    _run["parsed"] = True
+    start = time.perf_counter()
+    
+    with collect_metrics() as metrics:
+        # Le PDF est lu directement en mémoire : pas de fichier partagé entre
+        # sessions concurrentes
+        parser = get_parser(_pdf_bytes, layout=layout)
+        period = parser.period
+        transactions = parser.extract_transactions()
+        
+        # Conversion en DataFrame avec colonne montant unifiée
+        df = transactions_to_dataframe(transactions)
+        # Colonnes typées (dates, centimes) pour les totaux et l'export Parquet
+        typed = normalize_transactions(transactions, parser.BANK, period)
+    stats = {
+        "bank": parser.BANK,
+        "period": period,
+        "total_debit": typed['DEBIT_CENTS'].sum() / 100,
+        "total_credit": typed['CREDIT_CENTS'].sum() / 100,
+        "duration": time.perf_counter() - start,
+        "metrics": metrics.to_dict(),
+    }
+    return transactions, df, typed, stats
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def build_csv(content_hash, _df, delimiter, decimal_sep, layout=False):
+    """Sérialise le DataFrame en CSV (mis en cache par fichier et par options)"""
+    with collect_metrics() as metrics, stage("csv", items=len(_df)):
+        csv = _df.to_csv(sep=delimiter, decimal=decimal_sep, index=False)
+    return csv, metrics.to_dict()
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def build_parquet(content_hash, _typed, layout=False):
+    """Sérialise les colonnes typées en Parquet (mis en cache par fichier)"""
+    with collect_metrics() as metrics:
+        data = parquet_bytes(_typed)
+    return data, metrics.to_dict()
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def build_excel(content_hash, _transactions, bank, by_section=False, layout=False, _period=None):
+    """Écrit le classeur Excel (mis en cache par fichier et par découpage en feuilles)"""
+    with collect_metrics() as metrics:
+        data = excel_bytes(_transactions, bank, by_section, _period)
+    return data, metrics.to_dict()
+
 def main():
     st.title("Convertisseur de relevés bancaires PDF vers CSV")
     
+    # Options de formatage
+    st.sidebar.header("Options CSV")
+    decimal_sep = st.sidebar.selectbox("Séparateur décimal", [",", "."])
+    delimiter = st.sidebar.selectbox("Séparateur de champ", [";", ","])
+    st.sidebar.header("Extraction")
+    layout = st.sidebar.checkbox(
+        "Lire les colonnes par position",
+        help="Affecte débit et crédit d'après la colonne du montant dans le tableau")
+    st.sidebar.header("Options Excel")
+    by_section = st.sidebar.checkbox(
+        "Une feuille par section",
+        help="Sépare les sections du relevé (virements, cartes...) dans des feuilles distinctes")
+    
     # Upload du fichier
     uploaded_file = st.file_uploader("Télécharger un relevé bancaire PDF", type="pdf")
     
     if uploaded_file:
-        # Sauvegarde temporaire du fichier
-        with open("temp.pdf", "wb") as f:
-            f.write(uploaded_file.getbuffer())
+        pdf_bytes = uploaded_file.getvalue()
+        content_hash = hashlib.sha256(pdf_bytes).hexdigest()
         
         try:
             # Détection du type de banque et extraction des données
+            run = {"parsed": False}
             with st.spinner("Extraction de transactions en cours..."):
-                parser = get_parser("temp.pdf")
-            
-            with st.status("Analyse des transactions...", expanded=False) as status:
-                transactions = parser.extract_transactions()
-                status.update(label="Analyse terminée", state="complete")
-            
-            # Conversion en DataFrame
-            with st.spinner("Création du DataFrame..."):
-                df = pd.DataFrame(transactions)
-                
-                # S'assurer que les colonnes DEBIT et CREDIT existent
-                if 'DEBIT' not in df.columns:
-                    df['DEBIT'] = None
-                if 'CREDIT' not in df.columns:
-                    df['CREDIT'] = None
-            
-            # Création colonne montant unifiée avec gestion d'erreur
-            try:
-                credit_values = pd.to_numeric(df['CREDIT'], errors='coerce').fillna(0)
-                debit_values = pd.to_numeric(df['DEBIT'], errors='coerce').fillna(0)
-                df['montant'] = credit_values - debit_values
-            except Exception as e:
-                st.error(f"Erreur lors du calcul du montant: {e}")
-                df['montant'] = 0
+                transactions, df, typed, stats = parse_pdf(content_hash, pdf_bytes, run, layout)
             
-            # Options de formatage
-            st.sidebar.header("Options CSV")
-            decimal_sep = st.sidebar.selectbox("Séparateur décimal", [",", "."])
-            delimiter = st.sidebar.selectbox("Séparateur de champ", [";", ","])
+            if run["parsed"]:
+                st.caption(f"Analyse effectuée en {stats['duration']:.2f} s")
+            else:
+                st.caption(f"Résultat en cache (analyse initiale : {stats['duration']:.2f} s)")
             
             # Affichage des données
             st.subheader("Aperçu des données")
@@ -63,36 +110,62 @@ def main():
             st.subheader("Statistiques")
             col1, col2, col3 = st.columns(3)
             col1.metric("Nombre de transactions", len(df))
+            col2.metric("Total Débit", f"{stats['total_debit']:.2f} €")
+            col3.metric("Total Crédit", f"{stats['total_credit']:.2f} €")
             
-            # Calcul des totaux avec gestion d'erreur
-            try:
-                total_debit = pd.to_numeric(df['DEBIT'], errors='coerce').sum()
-                total_credit = pd.to_numeric(df['CREDIT'], errors='coerce').sum()
-                col2.metric("Total Débit", f"{total_debit:.2f} €")
-                col3.metric("Total Crédit", f"{total_credit:.2f} €")
-            except Exception as e:
-                col2.metric("Total Débit", "Erreur")
-                col3.metric("Total Crédit", "Erreur")
+            # Conversion en CSV : seule étape refaite quand les options changent
+            csv, csv_metrics = build_csv(content_hash, df, delimiter, decimal_sep, layout)
             
-            # Conversion en CSV
-            with st.status("Génération du fichier CSV...", expanded=False) as status:
-                csv = df.to_csv(sep=delimiter, decimal=decimal_sep, index=False)
-                status.update(label="CSV prêt à être téléchargé", state="complete")
+            parquet, parquet_metrics = build_parquet(content_hash, typed, layout)
+            # Le classeur Excel, long à écrire, n'est construit qu'à la demande
+            # (à nouveau si le fichier ou ses options changent)
+            excel_key = (content_hash, by_section, layout)
+            export_metrics = [csv_metrics, parquet_metrics]
             
-            # Bouton de téléchargement
-            st.download_button(
+            # Boutons de téléchargement
+            col1, col2, col3 = st.columns(3)
+            col1.download_button(
                 label="Télécharger en CSV",
                 data=csv,
                 file_name="releve_bancaire.csv",
                 mime="text/csv"
             )
+            col2.download_button(
+                label="Télécharger en Parquet",
+                data=parquet,
+                file_name="releve_bancaire.parquet",
+                mime="application/vnd.apache.parquet",
+                help="Dates typées et montants en centimes, pour l'analyse"
+            )
+            if st.session_state.get("excel") != excel_key:
+                col3.button("Préparer le fichier Excel",
+                            on_click=lambda: st.session_state.update(excel=excel_key))
+            else:
+                with st.spinner("Écriture du classeur Excel..."):
+                    excel, excel_metrics = build_excel(content_hash, transactions, stats["bank"],
+                                                       by_section, layout, stats["period"])
+                export_metrics.append(excel_metrics)
+                col3.download_button(
+                    label="Télécharger en Excel",
+                    data=excel,
+                    file_name="releve_bancaire.xlsx",
+                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                    help="Dates et montants en cellules typées"
+                )
+            
+            # Temps et compteurs par étape de la conversion
+            metrics = merge_metrics(stats["metrics"], *export_metrics)
+            with st.expander("Métriques de conversion"):
+                st.json(metrics)
+                col1, col2 = st.columns(2)
+                col1.download_button("Exporter en JSON", data=json.dumps(metrics, indent=2),
+                                     file_name="metriques.json", mime="application/json")
+                col2.download_button("Exporter au format Prometheus",
+                                     data=metrics_to_prometheus([({"file": uploaded_file.name}, metrics)]),
+                                     file_name="metriques.prom", mime="text/plain")
             
         except Exception as e:
             st.error(f"Erreur lors du traitement du PDF: {str(e)}")
-        finally:
-            # Nettoyage du fichier temporaire
-            if os.path.exists("temp.pdf"):
-                os.remove("temp.pdf")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,224 @@
+import importlib.util
+import io
+import os
+from typing import Dict, Iterable, List, Optional, Tuple, Type, Union
+
+# En dessous de ce nombre de caractères, une page contenant des images est
+# considérée comme scannée et passée à l'OCR
+MIN_TEXT_CHARS = 20
+
+# Moteurs d'extraction du plus rapide au plus lent (voir bench_pipeline.py) :
+# pypdfium2 (PDFium, en C++) lit une page en quelques millisecondes, pdfminer
+# (sous pdfplumber) met chaque caractère en page en Python
+BACKEND_SPEED = ("pypdfium2", "pypdf", "pdfplumber")
+
+# Moteur imposé quels que soient les moteurs acceptés par le parser
+# (``PDF_TO_CSV_BACKEND=pdfplumber`` par exemple)
+FORCED_BACKEND = os.environ.get("PDF_TO_CSV_BACKEND") or None
+
+
+class TextBackend:
+    """
+    Moteur d'extraction de la couche texte d'un PDF.
+
+    Le PDF est ouvert à la création ; chaque page est extraite à la demande
+    et libérée aussitôt. Les sous-classes déclarent le module qu'elles
+    importent à l'ouverture (``module``) : un moteur dont le module n'est pas
+    installé n'est jamais choisi.
+    """
+
+    name = ""
+    module = ""
+
+    def __init__(self, source: Union[str, bytes]):
+        """:param source: Chemin du PDF ou son contenu"""
+        raise NotImplementedError
+
+    @classmethod
+    def available(cls) -> bool:
+        return importlib.util.find_spec(cls.module) is not None
+
+    @property
+    def page_count(self) -> int:
+        raise NotImplementedError
+
+    def _page_text(self, index: int) -> Tuple[str, bool]:
+        """
+        Texte brut de la page et présence d'images (recherchées seulement si
+        la page est presque vide de texte)
+        """
+        raise NotImplementedError
+
+    def extract_page(self, index: int) -> Tuple[str, bool]:
+        """
+        Couche texte d'une page.
+
+        :return: (texte, scannée) ; une page est scannée si elle contient des
+                 images mais pas assez de texte
+        """
+        text, has_images = self._page_text(index)
+        # Fins de ligne homogènes : les parsers découpent sur « \n »
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text, len(text.strip()) < MIN_TEXT_CHARS and has_images
+
+    def extract_pages(self, indices: Optional[Iterable[int]] = None) -> List[Tuple[str, bool]]:
+        """Couche texte des pages ``indices`` (toutes par défaut), dans l'ordre"""
+        if indices is None:
+            indices = range(self.page_count)
+        return [self.extract_page(i) for i in indices]
+
+    def extract_regions(self, index: int, header_fraction: float, footer_fraction: float) -> str:
+        """
+        Texte du bandeau haut et du bandeau bas d'une page (fractions de sa
+        hauteur). Un moteur qui ne sait pas rogner retourne la page entière.
+        """
+        return self.extract_page(index)[0]
+
+    def close(self):
+        pass
+
+
+class PdfplumberBackend(TextBackend):
+    """pdfminer via pdfplumber : texte remis en page d'après la position des caractères"""
+
+    name = "pdfplumber"
+    module = "pdfplumber"
+
+    def __init__(self, source: Union[str, bytes]):
+        import pdfplumber
+        self.pdf = pdfplumber.open(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pdf.pages)
+
+    def _page_text(self, index: int) -> Tuple[str, bool]:
+        page = self.pdf.pages[index]
+        text = page.extract_text() or ""
+        has_images = len(text.strip()) < MIN_TEXT_CHARS and bool(page.images)
+        # Le texte est en cache : on libère les objets de layout de la page
+        page.flush_cache()
+        return text, has_images
+
+    def extract_regions(self, index: int, header_fraction: float, footer_fraction: float) -> str:
+        # Seuls les caractères des bandeaux rognés sont mis en page
+        page = self.pdf.pages[index]
+        x0, top, x1, bottom = page.bbox
+        height = bottom - top
+        header = page.crop((x0, top, x1, top + height * header_fraction))
+        footer = page.crop((x0, bottom - height * footer_fraction, x1, bottom))
+        return "\n".join(region.extract_text() or "" for region in (header, footer))
+
+    def close(self):
+        self.pdf.close()
+
+
+class PypdfBackend(TextBackend):
+    """pypdf : texte dans l'ordre du flux de contenu, en pur Python"""
+
+    name = "pypdf"
+    module = "pypdf"
+
+    def __init__(self, source: Union[str, bytes]):
+        import pypdf
+        self.reader = pypdf.PdfReader(io.BytesIO(source) if isinstance(source, bytes) else source)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.reader.pages)
+
+    def _page_text(self, index: int) -> Tuple[str, bool]:
+        page = self.reader.pages[index]
+        text = page.extract_text() or ""
+        has_images = len(text.strip()) < MIN_TEXT_CHARS and len(page.images) > 0
+        return text, has_images
+
+
+class Pypdfium2Backend(TextBackend):
+    """PDFium (moteur de Chrome) via pypdfium2"""
+
+    name = "pypdfium2"
+    module = "pypdfium2"
+
+    def __init__(self, source: Union[str, bytes]):
+        import pypdfium2
+        self.pdf = pypdfium2.PdfDocument(source)
+
+    @property
+    def page_count(self) -> int:
+        return len(self.pdf)
+
+    def _page_text(self, index: int) -> Tuple[str, bool]:
+        import pypdfium2.raw as pdfium_c
+        page = self.pdf[index]
+        try:
+            textpage = page.get_textpage()
+            text = textpage.get_text_range()
+            textpage.close()
+            has_images = len(text.strip()) < MIN_TEXT_CHARS and any(
+                True for _ in page.get_objects(filter=[pdfium_c.FPDF_PAGEOBJ_IMAGE]))
+        finally:
+            page.close()
+        return text, has_images
+
+    def extract_regions(self, index: int, header_fraction: float, footer_fraction: float) -> str:
+        page = self.pdf[index]
+        try:
+            # Coordonnées PDF : origine en bas à gauche
+            left, bottom, right, top = page.get_bbox()
+            height = top - bottom
+            textpage = page.get_textpage()
+            regions = [
+                textpage.get_text_bounded(left, top - height * header_fraction, right, top),
+                textpage.get_text_bounded(left, bottom, right, bottom + height * footer_fraction),
+            ]
+            textpage.close()
+        finally:
+            page.close()
+        return "\n".join(regions).replace("\r\n", "\n").replace("\r", "\n")
+
+    def close(self):
+        self.pdf.close()
+
+
+BACKENDS: Dict[str, Type[TextBackend]] = {
+    backend.name: backend for backend in (PdfplumberBackend, PypdfBackend, Pypdfium2Backend)
+}
+
+
+def select_backend(accepted: Iterable[str] = BACKEND_SPEED,
+                   forced: Optional[str] = FORCED_BACKEND) -> str:
+    """
+    Choisit le moteur d'extraction le plus rapide parmi ``accepted``.
+
+    :param accepted: Moteurs dont le texte convient au parser
+    :param forced: Moteur imposé par la configuration (``PDF_TO_CSV_BACKEND``)
+    :raises ValueError: moteur imposé inconnu ou non installé, ou aucun
+                        moteur accepté installé
+    """
+    if forced:
+        if forced not in BACKENDS:
+            raise ValueError(f"Moteur d'extraction inconnu : {forced} "
+                             f"(disponibles : {', '.join(BACKENDS)})")
+        if not BACKENDS[forced].available():
+            raise ValueError(f"Moteur d'extraction non installé : {forced}")
+        return forced
+    accepted = set(accepted)
+    for name in BACKEND_SPEED:
+        if name in accepted and BACKENDS[name].available():
+            return name
+    raise ValueError(f"Aucun moteur d'extraction installé parmi : {', '.join(sorted(accepted))}")
+
+
+def open_backend(name: str, source: Union[str, bytes]) -> TextBackend:
+    """Ouvre le PDF avec le moteur ``name``"""
+    return BACKENDS[name](source)
+
+
+def extract_page_range(name: str, source: Union[str, bytes], start: int, stop: int) -> List[Tuple[str, bool]]:
+    """Extrait la couche texte des pages [start, stop) dans un processus séparé"""
+    backend = open_backend(name, source)
+    try:
+        return backend.extract_pages(range(start, stop))
+    finally:
+        backend.close()
@@ -0,0 +1,220 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Dict, List, Optional
+
+# Répertoire et taille du cache disque, configurables par variables d'environnement
+DEFAULT_CACHE_DIR = os.environ.get(
+    "PDF_TO_CSV_CACHE_DIR",
+    os.path.join(os.path.expanduser("~"), ".cache", "pdf_to_csv"),
+)
+DEFAULT_MAX_BYTES = int(os.environ.get("PDF_TO_CSV_CACHE_MAX_MB", "256")) * 1024 * 1024
+CACHE_ENABLED = os.environ.get("PDF_TO_CSV_CACHE", "1") != "0"
+
+# Le cache contient le texte des relevés : lisible par son seul propriétaire
+DIR_MODE = 0o700
+FILE_MODE = 0o600
+
+TEXT_TIER = "text"
+TRANSACTIONS_TIER = "transactions"
+
+
+def file_sha256(pdf_path: str) -> str:
+    """Empreinte SHA-256 du contenu du fichier"""
+    digest = hashlib.sha256()
+    with open(pdf_path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _open_temporary(path: str):
+    """
+    Crée le fichier temporaire d'une entrée, à côté de ``path``.
+
+    Son nom est unique (``mkstemp``) même entre threads d'un même processus
+    (sessions Streamlit) ; il est créé en mode ``FILE_MODE``.
+
+    :return: (fichier ouvert en écriture, chemin du fichier)
+    """
+    directory, name = os.path.split(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=name + ".", suffix=".tmp")
+    os.chmod(tmp_path, FILE_MODE)
+    return os.fdopen(fd, 'w', encoding='utf-8'), tmp_path
+
+
+class ConversionCache:
+    """
+    Cache disque à deux niveaux, adressé par le contenu du PDF.
+
+    - niveau ``text`` : texte de chaque page, clé = SHA-256 + backend d'extraction
+    - niveau ``transactions`` : transactions parsées, clé = SHA-256 + backend
+      + parser + version du parser
+
+    Changer la version d'un parser n'invalide que le niveau transactions :
+    le document est re-parsé sans être ré-extrait. La taille totale est
+    bornée par éviction LRU (date de modification rafraîchie à chaque lecture).
+    """
+
+    def __init__(self, root: str = DEFAULT_CACHE_DIR, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = root
+        self.max_bytes = max_bytes
+
+    def _make_dirs(self, tier: str):
+        """
+        Crée le répertoire du cache et celui du niveau en mode ``DIR_MODE``.
+
+        ``os.makedirs`` n'applique le mode qu'au dernier répertoire : la racine
+        est créée à part, et resserrée si une version antérieure l'a ouverte.
+        """
+        os.makedirs(self.root, mode=DIR_MODE, exist_ok=True)
+        if os.stat(self.root).st_mode & 0o777 != DIR_MODE:
+            os.chmod(self.root, DIR_MODE)
+        os.makedirs(os.path.join(self.root, tier), mode=DIR_MODE, exist_ok=True)
+
+    def _path(self, tier: str, key: str) -> str:
+        return os.path.join(self.root, tier, key + ".json")
+
+    def _read(self, tier: str, key: str):
+        path = self._path(tier, key)
+        try:
+            with open(path, encoding='utf-8') as f:
+                value = json.load(f)
+            os.utime(path)  # Entrée la plus récemment utilisée
+            return value
+        except (OSError, ValueError):
+            return None
+
+    def _write(self, tier: str, key: str, value):
+        path = self._path(tier, key)
+        tmp_path = None
+        try:
+            self._make_dirs(tier)
+            f, tmp_path = _open_temporary(path)
+            with f:
+                json.dump(value, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+            self._evict()
+        except OSError:
+            # Le cache ne doit jamais faire échouer une conversion
+            if tmp_path is not None:
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
+
+    def _evict(self):
+        """Supprime les entrées les moins récemment utilisées au-delà de max_bytes"""
+        entries = []
+        for tier in (TEXT_TIER, TRANSACTIONS_TIER):
+            tier_dir = os.path.join(self.root, tier)
+            if not os.path.isdir(tier_dir):
+                continue
+            for name in os.listdir(tier_dir):
+                path = os.path.join(tier_dir, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, path))
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                total -= size
+            except OSError:
+                pass
+
+    def get_pages(self, sha256: str, backend: str) -> Optional[List[str]]:
+        return self._read(TEXT_TIER, f"{sha256}-{backend}")
+
+    def put_pages(self, sha256: str, backend: str, pages: List[str]):
+        self._write(TEXT_TIER, f"{sha256}-{backend}", pages)
+
+    def page_writer(self, sha256: str, backend: str) -> "StreamWriter":
+        """Écriture du niveau texte page par page, au fil d'une extraction en flux"""
+        return StreamWriter(self, TEXT_TIER, f"{sha256}-{backend}")
+
+    def get_transactions(self, sha256: str, backend: str, parser_name: str,
+                         parser_version: int) -> Optional[List[Dict]]:
+        return self._read(TRANSACTIONS_TIER, f"{sha256}-{backend}-{parser_name}-v{parser_version}")
+
+    def put_transactions(self, sha256: str, backend: str, parser_name: str,
+                         parser_version: int, transactions: List[Dict]):
+        self._write(TRANSACTIONS_TIER, f"{sha256}-{backend}-{parser_name}-v{parser_version}",
+                    transactions)
+
+    def transaction_writer(self, sha256: str, backend: str, parser_name: str,
+                           parser_version: int) -> "StreamWriter":
+        """Écriture du niveau transactions au fil d'un parsing en flux"""
+        return StreamWriter(self, TRANSACTIONS_TIER,
+                            f"{sha256}-{backend}-{parser_name}-v{parser_version}")
+
+
+class StreamWriter:
+    """
+    Liste (pages ou transactions) écrite dans le cache élément par élément,
+    au fil d'un parcours : seul l'élément courant est en mémoire.
+
+    Le fichier temporaire ne remplace l'entrée qu'à ``close(commit=True)`` :
+    un parcours interrompu ne laisse jamais de liste incomplète.
+    """
+
+    def __init__(self, cache: ConversionCache, tier: str, key: str):
+        self.cache = cache
+        self.path = cache._path(tier, key)
+        self.tmp_path = None
+        self._file = None
+        # Nombre d'éléments écrits
+        self.count = 0
+        try:
+            cache._make_dirs(tier)
+            self._file, self.tmp_path = _open_temporary(self.path)
+            self._file.write('[')
+        except OSError:
+            self._discard()
+
+    def write(self, item):
+        if self._file is None:
+            return
+        try:
+            self._file.write((', ' if self.count else '') + json.dumps(item, ensure_ascii=False))
+            self.count += 1
+        except OSError:
+            self._discard()
+
+    def close(self, commit: bool = True):
+        """Publie l'entrée (``commit``) ou abandonne le fichier temporaire"""
+        if self._file is None:
+            return
+        if not commit:
+            self._discard()
+            return
+        try:
+            self._file.write(']')
+            self._file.close()
+            self._file = None
+            os.replace(self.tmp_path, self.path)
+            self.cache._evict()
+        except OSError:
+            self._discard()
+
+    def _discard(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.tmp_path is None:
+            return
+        try:
+            os.remove(self.tmp_path)
+        except OSError:
+            pass
+
+
+def get_default_cache() -> Optional[ConversionCache]:
+    """Cache par défaut, ou None s'il est désactivé (``PDF_TO_CSV_CACHE=0``)"""
+    return ConversionCache() if CACHE_ENABLED else None
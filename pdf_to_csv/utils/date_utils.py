@@ -1,18 +1,102 @@
-import dateparser
-from datetime import datetime
-
-def parse_date(date_str):
-    """Convertit une chaîne de date en objet datetime"""
-    # Gestion des dates au format JJ/MM (on suppose l'année courante)
-    if len(date_str.split('/')) == 2:
-        date_str = f"{date_str}/{datetime.now().year}"
-    
-    # Utilisation de dateparser pour gérer différents formats
-    date = dateparser.parse(date_str, languages=['fr'], date_formats=['%d/%m/%Y', '%d-%m-%Y', '%m/%d/%Y'])
-    if not date:
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Optional, Tuple
+
+# Dates des relevés : 07/07/2025, 07.07.25, ou 07.07 sans année (LCL)
+DATE_PATTERN = re.compile(r'^(\d{1,2})[./-](\d{1,2})(?:[./-](\d{4}|\d{2}))?$')
+
+# Période d'un relevé : « du 01/01/2024 au 31/12/2024 », « PERIODE DU 01.01.2024 AU 31.12.2024 »
+PERIOD_PATTERN = re.compile(
+    r'\bdu\s+(\d{1,2}[./-]\d{1,2}[./-]\d{2,4})\s+au\s+(\d{1,2}[./-]\d{1,2}[./-]\d{2,4})\b', re.IGNORECASE)
+
+# Dates distinctes gardées en cache : un relevé répète les mêmes dates
+CACHE_SIZE = 4096
+
+# Période d'un relevé : (premier jour, dernier jour)
+Period = Tuple[date, date]
+
+
+def full_year(year: str) -> int:
+    """Année sur quatre chiffres (règle des relevés BNP : 00-50 -> 20xx, 51-99 -> 19xx)"""
+    if len(year) == 2:
+        return 2000 + int(year) if int(year) <= 50 else 1900 + int(year)
+    return int(year)
+
+
+def _closest_year(day: int, month: int, period: Period) -> Optional[datetime]:
+    """Date jour/mois la plus proche de la période (à l'intérieur si possible)"""
+    start, end = period
+    best = None
+    best_distance = None
+    for year in range(start.year - 1, end.year + 2):
+        try:
+            candidate = date(year, month, day)
+        except ValueError:
+            continue
+        distance = max((start - candidate).days, (candidate - end).days, 0)
+        if best_distance is None or distance < best_distance:
+            best, best_distance = candidate, distance
+    return datetime(best.year, best.month, best.day) if best else None
+
+
+def _parse_fast(date_str: str, period: Period) -> Optional[datetime]:
+    """Formats des parsers (jj/mm/aaaa, jj.mm.aa, jj.mm), None pour tout autre format"""
+    match = DATE_PATTERN.match(date_str)
+    if not match:
+        return None
+    day, month, year = match.groups()
+    if year is None:
+        return _closest_year(int(day), int(month), period)
+    try:
+        return datetime(full_year(year), int(month), int(day))
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def _parse_cached(date_str: str, period: Period) -> datetime:
+    parsed = _parse_fast(date_str, period)
+    if parsed is None:
+        # Format inconnu (ou mois/jour inversés) : dateparser, importé seulement ici
+        import dateparser
+
+        if len(date_str.split('/')) == 2:
+            date_str = f"{date_str}/{period[0].year}"
+        parsed = dateparser.parse(date_str, languages=['fr'], date_formats=['%d/%m/%Y', '%d-%m-%Y', '%m/%d/%Y'])
+    if not parsed:
         raise ValueError(f"Format de date non reconnu: {date_str}")
-    
-    return date
+    return parsed
+
+
+def parse_date(date_str, period: Optional[Period] = None):
+    """
+    Convertit une chaîne de date en objet datetime.
+
+    Les formats émis par les parsers sont reconnus sans dateparser, qui
+    n'est appelé que pour les autres. Les résultats sont gardés en cache.
+
+    :param period: Période du relevé (voir ``statement_period``), qui fixe
+                   l'année d'une date sans année ; l'année courante à défaut
+    :raises ValueError: date non reconnue
+    """
+    if period is None:
+        year = datetime.now().year
+        period = (date(year, 1, 1), date(year, 12, 31))
+    return _parse_cached(date_str.strip(), period)
+
+
+def statement_period(text: str) -> Optional[Period]:
+    """Période d'un relevé d'après son en-tête (« du ... au ... »), None si absente"""
+    match = PERIOD_PATTERN.search(text)
+    if not match:
+        return None
+    try:
+        start, end = (parse_date(value).date() for value in match.groups())
+    except ValueError:
+        return None
+    return (start, end) if start <= end else None
+
 
 def format_date(date, format='%d/%m/%Y'):
     """Formate une date selon le format spécifié"""
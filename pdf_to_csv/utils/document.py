@@ -0,0 +1,484 @@
+import hashlib
+import io
+import logging
+import os
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from typing import BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+from pdf_to_csv.utils.backends import (BACKEND_SPEED, BACKENDS, MIN_TEXT_CHARS, TextBackend,
+                                       extract_page_range, open_backend, select_backend)
+from pdf_to_csv.utils.cache_utils import ConversionCache, file_sha256, get_default_cache
+from pdf_to_csv.utils.layout import page_rows
+from pdf_to_csv.utils.metrics import stage
+from pdf_to_csv.utils.ocr_utils import ocr_page_region, ocr_pages, ocr_window_size, pdf_page_count
+
+logger = logging.getLogger(__name__)
+
+# Un PDF peut être désigné par son chemin, son contenu ou un fichier ouvert
+# (par exemple le buffer ``UploadedFile`` de Streamlit)
+PdfSource = Union[str, os.PathLike, bytes, BinaryIO]
+
+# Nombre de processus d'extraction par défaut (1 = extraction séquentielle)
+DEFAULT_WORKERS = int(os.environ.get("PDF_TO_CSV_WORKERS", "1"))
+
+# En dessous de ce nombre de pages, le coût de démarrage des processus
+# dépasse le gain de l'extraction parallèle
+PARALLEL_MIN_PAGES = 8
+
+# OCR des pages sans couche texte (``PDF_TO_CSV_OCR=0`` pour le désactiver)
+DEFAULT_OCR = os.environ.get("PDF_TO_CSV_OCR", "1") != "0"
+
+# Zones de la page lues pour la détection de la banque (fractions de la hauteur)
+HEADER_FRACTION = 0.25
+FOOTER_FRACTION = 0.12
+
+# Valeur par défaut de ``disk_cache`` : cache disque global (voir cache_utils)
+_DEFAULT_CACHE = object()
+
+
+def split_page_ranges(indices: List[int], workers: int) -> List[Tuple[int, int]]:
+    """
+    Découpe une liste d'indices de pages en plages contiguës [start, stop).
+
+    Les plages sont plus nombreuses que les workers pour lisser la charge
+    entre pages denses et pages quasi vides.
+    """
+    ranges = []
+    if not indices:
+        return ranges
+    chunk_size = max(1, -(-len(indices) // (workers * 4)))
+    start = prev = indices[0]
+    count = 1
+    for index in indices[1:]:
+        if index != prev + 1 or count == chunk_size:
+            ranges.append((start, prev + 1))
+            start = index
+            count = 0
+        prev = index
+        count += 1
+    ranges.append((start, prev + 1))
+    return ranges
+
+
+class PdfDocument:
+    """
+    Contexte de document partagé entre la détection de banque et le parser.
+
+    Le PDF est ouvert une seule fois par moteur d'extraction (voir
+    backends.py) et le texte de chaque page est mis en cache : une page n'est
+    extraite qu'une seule fois par conversion. Le texte de toutes les pages
+    est aussi conservé dans le cache disque, adressé par le SHA-256 du
+    fichier et le moteur qui l'a produit.
+
+    Le choix texte/OCR se fait page par page : seules les pages scannées
+    (images sans couche texte) sont rastérisées et passées à Tesseract, et
+    leur texte OCR remplace le texte vide dans le flux de pages. Si le
+    moteur d'extraction ne peut pas ouvrir le PDF, toutes les pages sont
+    traitées comme scannées.
+    """
+
+    def __init__(self, pdf_path: PdfSource, workers: Optional[int] = None,
+                 disk_cache: Optional[ConversionCache] = _DEFAULT_CACHE,
+                 ocr: bool = DEFAULT_OCR, backend: Optional[str] = None):
+        """
+        :param pdf_path: Chemin du fichier PDF, son contenu (bytes) ou un
+                         fichier ouvert en binaire ; aucun fichier n'est écrit
+                         sur disque pour un contenu en mémoire
+        :param workers: Nombre de processus pour l'extraction des pages
+                        (``PDF_TO_CSV_WORKERS`` par défaut, 1 = séquentiel)
+        :param disk_cache: Cache disque (cache global par défaut, None pour désactiver)
+        :param ocr: OCR des pages scannées
+        :param backend: Moteur d'extraction du texte (le plus rapide installé
+                        par défaut, voir ``use_backend``)
+        """
+        self.pdf_path = pdf_path
+        if isinstance(pdf_path, (bytes, bytearray, memoryview)):
+            self.source = bytes(pdf_path)
+        elif hasattr(pdf_path, 'read'):
+            if hasattr(pdf_path, 'seek'):
+                pdf_path.seek(0)
+            self.source = pdf_path.read()
+        else:
+            self.source = os.fspath(pdf_path)
+        self.workers = workers if workers is not None else DEFAULT_WORKERS
+        self.disk_cache = get_default_cache() if disk_cache is _DEFAULT_CACHE else disk_cache
+        self.ocr = ocr
+        self.ocr_page_count = 0
+        self._ocr_failed = False
+        self._text_layer_available = True
+        self.backend = backend or select_backend()
+        self._backends: Dict[str, TextBackend] = {}
+        self._sha256 = None
+        self._page_count = None
+        self._page_texts: Dict[int, str] = {}
+        # Couche texte des pages scannées déjà lues, en attente d'OCR
+        self._layers: Dict[int, Tuple[str, bool]] = {}
+        # Pages dont le texte provient de l'OCR (indépendant du moteur)
+        self._ocr_indices = set()
+        self._disk_cache_checked = False
+        self._from_disk_cache = False
+
+    def __enter__(self) -> "PdfDocument":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _open(self, name: str) -> TextBackend:
+        """Moteur ``name`` ouvert sur le PDF à la première utilisation"""
+        if name not in self._backends:
+            self._backends[name] = open_backend(name, self.source)
+        return self._backends[name]
+
+    @property
+    def text_backend(self) -> TextBackend:
+        """Moteur d'extraction du texte des pages"""
+        return self._open(self.backend)
+
+    @property
+    def pdf(self):
+        """Handle pdfplumber (position des mots pour le mode colonnes)"""
+        return self._open("pdfplumber").pdf
+
+    def use_backend(self, name: str):
+        """
+        Change de moteur d'extraction (choisi par le parser après la détection).
+
+        Le texte déjà extrait par un autre moteur est oublié, sauf celui des
+        pages passées à l'OCR : toutes les pages du flux proviennent ainsi du
+        même moteur, comme celles conservées dans le cache disque. Un PDF que
+        l'ancien moteur ne savait pas lire est relu avec le nouveau.
+        """
+        if name == self.backend:
+            return
+        self.backend = name
+        self._page_texts = {i: text for i, text in self._page_texts.items() if i in self._ocr_indices}
+        self._layers.clear()
+        self._page_count = None
+        self._text_layer_available = True
+        self._disk_cache_checked = False
+        self._from_disk_cache = False
+
+    @property
+    def in_memory(self) -> bool:
+        return isinstance(self.source, bytes)
+
+    def open_binary(self) -> BinaryIO:
+        """Flux binaire sur le PDF (pour pypdf), sans passage par le disque"""
+        if self.in_memory:
+            return io.BytesIO(self.source)
+        return open(self.source, 'rb')
+
+    @contextmanager
+    def as_file(self) -> Iterator[str]:
+        """
+        Chemin sur disque du PDF, pour les outils qui l'exigent (poppler/OCR).
+
+        Un contenu en mémoire est écrit dans un fichier temporaire propre à
+        l'appel, supprimé en sortie : des conversions simultanées ne partagent
+        jamais de fichier.
+        """
+        if not self.in_memory:
+            yield self.source
+            return
+        fd, path = tempfile.mkstemp(suffix='.pdf', prefix='pdf_to_csv_')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(self.source)
+            yield path
+        finally:
+            os.remove(path)
+
+    @property
+    def sha256(self) -> Optional[str]:
+        """Empreinte du fichier (None s'il est illisible)"""
+        if self._sha256 is None:
+            if self.in_memory:
+                self._sha256 = hashlib.sha256(self.source).hexdigest()
+                return self._sha256
+            try:
+                self._sha256 = file_sha256(self.source)
+            except OSError:
+                return None
+        return self._sha256
+
+    @property
+    def page_count(self) -> int:
+        self._load_from_disk_cache()
+        if self._page_count is None:
+            try:
+                self._page_count = self.text_backend.page_count
+            except Exception as e:
+                self._page_count = self._fallback_page_count(e)
+        return self._page_count
+
+    def _fallback_page_count(self, error: Exception) -> int:
+        """
+        Nombre de pages d'un PDF que le moteur courant ne sait pas ouvrir.
+
+        Les autres moteurs installés sont essayés, du plus rapide au plus lent,
+        et le premier qui lit le PDF devient le moteur du document. Le PDF
+        n'est considéré comme scanné (OCR de toutes les pages) que si aucun
+        moteur ne le lit.
+        """
+        failed = self.backend
+        self.close()
+        for name in BACKEND_SPEED:
+            if name == failed or not BACKENDS[name].available():
+                continue
+            try:
+                page_count = self._open(name).page_count
+            except Exception:
+                self.close()
+                continue
+            logger.warning("Erreur %s: %s, extraction avec %s", failed, error, name)
+            self.use_backend(name)
+            return page_count
+        if not self.ocr:
+            raise error
+        # PDF illisible par tous les moteurs : toutes les pages passent par l'OCR
+        with self.as_file() as path:
+            page_count = pdf_page_count(path)
+        self._text_layer_available = False
+        return page_count
+
+    def _load_from_disk_cache(self):
+        """Charge le texte des pages depuis le cache disque, une seule fois"""
+        if self._disk_cache_checked:
+            return
+        self._disk_cache_checked = True
+        if self.disk_cache is None or self.sha256 is None:
+            return
+        pages = self.disk_cache.get_pages(self.sha256, self.backend)
+        if pages is not None:
+            self._page_count = len(pages)
+            self._page_texts.update((i, text) for i, text in enumerate(pages)
+                                    if i not in self._ocr_indices)
+            self._from_disk_cache = True
+
+    def page_text(self, index: int) -> str:
+        """Retourne le texte de la page ``index`` (0-based), extrait une seule fois"""
+        self._load_from_disk_cache()
+        if index not in self._page_texts:
+            self._page_texts[index] = self._extract_page(index)
+        return self._page_texts[index]
+
+    def _extract_page(self, index: int) -> str:
+        """Texte d'une page : couche texte, ou OCR si la page est scannée"""
+        text, scanned = self._text_layer(index)
+        if scanned:
+            text = self._ocr_pages([index]).get(index) or text
+        return text
+
+    def _text_layer(self, index: int) -> Tuple[str, bool]:
+        if not self._text_layer_available:
+            return "", True
+        if index in self._layers:
+            return self._layers.pop(index)
+        with stage("page_extraction", items=1):
+            return self.text_backend.extract_page(index)
+
+    def text_layer(self, index: int) -> Tuple[str, bool]:
+        """
+        Couche texte d'une page, sans OCR.
+
+        :return: (texte, scannée) ; une page scannée garde sa couche texte en
+                 attente pour ne pas être remise en page lors de son OCR
+        """
+        self._load_from_disk_cache()
+        if index in self._page_texts:
+            return self._page_texts[index], False
+        text, scanned = self._text_layer(index)
+        if scanned:
+            self._layers[index] = (text, scanned)
+        else:
+            self._page_texts[index] = text
+        return text, scanned
+
+    def region_text(self, index: int = 0) -> str:
+        """
+        Texte de l'en-tête et du pied d'une page, rognés par le moteur.
+
+        Seuls les caractères de ces bandeaux sont lus : la détection de la
+        banque ne met pas toute la page en page.
+        """
+        self._load_from_disk_cache()
+        if index in self._page_texts:
+            return self._page_texts[index]
+        return self.text_backend.extract_regions(index, HEADER_FRACTION, FOOTER_FRACTION)
+
+    @property
+    def ocr_failed(self) -> bool:
+        """Un OCR a été tenté sans succès (Tesseract ou poppler absents)"""
+        return self._ocr_failed
+
+    def ocr_header(self, index: int = 0) -> str:
+        """OCR basse résolution du bandeau haut d'une page (détection de la banque)"""
+        if not self.ocr:
+            return ""
+        try:
+            with stage("ocr", items=1), self.as_file() as path:
+                return ocr_page_region(path, index + 1)
+        except Exception as e:
+            logger.warning("OCR impossible: %s", e)
+            self._ocr_failed = True
+            return ""
+
+    def ocr_page(self, index: int) -> str:
+        """OCR complet d'une page, conservé comme texte de la page"""
+        self._load_from_disk_cache()
+        if index not in self._page_texts:
+            text = self._ocr_pages([index]).get(index)
+            if text is None:
+                return ""
+            self._layers.pop(index, None)
+            self._page_texts[index] = text
+        return self._page_texts[index]
+
+    def page_texts(self) -> List[str]:
+        """Retourne le texte de toutes les pages, dans l'ordre"""
+        missing = [i for i in range(self.page_count) if i not in self._page_texts]
+        if self.workers > 1 and len(missing) >= PARALLEL_MIN_PAGES and self._text_layer_available:
+            layers = self._extract_parallel([i for i in missing if i not in self._layers])
+            layers.update((i, self._layers.pop(i)) for i in missing if i in self._layers)
+        else:
+            layers = {i: self._text_layer(i) for i in missing}
+
+        # Un seul passage OCR pour toutes les pages scannées du document
+        scanned = [i for i, (_, is_scanned) in layers.items() if is_scanned]
+        ocr_texts = self._ocr_pages(scanned) if scanned else {}
+        for i, (text, _) in layers.items():
+            self._page_texts[i] = ocr_texts.get(i) or text
+
+        texts = [self._page_texts[i] for i in range(self.page_count)]
+        if (self.disk_cache is not None and not self._from_disk_cache
+                and not self._ocr_failed and self.sha256):
+            self.disk_cache.put_pages(self.sha256, self.backend, texts)
+            self._from_disk_cache = True
+        return texts
+
+    def _ocr_pages(self, indices: List[int]) -> Dict[int, str]:
+        """OCR des pages ``indices`` (0-based) ; dictionnaire vide si l'OCR est indisponible"""
+        if not self.ocr or not indices:
+            return {}
+        try:
+            with stage("ocr", items=len(indices)), self.as_file() as path:
+                texts = ocr_pages(path, [i + 1 for i in indices])
+        except Exception as e:
+            if not self._text_layer_available:
+                raise
+            # Tesseract/poppler absents : on garde la couche texte
+            logger.warning("OCR impossible, couche texte conservée: %s", e)
+            self._ocr_failed = True
+            return {}
+        self.ocr_page_count += len(indices)
+        self._ocr_indices.update(page_number - 1 for page_number, text in texts.items() if text)
+        return {page_number - 1: text for page_number, text in texts.items()}
+
+    def _extract_parallel(self, indices: List[int]) -> Dict[int, Tuple[str, bool]]:
+        """Extrait la couche texte des pages ``indices`` en parallèle"""
+        layers = {}
+        ranges = split_page_ranges(indices, self.workers)
+        with stage("page_extraction", items=len(indices)), \
+                ProcessPoolExecutor(max_workers=min(self.workers, len(ranges))) as executor:
+            futures = [
+                executor.submit(extract_page_range, self.backend, self.source, start, stop)
+                for start, stop in ranges
+            ]
+            # Les résultats sont réassemblés dans l'ordre des pages
+            for (start, _), future in zip(ranges, futures):
+                for offset, layer in enumerate(future.result()):
+                    layers[start + offset] = layer
+        return layers
+
+    def iter_page_texts(self, cache: bool = True) -> Iterator[str]:
+        """
+        Parcourt le texte des pages dans l'ordre.
+
+        Avec ``cache=False``, les pages non encore lues ne sont pas conservées :
+        la mémoire reste constante quel que soit le nombre de pages. Les pages
+        scannées consécutives sont alors passées ensemble à l'OCR, par fenêtres
+        de ``ocr_window_size`` pages, pour occuper tous les workers Tesseract.
+        Le texte des pages est écrit dans le cache disque au fil du parcours,
+        et l'entrée n'est publiée qu'une fois la dernière page lue.
+        """
+        if cache:
+            for i in range(self.page_count):
+                yield self.page_text(i)
+            return
+        self._load_from_disk_cache()
+        writer = None
+        if self.disk_cache is not None and not self._from_disk_cache and self.sha256:
+            writer = self.disk_cache.page_writer(self.sha256, self.backend)
+        complete = False
+        try:
+            for text in self._stream_page_texts():
+                if writer is not None:
+                    writer.write(text)
+                yield text
+            complete = not self._ocr_failed
+        finally:
+            if writer is not None:
+                writer.close(commit=complete)
+        if writer is not None and complete:
+            self._from_disk_cache = True
+
+    def _stream_page_texts(self) -> Iterator[str]:
+        """Texte des pages dans l'ordre, sans les conserver (voir ``iter_page_texts``)"""
+        scanned: Dict[int, str] = {}
+        window_size = ocr_window_size()
+        for i in range(self.page_count):
+            if i in self._page_texts:
+                text, is_scanned = self._page_texts[i], False
+            else:
+                text, is_scanned = self._text_layer(i)
+            if is_scanned:
+                # Couche texte gardée au cas où l'OCR échoue
+                scanned[i] = text
+                if len(scanned) < window_size:
+                    continue
+            yield from self._ocr_scanned(scanned)
+            if not is_scanned:
+                yield text
+        yield from self._ocr_scanned(scanned)
+
+    def _ocr_scanned(self, layers: Dict[int, str]) -> List[str]:
+        """Texte d'une suite de pages scannées (OCR en une passe), dans l'ordre ; vide ``layers``"""
+        if not layers:
+            return []
+        indices = sorted(layers)
+        ocr_texts = self._ocr_pages(indices)
+        texts = [ocr_texts.get(i) or layers[i] for i in indices]
+        layers.clear()
+        return texts
+
+    def iter_page_rows(self) -> Iterator[Tuple[int, Optional[List[List[Dict]]]]]:
+        """
+        Parcourt les mots de chaque page, regroupés en lignes (mode colonnes).
+
+        :return: Couples (index de page, lignes) ; lignes vaut None pour une
+                 page sans couche texte, à lire par ``page_text`` (OCR)
+        """
+        for i in range(self.page_count):
+            if not self._text_layer_available:
+                yield i, None
+                continue
+            page = self.pdf.pages[i]
+            with stage("page_extraction", items=1):
+                rows = page_rows(page)
+                chars = sum(len(word['text']) for row in rows for word in row)
+                scanned = chars < MIN_TEXT_CHARS and bool(page.images)
+                page.flush_cache()
+            yield i, None if scanned else rows
+
+    def full_text(self) -> str:
+        """Texte complet du document (pages non vides séparées par un saut de ligne)"""
+        return "\n".join(text for text in self.page_texts() if text)
+
+    def close(self):
+        """Ferme les moteurs ouverts ; le texte déjà extrait reste en cache"""
+        for backend in self._backends.values():
+            backend.close()
+        self._backends.clear()
+
@@ -0,0 +1,369 @@
+import csv
+import io
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional
+from pdf_to_csv.utils.date_utils import Period
+from pdf_to_csv.utils.metrics import count as count_items, stage
+from pdf_to_csv.utils.records import TransactionTable, as_table
+
+# pandas (et la normalisation qui en dépend) n'est importé que par les
+# exports DataFrame, Parquet et Excel : l'écriture CSV au fil de l'eau s'en passe
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Transactions par groupe de lignes Parquet en écriture au fil de l'eau
+PARQUET_BATCH_ROWS = 10000
+
+# Classeurs Excel : colonnes, formats des cellules et largeur des colonnes
+EXCEL_COLUMNS = ["DATE", "DATE_VALEUR", "LIBELLE", "DEBIT", "CREDIT", "MONTANT", "SECTION"]
+EXCEL_DATE_FORMAT = "DD/MM/YYYY"
+EXCEL_AMOUNT_FORMAT = "#,##0.00"
+EXCEL_WIDTHS = {"DATE": 12, "DATE_VALEUR": 12, "LIBELLE": 60, "DEBIT": 14, "CREDIT": 14,
+                "MONTANT": 14, "SECTION": 30}
+
+# Limites d'Excel : lignes par feuille (en-tête compris), longueur d'un nom
+# de feuille et caractères interdits dans ce nom
+EXCEL_MAX_ROWS = 1048576
+EXCEL_SHEET_TITLE_LENGTH = 31
+EXCEL_SHEET_FORBIDDEN = str.maketrans({c: " " for c in "[]:*?/\\"})
+
+# Feuille unique, et feuille des transactions sans section
+EXCEL_DEFAULT_SHEET = "Transactions"
+EXCEL_NO_SECTION = "Sans section"
+
+
+def transactions_to_dataframe(transactions: Iterable[Dict]) -> "pd.DataFrame":
+    """
+    Construit le DataFrame des transactions avec la colonne montant unifiée.
+
+    :param transactions: Table compacte (``extract_transactions``) ou liste de
+                         dictionnaires
+    """
+    table = as_table(transactions)
+    with stage("dataframe", items=len(table)):
+        return _build_dataframe(table)
+
+
+def _build_dataframe(table: TransactionTable) -> "pd.DataFrame":
+    df = table.to_dataframe()
+
+    # S'assurer que les colonnes DEBIT et CREDIT existent
+    if 'DEBIT' not in df.columns:
+        df['DEBIT'] = None
+    if 'CREDIT' not in df.columns:
+        df['CREDIT'] = None
+
+    # Montant calculé sur les centimes de la table, sans re-parser le texte
+    df['montant'] = table.amount_values('CREDIT') - table.amount_values('DEBIT')
+    return df
+
+
+def _to_float(value) -> float:
+    """Équivalent ligne à ligne de ``pd.to_numeric(errors='coerce').fillna(0)``"""
+    if value is None or value == '':
+        return 0.0
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def write_csv_stream(transactions: Iterable[Dict], output_path: str,
+                     sep: str = ';', decimal: str = ',') -> int:
+    """
+    Écrit les transactions en CSV au fur et à mesure qu'elles sont produites.
+
+    Produit le même fichier que ``transactions_to_dataframe(...).to_csv(...)``
+    sans matérialiser la liste ni le DataFrame : la mémoire reste constante
+    quel que soit le nombre de transactions. Retourne le nombre de lignes écrites.
+    """
+    count = 0
+    with stage("csv"), open(output_path, 'w', newline='', encoding='utf-8') as f:
+        writer = None
+        for transaction in transactions:
+            if writer is None:
+                fieldnames = list(transaction)
+                for col in ('DEBIT', 'CREDIT'):
+                    if col not in fieldnames:
+                        fieldnames.append(col)
+                writer = csv.DictWriter(f, fieldnames=fieldnames + ['montant'],
+                                        delimiter=sep, lineterminator='\n',
+                                        extrasaction='ignore')
+                writer.writeheader()
+            montant = _to_float(transaction.get('CREDIT')) - _to_float(transaction.get('DEBIT'))
+            row = dict(transaction, montant=repr(montant).replace('.', decimal))
+            writer.writerow(row)
+            count += 1
+        if writer is None:
+            csv.writer(f, delimiter=sep, lineterminator='\n').writerow(['DEBIT', 'CREDIT', 'montant'])
+    count_items("csv", count)
+    return count
+
+
+def arrow_schema():
+    """Schéma Arrow des colonnes typées (``normalize.TYPED_COLUMNS``)"""
+    import pyarrow as pa
+    from pdf_to_csv.utils.normalize import TYPED_COLUMNS
+
+    category = pa.dictionary(pa.int32(), pa.string())
+    types = {
+        'DATE': pa.date64(),
+        'DATE_VALEUR': pa.date64(),
+        'LIBELLE': pa.string(),
+        'DEBIT_CENTS': pa.int64(),
+        'CREDIT_CENTS': pa.int64(),
+        'MONTANT_CENTS': pa.int64(),
+        'SECTION': category,
+        'BANQUE': category,
+    }
+    return pa.schema([(col, types[col]) for col in TYPED_COLUMNS])
+
+
+def to_arrow_table(df: "pd.DataFrame"):
+    """Table Arrow d'un DataFrame typé (voir ``normalize.normalize_transactions``)"""
+    import pyarrow as pa
+    from pdf_to_csv.utils.normalize import TYPED_COLUMNS
+
+    return pa.Table.from_pandas(df[TYPED_COLUMNS], schema=arrow_schema(), preserve_index=False)
+
+
+def write_parquet(df: "pd.DataFrame", output) -> int:
+    """
+    Écrit un DataFrame typé en Parquet.
+
+    :param output: Chemin ou fichier ouvert en binaire
+    :return: Nombre de lignes écrites
+    """
+    import pyarrow.parquet as pq
+
+    with stage("parquet", items=len(df)):
+        pq.write_table(to_arrow_table(df), output)
+    return len(df)
+
+
+def parquet_bytes(df: "pd.DataFrame") -> bytes:
+    """Contenu d'un fichier Parquet (téléchargement depuis l'application)"""
+    buffer = io.BytesIO()
+    write_parquet(df, buffer)
+    return buffer.getvalue()
+
+
+class ParquetStreamWriter:
+    """
+    Écrit des transactions en Parquet au fur et à mesure qu'elles sont produites.
+
+    Les transactions sont accumulées puis normalisées et écrites par groupes
+    de ``batch_size`` lignes : la mémoire reste bornée quel que soit le nombre
+    de transactions, comme pour ``write_csv_stream``.
+    """
+
+    def __init__(self, output_path: str, bank: Optional[str] = None,
+                 batch_size: int = PARQUET_BATCH_ROWS, period: Optional[Period] = None):
+        """:param period: Période du relevé (année des dates sans année)"""
+        import pyarrow.parquet as pq
+
+        self.bank = bank
+        self.period = period
+        self.batch_size = batch_size
+        self.count = 0
+        self._rows = TransactionTable()
+        self._writer = pq.ParquetWriter(output_path, arrow_schema())
+
+    def __enter__(self) -> "ParquetStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, transaction: Dict):
+        self._rows.append(transaction)
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def tee(self, transactions: Iterable[Dict]) -> Iterator[Dict]:
+        """Écrit chaque transaction puis la transmet (pour écrire CSV et Parquet en un passage)"""
+        for transaction in transactions:
+            self.write(transaction)
+            yield transaction
+
+    def _flush(self):
+        from pdf_to_csv.utils.normalize import typed_dataframe
+
+        if not self._rows:
+            return
+        with stage("parquet", items=len(self._rows)):
+            self._writer.write_table(to_arrow_table(typed_dataframe(self._rows, self.bank, self.period)))
+        self.count += len(self._rows)
+        self._rows = TransactionTable()
+
+    def close(self):
+        """Écrit le dernier groupe de lignes et finalise le fichier"""
+        if self._writer is None:
+            return
+        self._flush()
+        self._writer.close()
+        self._writer = None
+
+
+class ExcelStreamWriter:
+    """
+    Écrit des transactions dans un classeur Excel au fur et à mesure.
+
+    Le classeur est ouvert en mode « write-only » d'openpyxl : chaque ligne
+    est écrite dans un fichier temporaire au lieu d'être gardée en objets
+    cellule, et les transactions sont normalisées par groupes de
+    ``batch_size`` lignes. La mémoire reste donc bornée quel que soit le
+    nombre de transactions.
+
+    Les dates sont des cellules date et les montants des cellules
+    numériques ; une date illisible est écrite telle quelle. Les
+    transactions vont dans une seule feuille, dans la feuille ``sheet``
+    indiquée à l'écriture (un relevé par feuille), ou dans une feuille par
+    section avec ``by_section``. Une feuille pleine continue dans une
+    feuille « (2) ».
+    """
+
+    def __init__(self, output, bank: Optional[str] = None, by_section: bool = False,
+                 batch_size: int = PARQUET_BATCH_ROWS, period: Optional[Period] = None):
+        """
+        :param output: Chemin du classeur ou fichier ouvert en binaire
+        :param period: Période du relevé (année des dates sans année)
+        """
+        from openpyxl import Workbook
+
+        self.output = output
+        self.bank = bank
+        self.period = period
+        self.by_section = by_section
+        self.batch_size = batch_size
+        self.count = 0
+        self._rows = TransactionTable()
+        self._sheet_names: List[Optional[str]] = []
+        # Feuille en cours par nom demandé : (feuille, lignes écrites)
+        self._sheets: Dict[str, list] = {}
+        self._titles = set()
+        self._workbook = Workbook(write_only=True)
+
+    def __enter__(self) -> "ExcelStreamWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, transaction: Dict, sheet: Optional[str] = None):
+        self._rows.append(transaction)
+        self._sheet_names.append(sheet)
+        if len(self._rows) >= self.batch_size:
+            self._flush()
+
+    def tee(self, transactions: Iterable[Dict], sheet: Optional[str] = None) -> Iterator[Dict]:
+        """Écrit chaque transaction puis la transmet (pour écrire CSV et Excel en un passage)"""
+        for transaction in transactions:
+            self.write(transaction, sheet)
+            yield transaction
+
+    def _title(self, name: str) -> str:
+        """Nom de feuille valide et unique dans le classeur"""
+        base = " ".join(name.translate(EXCEL_SHEET_FORBIDDEN).split())[:EXCEL_SHEET_TITLE_LENGTH]
+        base = base or EXCEL_DEFAULT_SHEET
+        title = base
+        index = 2
+        while title.casefold() in self._titles:
+            suffix = f" ({index})"
+            title = base[:EXCEL_SHEET_TITLE_LENGTH - len(suffix)] + suffix
+            index += 1
+        self._titles.add(title.casefold())
+        return title
+
+    def _new_sheet(self, name: str):
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        from openpyxl.utils import get_column_letter
+
+        worksheet = self._workbook.create_sheet(self._title(name))
+        worksheet.freeze_panes = "A2"
+        for index, column in enumerate(EXCEL_COLUMNS, start=1):
+            worksheet.column_dimensions[get_column_letter(index)].width = EXCEL_WIDTHS[column]
+        header = []
+        for column in EXCEL_COLUMNS:
+            cell = WriteOnlyCell(worksheet, column)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        worksheet.append(header)
+        self._sheets[name] = [worksheet, 1]
+
+    def _sheet(self, name: str):
+        if name not in self._sheets or self._sheets[name][1] >= EXCEL_MAX_ROWS:
+            self._new_sheet(name)
+        entry = self._sheets[name]
+        entry[1] += 1
+        return entry[0]
+
+    def _flush(self):
+        from openpyxl.cell import WriteOnlyCell
+        from pdf_to_csv.utils.normalize import typed_dataframe
+
+        if not self._rows:
+            return
+        with stage("excel", items=len(self._rows)):
+            typed = typed_dataframe(self._rows, self.bank, self.period)
+            columns = {
+                "DATE": _excel_dates(typed["DATE"], self._rows.column("DATE")),
+                "DATE_VALEUR": _excel_dates(typed["DATE_VALEUR"], self._rows.column("DATE_VALEUR")),
+                "LIBELLE": typed["LIBELLE"].tolist(),
+                "DEBIT": _excel_amounts(typed["DEBIT_CENTS"]),
+                "CREDIT": _excel_amounts(typed["CREDIT_CENTS"]),
+                "MONTANT": _excel_amounts(typed["MONTANT_CENTS"]),
+                "SECTION": self._rows.column("SECTION"),
+            }
+            formats = {"DATE": EXCEL_DATE_FORMAT, "DATE_VALEUR": EXCEL_DATE_FORMAT,
+                       "DEBIT": EXCEL_AMOUNT_FORMAT, "CREDIT": EXCEL_AMOUNT_FORMAT,
+                       "MONTANT": EXCEL_AMOUNT_FORMAT}
+            for row, values in enumerate(zip(*(columns[c] for c in EXCEL_COLUMNS))):
+                if self.by_section:
+                    name = columns["SECTION"][row] or EXCEL_NO_SECTION
+                else:
+                    name = self._sheet_names[row] or EXCEL_DEFAULT_SHEET
+                worksheet = self._sheet(name)
+                cells = []
+                for column, value in zip(EXCEL_COLUMNS, values):
+                    if column in formats and value is not None and not isinstance(value, str):
+                        cell = WriteOnlyCell(worksheet, value)
+                        cell.number_format = formats[column]
+                        value = cell
+                    cells.append(value)
+                worksheet.append(cells)
+        self.count += len(self._rows)
+        self._rows = TransactionTable()
+        self._sheet_names = []
+
+    def close(self):
+        """Écrit le dernier groupe de lignes et enregistre le classeur"""
+        if self._workbook is None:
+            return
+        self._flush()
+        if not self._sheets:
+            self._new_sheet(EXCEL_DEFAULT_SHEET)
+        self._workbook.save(self.output)
+        self._workbook = None
+
+
+def _excel_dates(dates: "pd.Series", raw: List) -> List:
+    """Dates des cellules Excel, texte d'origine si la date est illisible"""
+    parsed = dates.notna().tolist()
+    days = dates.dt.date.tolist()
+    return [day if ok else value or None for day, ok, value in zip(days, parsed, raw)]
+
+
+def _excel_amounts(cents: "pd.Series") -> List[Optional[float]]:
+    """Montants en euros des cellules Excel (None si absent)"""
+    return (cents / 100).to_numpy(dtype=object, na_value=None).tolist()
+
+
+def excel_bytes(transactions: Iterable[Dict], bank: Optional[str] = None,
+                by_section: bool = False, period: Optional[Period] = None) -> bytes:
+    """Contenu d'un classeur Excel (téléchargement depuis l'application)"""
+    buffer = io.BytesIO()
+    with ExcelStreamWriter(buffer, bank, by_section, period=period) as writer:
+        for transaction in transactions:
+            writer.write(transaction)
+    return buffer.getvalue()
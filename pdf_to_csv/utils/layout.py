@@ -0,0 +1,120 @@
+import re
+from typing import Dict, List, Optional, Tuple
+
+# Mots d'une même ligne : écart vertical maximal entre leurs hauts (points)
+Y_TOLERANCE = 3
+
+# Deux mots d'une même ligne appartiennent à la même cellule si l'espace qui
+# les sépare est inférieur à cette fraction de la hauteur du texte (une
+# espace typographique), et à deux colonnes distinctes sinon
+CELL_GAP_RATIO = 0.5
+
+# Date (07/07/2025, 07.07.25, 07.07)
+DATE_TOKEN = re.compile(r'\b\d{2}[./]\d{2}(?:[./]\d{2,4})?\b')
+
+# Montant au format français, milliers séparés par un point ou une espace
+AMOUNT = re.compile(r'\d{1,3}(?:[. ]\d{3})*,\d{2}')
+
+# Colonne du tableau : (champ, x0, x1)
+Column = Tuple[str, float, float]
+
+
+def page_rows(page) -> List[List[Dict]]:
+    """
+    Mots d'une page pdfplumber regroupés en lignes, de haut en bas.
+
+    Chaque ligne est une liste de mots (``text``, ``x0``, ``x1``, ``top``,
+    ``bottom``) triés de gauche à droite.
+    """
+    words = sorted(page.extract_words(), key=lambda w: (w['top'], w['x0']))
+    rows = []
+    for word in words:
+        if rows and word['top'] - rows[-1][0]['top'] <= Y_TOLERANCE:
+            rows[-1].append(word)
+        else:
+            rows.append([word])
+    for row in rows:
+        row.sort(key=lambda w: w['x0'])
+    return rows
+
+
+def row_cells(row: List[Dict]) -> List[Dict]:
+    """Fusionne les mots séparés par une simple espace en cellules"""
+    cells = []
+    for word in row:
+        if cells and word['x0'] - cells[-1]['x1'] <= CELL_GAP_RATIO * (word['bottom'] - word['top']):
+            cell = cells[-1]
+            cell['text'] += ' ' + word['text']
+            cell['x1'] = word['x1']
+        else:
+            cells.append({'text': word['text'], 'x0': word['x0'], 'x1': word['x1']})
+    return cells
+
+
+def find_columns(row: List[Dict], titles: Dict[str, str]) -> Optional[List[Column]]:
+    """
+    Reconnaît la ligne d'en-tête du tableau des transactions.
+
+    :param titles: Intitulé de chaque colonne (``{"DEBIT": "Débit", ...}``)
+    :return: Colonnes triées de gauche à droite, ou None si la ligne n'est pas
+             l'en-tête. Une colonne s'étend sur son intitulé et les mots
+             d'en-tête qui le suivent (« Débit EUROS »).
+    """
+    tokens = [word['text'].casefold() for word in row]
+    used = [False] * len(tokens)
+    spans = []
+    # Intitulés les plus longs d'abord : « Date valeur » avant « Date »
+    for field, title in sorted(titles.items(), key=lambda item: -len(item[1].split())):
+        phrase = title.casefold().split()
+        for start in range(len(tokens) - len(phrase) + 1):
+            stop = start + len(phrase)
+            if tokens[start:stop] == phrase and not any(used[start:stop]):
+                used[start:stop] = [True] * len(phrase)
+                spans.append((start, stop, field))
+                break
+        else:
+            return None
+
+    spans.sort()
+    columns = []
+    for position, (start, stop, field) in enumerate(spans):
+        next_start = spans[position + 1][0] if position + 1 < len(spans) else len(row)
+        last = stop - 1
+        while last + 1 < next_start and not used[last + 1]:
+            last += 1
+        columns.append((field, row[start]['x0'], row[last]['x1']))
+    return columns
+
+
+def assign_cells(cells: List[Dict], columns: List[Column]) -> Dict[str, str]:
+    """
+    Affecte chaque cellule à une colonne selon sa position horizontale.
+
+    La colonne retenue est celle dont l'en-tête chevauche le plus la cellule,
+    à défaut la plus proche. Les cellules d'une même colonne sont concaténées.
+    """
+    assigned: Dict[str, str] = {}
+    for cell in cells:
+        best = None
+        best_score = None
+        for field, x0, x1 in columns:
+            overlap = min(cell['x1'], x1) - max(cell['x0'], x0)
+            # Chevauchement positif, sinon distance négative à l'en-tête
+            score = overlap if overlap > 0 else -min(abs(cell['x0'] - x1), abs(x0 - cell['x1']))
+            if best_score is None or score > best_score:
+                best, best_score = field, score
+        if best in assigned:
+            assigned[best] += ' ' + cell['text']
+        else:
+            assigned[best] = cell['text']
+    return assigned
+
+
+def parse_amount(text: Optional[str]) -> Optional[str]:
+    """Montant d'une cellule au format décimal (``1.234,56`` ou ``1 234,56`` -> ``1234.56``)"""
+    if not text:
+        return None
+    match = AMOUNT.search(text)
+    if not match:
+        return None
+    return re.sub(r'[. ]', '', match.group()).replace(',', '.')
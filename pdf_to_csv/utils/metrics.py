@@ -0,0 +1,155 @@
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Étapes d'une conversion, dans l'ordre d'exécution
+STAGES = ("detection", "page_extraction", "ocr", "parsing", "dataframe", "normalization",
+          "csv", "parquet", "excel")
+
+# Métriques de la conversion en cours (None : instrumentation inactive)
+_current = ContextVar("pdf_to_csv_metrics", default=None)
+
+
+class ConversionMetrics:
+    """
+    Temps et compteurs par étape d'une conversion.
+
+    Pour chaque étape : temps propre en secondes, nombre d'appels et nombre
+    d'éléments traités (pages, transactions, lignes). Les étapes peuvent
+    s'imbriquer (la détection lit la page 1, l'écriture CSV en flux consomme
+    le parsing) : le temps d'une sous-étape est retiré de l'étape englobante,
+    la somme des temps ne compte donc rien deux fois.
+    """
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self.total_seconds = 0.0
+        self._started = time.perf_counter()
+        # Temps des sous-étapes de chaque étape ouverte
+        self._children: List[float] = []
+
+    def _entry(self, name: str) -> Dict[str, float]:
+        if name not in self.stages:
+            self.stages[name] = {"seconds": 0.0, "calls": 0, "items": 0}
+        return self.stages[name]
+
+    @contextmanager
+    def stage(self, name: str, items: int = 0):
+        """Mesure le temps propre d'une étape"""
+        self._children.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            children = self._children.pop()
+            if self._children:
+                self._children[-1] += elapsed
+            entry = self._entry(name)
+            entry["seconds"] += elapsed - children
+            entry["calls"] += 1
+            entry["items"] += items
+
+    def count(self, name: str, items: int):
+        """Ajoute ``items`` éléments traités à une étape"""
+        self._entry(name)["items"] += items
+
+    def finish(self):
+        self.total_seconds = time.perf_counter() - self._started
+
+    def to_dict(self) -> Dict:
+        ordered = sorted(self.stages,
+                         key=lambda name: STAGES.index(name) if name in STAGES else len(STAGES))
+        return {
+            "total_seconds": self.total_seconds,
+            "stages": {name: dict(self.stages[name]) for name in ordered},
+        }
+
+    def to_json(self) -> str:
+        return json.dumps(self.to_dict(), ensure_ascii=False)
+
+    def to_prometheus(self, labels: Optional[Dict[str, str]] = None) -> str:
+        """Export au format texte Prometheus (``labels`` ajoutés à chaque série)"""
+        return metrics_to_prometheus([(labels or {}, self.to_dict())])
+
+
+def merge_metrics(*metrics: Dict) -> Dict:
+    """Additionne des métriques sérialisées (étapes d'une conversion mesurées séparément)"""
+    merged = {"total_seconds": 0.0, "stages": {}}
+    for item in metrics:
+        merged["total_seconds"] += item["total_seconds"]
+        for name, values in item["stages"].items():
+            entry = merged["stages"].setdefault(name, {"seconds": 0.0, "calls": 0, "items": 0})
+            for field, value in values.items():
+                entry[field] += value
+    return merged
+
+
+def metrics_to_prometheus(conversions: List[Tuple[Dict[str, str], Dict]]) -> str:
+    """
+    Export Prometheus de plusieurs conversions.
+
+    :param conversions: Couples (labels, métriques sérialisées par
+                        ``ConversionMetrics.to_dict``) ; les séries d'une même
+                        métrique sont regroupées comme l'exige le format
+    """
+    series = [
+        ("pdf_to_csv_stage_seconds", "Temps propre par étape de conversion", "seconds"),
+        ("pdf_to_csv_stage_calls", "Nombre d'appels par étape de conversion", "calls"),
+        ("pdf_to_csv_stage_items", "Éléments traités par étape de conversion", "items"),
+    ]
+    lines = []
+    for metric, help_text, field in series:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} gauge")
+        for labels, metrics in conversions:
+            for name, values in metrics["stages"].items():
+                lines.append(f"{metric}{_labels(dict(labels, stage=name))} {values[field]}")
+    lines.append("# HELP pdf_to_csv_conversion_seconds Durée totale de la conversion")
+    lines.append("# TYPE pdf_to_csv_conversion_seconds gauge")
+    for labels, metrics in conversions:
+        lines.append(f"pdf_to_csv_conversion_seconds{_labels(labels)} {metrics['total_seconds']}")
+    return "\n".join(lines) + "\n"
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _escape(value) -> str:
+    """Échappement d'une valeur de label Prometheus"""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+@contextmanager
+def collect_metrics() -> Iterator[ConversionMetrics]:
+    """Active la collecte des métriques pour la conversion exécutée dans le bloc"""
+    metrics = ConversionMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+        metrics.finish()
+
+
+@contextmanager
+def stage(name: str, items: int = 0):
+    """Mesure une étape de la conversion en cours ; sans effet hors de ``collect_metrics``"""
+    metrics = _current.get()
+    if metrics is None:
+        yield
+        return
+    with metrics.stage(name, items):
+        yield
+
+
+def count(name: str, items: int):
+    """Ajoute des éléments traités à une étape de la conversion en cours"""
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.count(name, items)
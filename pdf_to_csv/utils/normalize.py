@@ -0,0 +1,188 @@
+import re
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from typing import Dict, Iterable, Optional
+import numpy as np
+import pandas as pd
+from pdf_to_csv.utils.date_utils import DATE_PATTERN, Period
+from pdf_to_csv.utils.metrics import count, stage
+from pdf_to_csv.utils.records import MISSING, TransactionTable, as_table
+
+# Colonnes typées, dans l'ordre des exports Arrow/Parquet
+TYPED_COLUMNS = ["DATE", "DATE_VALEUR", "LIBELLE", "DEBIT_CENTS", "CREDIT_CENTS",
+                 "MONTANT_CENTS", "SECTION", "BANQUE"]
+
+# Montant au format français (1.234,56 ou 1 234,56), ramené au format décimal
+FRENCH_AMOUNT = re.compile(r'^-?(?:\d{1,3}(?:[. ]\d{3})+|\d+),\d+$')
+
+# Montant décimal (-1234.56) : signe, unités, décimales
+DECIMAL_AMOUNT = re.compile(r'^(-?)(\d{1,15})(?:\.(\d+))?$')
+
+
+def amount_to_cents(value) -> Optional[int]:
+    """Montant décimal (``"1234.56"``) en centimes entiers, sans passer par un float"""
+    if value is None or value == '':
+        return None
+    try:
+        cents = Decimal(str(value).strip()) * 100
+    except InvalidOperation:
+        return None
+    if not cents.is_finite():
+        return None
+    return int(cents.to_integral_value(ROUND_HALF_UP))
+
+
+def amounts_to_cents(values: pd.Series) -> pd.Series:
+    """
+    Montants texte en centimes entiers (``Int64``, nul si absent ou illisible).
+
+    Les formats décimal (``1234.56``) et français (``1.234,56``,
+    ``1 234,56``) sont convertis en une passe vectorisée, arrondis au
+    centime supérieur à partir d'un demi comme ``amount_to_cents`` ;
+    les autres écritures (``+5``, ``1e3``) lui sont confiées une à une.
+    """
+    text = values.astype('string').str.strip()
+    french = text.str.fullmatch(FRENCH_AMOUNT.pattern).fillna(False).astype(bool)
+    text = text.where(~french, text.str.replace(r'[. ]', '', regex=True).str.replace(',', '.'))
+    parts = text.str.extract(DECIMAL_AMOUNT.pattern)
+    sign, units, decimals = parts[0], parts[1], parts[2].fillna('')
+
+    cents = pd.to_numeric(units).astype('Int64') * 100
+    cents += pd.to_numeric(decimals.str.pad(2, side='right', fillchar='0').str[:2]).astype('Int64')
+    # Arrondi au demi supérieur : troisième décimale >= 5
+    cents += (decimals.str[2:3] >= '5').fillna(False).astype('int64')
+    cents = cents.where(sign != '-', -cents)
+
+    others = units.isna() & text.notna()
+    if others.any():
+        cents[others] = pd.array([amount_to_cents(v) for v in values[others]], dtype='Int64')
+    return cents.astype('Int64')
+
+
+def _table_cents(table: TransactionTable, field: str) -> pd.Series:
+    """Centimes d'une colonne montant, lus directement dans la table"""
+    cents = table.amount_cents(field)
+    column = pd.Series(pd.array(cents, dtype='Int64', copy=True))
+    column[cents == MISSING] = pd.NA
+    raw = table.raw_amounts(field)
+    if raw:
+        rows = list(raw)
+        column[rows] = amounts_to_cents(pd.Series(list(raw.values()), dtype=object)).array
+    return column
+
+
+def _dates(year, month, day) -> pd.Series:
+    """Dates d'après leurs composantes (NaT si absentes ou invalides, 31/02 par exemple)"""
+    frame = pd.DataFrame({'year': year, 'month': month, 'day': day})
+    return pd.to_datetime(frame, errors='coerce').astype('datetime64[ns]')
+
+
+def _closest(candidates, distances) -> pd.Series:
+    """Candidat de plus faible distance par ligne (NaT si aucun n'est valide)"""
+    distances = np.column_stack([d.astype('float64').fillna(np.inf).to_numpy() for d in distances])
+    # À distance égale, l'année la plus ancienne
+    best = distances.argmin(axis=1)
+    closest = pd.Series(np.choose(best, [c.to_numpy() for c in candidates]), index=candidates[0].index)
+    return closest.where(np.isfinite(distances.min(axis=1)))
+
+
+def _closest_year(month: pd.Series, day: pd.Series, reference: pd.Series) -> pd.Series:
+    """Date jour/mois la plus proche de ``reference`` (année précédente, courante ou suivante)"""
+    candidates = [_dates(reference.dt.year + offset, month, day) for offset in (-1, 0, 1)]
+    return _closest(candidates, [(c - reference).abs().dt.total_seconds() for c in candidates])
+
+
+def _year_in_period(month: pd.Series, day: pd.Series, period: Period) -> pd.Series:
+    """Date jour/mois la plus proche de la période (à l'intérieur si possible), comme ``date_utils``"""
+    start, end = (pd.Timestamp(value) for value in period)
+    candidates = [_dates(pd.Series(year, index=month.index), month, day)
+                  for year in range(start.year - 1, end.year + 2)]
+    distances = [np.maximum(np.maximum((start - c).dt.days, (c - end).dt.days), 0) for c in candidates]
+    return _closest(candidates, distances)
+
+
+def parse_statement_dates(values: pd.Series, reference: Optional[pd.Series] = None,
+                          period: Optional[Period] = None) -> pd.Series:
+    """
+    Dates des transactions au format des relevés (``datetime64[ns]``).
+
+    Chaque valeur distincte n'est analysée qu'une fois : un relevé répète
+    les mêmes dates sur de nombreuses lignes. Les années à deux chiffres
+    suivent la règle des relevés BNP (00-50 -> 20xx, 51-99 -> 19xx).
+
+    :param reference: Dates connues des mêmes transactions (dates de valeur),
+                      qui fixent l'année d'une date sans année (``07.07``)
+    :param period: Période du relevé (``date_utils.statement_period``), pour
+                   les dates sans année dont la référence manque
+    :return: NaT si la date est absente, invalide, ou sans année ni référence
+             ni période
+    """
+    codes, uniques = pd.factorize(values)
+    parts = pd.Series(uniques, dtype=object).astype('string').str.strip().str.extract(DATE_PATTERN.pattern)
+    day, month, year = (pd.to_numeric(parts[i]).astype('float64') for i in range(3))
+    two_digits = (parts[2].str.len() == 2).fillna(False).astype(bool)
+    year = year.where(~two_digits, np.where(year <= 50, 2000 + year, 1900 + year))
+    # Valeur absente (code -1) : ligne vide ajoutée en fin de table
+    parts = pd.DataFrame({'day': day, 'month': month, 'year': year})
+    parts.loc[len(parts)] = np.nan
+    parts = parts.iloc[codes].reset_index(drop=True)
+    parts.index = values.index
+
+    dates = _dates(parts['year'], parts['month'], parts['day'])
+    missing_year = parts['day'].notna() & parts['year'].isna()
+    if reference is not None and missing_year.any():
+        dates[missing_year] = _closest_year(
+            parts['month'][missing_year], parts['day'][missing_year], reference[missing_year])
+        missing_year &= dates.isna()
+    if period is not None and missing_year.any():
+        dates[missing_year] = _year_in_period(
+            parts['month'][missing_year], parts['day'][missing_year], period)
+    return dates
+
+
+def typed_dataframe(transactions: Iterable[Dict], bank: Optional[str] = None,
+                    period: Optional[Period] = None) -> pd.DataFrame:
+    """
+    DataFrame aux types des colonnes ``TYPED_COLUMNS``, calculé colonne par colonne.
+
+    :param period: Période du relevé, qui fixe l'année des dates sans année
+                   quand la date de valeur ne le permet pas
+    """
+    table = as_table(transactions)
+    text = {field: pd.Series(table.column(field), dtype=object)
+            for field in ('DATE', 'DATE_VALEUR', 'LIBELLE', 'SECTION')}
+
+    date_valeur = parse_statement_dates(text['DATE_VALEUR'])
+    date_op = parse_statement_dates(text['DATE'], date_valeur, period)
+    date_valeur = date_valeur.fillna(parse_statement_dates(text['DATE_VALEUR'], date_op, period))
+
+    debit = _table_cents(table, 'DEBIT')
+    credit = _table_cents(table, 'CREDIT')
+    return pd.DataFrame({
+        'DATE': date_op,
+        'DATE_VALEUR': date_valeur,
+        'LIBELLE': text['LIBELLE'].where(text['LIBELLE'].astype(bool), '').astype('string'),
+        'DEBIT_CENTS': debit,
+        'CREDIT_CENTS': credit,
+        'MONTANT_CENTS': (credit.fillna(0) - debit.fillna(0)).astype('int64'),
+        'SECTION': text['SECTION'].astype('category'),
+        'BANQUE': pd.Series([bank] * len(table), dtype=object).astype('category'),
+    }, columns=TYPED_COLUMNS)
+
+
+def normalize_transactions(transactions: Iterable[Dict], bank: Optional[str] = None,
+                           period: Optional[Period] = None) -> pd.DataFrame:
+    """
+    Étape de normalisation : transactions des parsers en colonnes typées.
+
+    Les dates deviennent des ``datetime64`` (NaT si illisibles), les montants
+    des centimes entiers (``Int64``, nul si absent) et la section et la
+    banque des catégories : les analyses en aval chargent ces colonnes sans
+    re-parser de texte. Chaque colonne est convertie en une passe : les
+    centimes sont repris de la table des transactions, les dates analysées
+    une fois par valeur distincte. ``period`` (voir ``BankParser.period``)
+    fixe l'année des dates qui n'en ont pas.
+    """
+    with stage("normalization"):
+        df = typed_dataframe(transactions, bank, period)
+    count("normalization", len(df))
+    return df
@@ -1,41 +1,212 @@
-import pytesseract
-from pdf2image import convert_from_path
 import tempfile
 import os
-import cv2
-import numpy as np
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
 
-def extract_text_from_scanned_pdf(pdf_path, lang='fra'):
+# Résolution de rendu des pages pour l'OCR
+OCR_DPI = 200
+
+# Détection de la banque : seul le bandeau haut de la page est rendu, en
+# basse résolution (les en-têtes bancaires sont en gros caractères)
+DETECTION_DPI = 100
+DETECTION_TOP_FRACTION = 0.25
+
+# Nombre de workers Tesseract et plafond mémoire des pages rendues,
+# configurables par variables d'environnement
+DEFAULT_OCR_WORKERS = int(os.environ.get("PDF_TO_CSV_OCR_WORKERS", str(os.cpu_count() or 1)))
+DEFAULT_OCR_MEMORY_MB = int(os.environ.get("PDF_TO_CSV_OCR_MEMORY_MB", "512"))
+
+# Tesseract parallélise déjà chaque page avec OpenMP : avec plusieurs workers,
+# un thread par processus évite la contention. La limite ne passe que par
+# l'environnement des processus tesseract lancés par pytesseract ; elle est
+# fixée une fois, juste avant le premier OCR parallèle (voir
+# ``_limit_omp_threads``), sauf si l'utilisateur l'a définie
+_omp_limited = False
+
+# Format A4 en points, utilisé si poppler ne donne pas la taille des pages
+A4_POINTS = (595.0, 842.0)
+
+
+
+class OcrUnavailableError(RuntimeError):
+    """OCR nécessaire mais impossible (Tesseract ou poppler absents)"""
+
+
+# pytesseract, pdf2image, cv2 et numpy ne sont importés qu'au premier OCR :
+# une conversion de PDF texte ne paie jamais leur import (plusieurs
+# centaines de millisecondes, dans chaque worker)
+
+
+def pdf_page_count(pdf_path) -> int:
+    """Nombre de pages selon poppler (PDF illisible par pdfplumber)"""
+    from pdf2image import pdfinfo_from_path
+
+    return pdfinfo_from_path(pdf_path)["Pages"]
+
+
+def extract_text_from_scanned_pdf(pdf_path, lang='fra', workers=None, max_memory_mb=None):
     """Extrait le texte d'un PDF scanné en utilisant OCR"""
-    with tempfile.TemporaryDirectory() as temp_dir:
-        # Conversion PDF en images
-        images = convert_from_path(pdf_path, output_folder=temp_dir)
-        
-        full_text = ""
-        
-        for i, image in enumerate(images):
-            # Prétraitement de l'image pour améliorer l'OCR
-            img = preprocess_image(image)
-            
-            # Extraction du texte avec Tesseract
-            text = pytesseract.image_to_string(img, lang=lang)
-            full_text += f"\n--- Page {i+1} ---\n{text}\n"
-            
+    from pdf2image import pdfinfo_from_path
+
+    info = pdfinfo_from_path(pdf_path)
+    page_numbers = list(range(1, info["Pages"] + 1))
+    texts = ocr_pages(pdf_path, page_numbers, lang, workers, max_memory_mb, info=info)
+
+    full_text = ""
+    for page_number in page_numbers:
+        full_text += f"\n--- Page {page_number} ---\n{texts[page_number]}\n"
     return full_text
 
+
+def ocr_page_region(pdf_path, page_number=1, lang='fra', dpi=DETECTION_DPI,
+                    top_fraction=DETECTION_TOP_FRACTION):
+    """
+    OCR du bandeau haut d'une seule page (en-tête), pour la détection de la banque.
+
+    Seule la page ``page_number`` est rendue, à ``dpi``, puis rognée à la
+    fraction ``top_fraction`` de sa hauteur avant Tesseract.
+    """
+    from pdf2image import convert_from_path
+
+    images = convert_from_path(pdf_path, dpi=dpi, first_page=page_number, last_page=page_number)
+    if not images:
+        return ""
+    image = images[0]
+    width, height = image.size
+    band = image.crop((0, 0, width, max(1, int(height * top_fraction))))
+    image.close()
+    return _ocr_image(band, lang)
+
+
+def ocr_pages(pdf_path, page_numbers: List[int], lang='fra', workers=None,
+              max_memory_mb=None, info=None, dpi=OCR_DPI) -> Dict[int, str]:
+    """
+    OCR des pages ``page_numbers`` (numérotées à partir de 1).
+
+    Les pages sont rendues par fenêtres (``first_page``/``last_page``) dont la
+    taille est bornée par ``max_memory_mb``, puis confiées à un pool de
+    workers Tesseract. Au plus deux fenêtres sont en mémoire : celle en cours
+    d'OCR et celle en cours de rendu. Les images d'une fenêtre sont rendues
+    dans un répertoire temporaire qui lui est propre, supprimé dès son OCR
+    terminé.
+
+    :return: Texte par numéro de page
+    """
+    from pdf2image import convert_from_path, pdfinfo_from_path
+
+    workers = workers or DEFAULT_OCR_WORKERS
+    if workers > 1:
+        _limit_omp_threads()
+    if info is None:
+        info = pdfinfo_from_path(pdf_path)
+
+    window_size = ocr_window_size(max_memory_mb, info, dpi)
+    texts = {}
+
+    in_flight = deque()
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for first_page, last_page in _page_windows(page_numbers, window_size):
+                # Conversion PDF en images, fenêtre par fenêtre
+                temp_dir = tempfile.TemporaryDirectory(prefix='pdf_to_csv_ocr_')
+                in_flight.append((first_page, [], temp_dir))
+                images = convert_from_path(pdf_path, dpi=dpi, output_folder=temp_dir.name,
+                                           first_page=first_page, last_page=last_page)
+                in_flight[-1][1].extend(executor.submit(_ocr_image, image, lang) for image in images)
+                del images
+                while len(in_flight) > 1:
+                    _collect(in_flight.popleft(), texts)
+            while in_flight:
+                _collect(in_flight.popleft(), texts)
+    finally:
+        # Fenêtres non collectées (erreur de rendu ou d'OCR)
+        for _, _, temp_dir in in_flight:
+            temp_dir.cleanup()
+
+    return {page_number: texts.get(page_number, "") for page_number in page_numbers}
+
+
+def ocr_window_size(max_memory_mb=None, info=None, dpi=OCR_DPI) -> int:
+    """
+    Pages rendues par fenêtre d'OCR : deux fenêtres tiennent dans ``max_memory_mb``.
+
+    Sans ``info`` (``pdfinfo``), les pages sont supposées au format A4.
+    """
+    max_memory_mb = max_memory_mb or DEFAULT_OCR_MEMORY_MB
+    page_bytes = _rendered_page_bytes(info or {}, dpi)
+    return max(1, int(max_memory_mb * 1024 * 1024 // (2 * page_bytes)))
+
+
+def _page_windows(page_numbers: List[int], window_size: int) -> List[Tuple[int, int]]:
+    """Regroupe des numéros de page triés en fenêtres contiguës d'au plus window_size pages"""
+    windows = []
+    for page_number in sorted(page_numbers):
+        if (windows and page_number == windows[-1][1] + 1
+                and page_number - windows[-1][0] < window_size):
+            windows[-1] = (windows[-1][0], page_number)
+        else:
+            windows.append((page_number, page_number))
+    return windows
+
+
+def _rendered_page_bytes(info, dpi) -> int:
+    """Estimation de la mémoire d'une page rendue et prétraitée (RGB + niveaux de gris + seuil)"""
+    width, height = A4_POINTS
+    try:
+        size = info["Page size"].split(" pts")[0].split(" x ")
+        width, height = float(size[0]), float(size[1])
+    except (KeyError, IndexError, ValueError):
+        pass
+    pixels = (width / 72 * dpi) * (height / 72 * dpi)
+    return int(pixels * 5)
+
+
+def _collect(window, texts: Dict[int, str]):
+    """Range les résultats d'une fenêtre dans l'ordre des pages, puis supprime ses images"""
+    first_page, futures, temp_dir = window
+    try:
+        for offset, future in enumerate(futures):
+            texts[first_page + offset] = future.result()
+    finally:
+        temp_dir.cleanup()
+
+
+def _limit_omp_threads():
+    """Un thread OpenMP par processus tesseract, fixé une seule fois pour le processus"""
+    global _omp_limited
+    if not _omp_limited:
+        os.environ.setdefault("OMP_THREAD_LIMIT", "1")
+        _omp_limited = True
+
+
+def _ocr_image(image, lang) -> str:
+    import pytesseract
+
+    # Prétraitement de l'image pour améliorer l'OCR
+    img = preprocess_image(image)
+    image.close()
+
+    # Extraction du texte avec Tesseract
+    return pytesseract.image_to_string(img, lang=lang)
+
+
 def preprocess_image(image):
     """Améliore la qualité de l'image pour l'OCR"""
+    import cv2
+    import numpy as np
+
     # Conversion en numpy array
     img = np.array(image)
-    
+
     # Conversion en niveaux de gris
     gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    
+
     # Seuillage adaptatif
     thresh = cv2.adaptiveThreshold(
         gray, 255,
         cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
         cv2.THRESH_BINARY, 11, 2
     )
-    
+
     return thresh
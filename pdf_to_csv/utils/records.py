@@ -0,0 +1,185 @@
+from array import array
+from sys import intern
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# Champs montants, stockés en centimes
+AMOUNT_FIELDS = ('DEBIT', 'CREDIT')
+
+# Montant absent dans une colonne de centimes
+MISSING = -2 ** 63
+
+
+def _to_cents(value) -> Optional[int]:
+    """
+    Centimes d'un montant au format des parsers (``"1234.56"``).
+
+    None si le texte ne se reconstruit pas à l'identique depuis les centimes
+    (autre nombre de décimales, texte non numérique) : il est alors conservé tel quel.
+    """
+    if type(value) is not str or len(value) < 4 or value[-3] != '.':
+        return None
+    units, decimals = value[:-3], value[-2:]
+    if not decimals.isdigit():
+        return None
+    negative = units[0] == '-'
+    digits = units[1:] if negative else units
+    if not digits.isdigit() or (len(digits) > 1 and digits[0] == '0'):
+        return None
+    cents = int(digits) * 100 + int(decimals)
+    if negative and cents == 0:
+        return None  # « -0.00 » ne se reconstruit pas
+    return -cents if negative else cents
+
+
+def format_cents(cents: int) -> str:
+    """Montant au format des parsers (``123456`` -> ``"1234.56"``)"""
+    sign = '-' if cents < 0 else ''
+    units, decimals = divmod(abs(cents), 100)
+    return f"{sign}{units}.{decimals:02d}"
+
+
+class TransactionTable:
+    """
+    Transactions stockées par colonnes plutôt qu'en liste de dictionnaires.
+
+    Les montants sont des centimes dans des ``array('q')`` (8 octets par
+    transaction) ; les autres champs sont des listes de chaînes internées :
+    une date ou un libellé répété n'est stocké qu'une fois. La table se
+    parcourt comme la liste de dictionnaires qu'elle remplace (itération,
+    ``len``, indexation) et se convertit en DataFrame colonne par colonne,
+    sans dictionnaire intermédiaire par ligne.
+
+    Un champ absent d'une transaction vaut None.
+    """
+
+    __slots__ = ('fields', '_known', '_text', '_cents', '_raw', '_length')
+
+    def __init__(self, transactions: Iterable[Dict] = ()):
+        self.fields: List[str] = []
+        self._known = set()
+        self._text: Dict[str, List] = {}
+        self._cents: Dict[str, array] = {}
+        # Montants non reconstructibles depuis les centimes : (champ, ligne) -> texte
+        self._raw: Dict[Tuple[str, int], object] = {}
+        self._length = 0
+        self.extend(transactions)
+
+    def _add_field(self, field: str):
+        self.fields.append(field)
+        self._known.add(field)
+        if field in AMOUNT_FIELDS:
+            self._cents[field] = array('q', [MISSING]) * self._length
+        else:
+            self._text[field] = [None] * self._length
+
+    def append(self, transaction: Dict):
+        # Test d'inclusion des clés fait en C : les champs sont presque toujours connus
+        if not transaction.keys() <= self._known:
+            for field in transaction:
+                if field not in self._known:
+                    self._add_field(field)
+        get = transaction.get
+        for field, column in self._cents.items():
+            value = get(field)
+            if value is None:
+                column.append(MISSING)
+                continue
+            cents = _to_cents(value)
+            if cents is None:
+                cents = MISSING
+                self._raw[field, self._length] = value
+            column.append(cents)
+        for field, column in self._text.items():
+            value = get(field)
+            column.append(intern(value) if type(value) is str else value)
+        self._length += 1
+
+    def extend(self, transactions: Iterable[Dict]):
+        for transaction in transactions:
+            self.append(transaction)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def _value(self, field: str, row: int):
+        if field in self._cents:
+            cents = self._cents[field][row]
+            return self._raw.get((field, row)) if cents == MISSING else format_cents(cents)
+        return self._text[field][row]
+
+    def __getitem__(self, row: int) -> Dict:
+        if row < 0:
+            row += self._length
+        if not 0 <= row < self._length:
+            raise IndexError(row)
+        return {field: self._value(field, row) for field in self.fields}
+
+    def __iter__(self) -> Iterator[Dict]:
+        for row in range(self._length):
+            yield {field: self._value(field, row) for field in self.fields}
+
+    def to_dicts(self) -> List[Dict]:
+        """Liste de dictionnaires (cache disque JSON, compatibilité)"""
+        return list(self)
+
+    def column(self, field: str) -> List:
+        """Valeurs d'un champ au format des parsers (None si absent)"""
+        if field in self._cents:
+            return self.amount_strings(field)
+        if field in self._text:
+            return self._text[field]
+        return [None] * self._length
+
+    def amount_strings(self, field: str) -> List[Optional[str]]:
+        """Colonne montant au format texte des parsers"""
+        column = self._cents[field]
+        values = [None if cents == MISSING else format_cents(cents) for cents in column]
+        for row, value in self.raw_amounts(field).items():
+            values[row] = value
+        return values
+
+    def amount_cents(self, field: str) -> "np.ndarray":
+        """Centimes d'une colonne montant, ``MISSING`` si absent ou non reconstructible"""
+        import numpy as np
+
+        if field not in self._cents:
+            return np.full(self._length, MISSING, dtype=np.int64)
+        return np.frombuffer(self._cents[field], dtype=np.int64)
+
+    def raw_amounts(self, field: str) -> Dict[int, object]:
+        """Montants conservés tels quels, par numéro de ligne"""
+        return {row: value for (raw_field, row), value in self._raw.items() if raw_field == field}
+
+    def amount_values(self, field: str) -> "np.ndarray":
+        """
+        Colonne montant en euros (float), 0 si absent ou illisible.
+
+        Même résultat que ``pd.to_numeric(..., errors='coerce').fillna(0)`` sur
+        la colonne texte, sans re-parser les chaînes.
+        """
+        import numpy as np
+        import pandas as pd
+
+        cents = self.amount_cents(field)
+        values = np.where(cents == MISSING, 0, cents) / 100
+        for row, value in self.raw_amounts(field).items():
+            values[row] = pd.to_numeric(pd.Series([value]), errors='coerce').fillna(0).iloc[0]
+        return values
+
+    def to_dataframe(self) -> "pd.DataFrame":
+        """DataFrame construit colonne par colonne, dans l'ordre d'apparition des champs"""
+        import pandas as pd
+
+        data = {field: self.column(field) for field in self.fields}
+        return pd.DataFrame(data, columns=self.fields)
+
+
+def as_table(transactions: Iterable[Dict]) -> TransactionTable:
+    """Table des transactions (la même si c'en est déjà une)"""
+    if isinstance(transactions, TransactionTable):
+        return transactions
+    return TransactionTable(transactions)
@@ -6,9 +6,18 @@ setup(
     packages=find_packages(),
     install_requires=[
         'pdfplumber',
+        'pypdf',
+        'pypdfium2',
         'pandas',
+        'pyarrow',
+        'openpyxl',
         'streamlit',
         'python-dateutil'
     ],
+    entry_points={
+        'console_scripts': [
+            'pdf-to-csv=pdf_to_csv.cli:main',
+        ],
+    },
     python_requires='>=3.8',
 )
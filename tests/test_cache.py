@@ -0,0 +1,23 @@
+"""
+Deux écritures simultanées de la même entrée (threads d'un même processus)
+ne partagent pas leur fichier temporaire.
+"""
+import os
+import stat
+
+from pdf_to_csv.utils.cache_utils import FILE_MODE, TEXT_TIER, ConversionCache
+
+
+def test_concurrent_writers_use_distinct_temporary_files(tmp_path):
+    cache = ConversionCache(str(tmp_path))
+    first = cache.page_writer("0" * 64, "pdfplumber")
+    second = cache.page_writer("0" * 64, "pdfplumber")
+    assert first.tmp_path != second.tmp_path
+    assert stat.S_IMODE(os.stat(first.tmp_path).st_mode) == FILE_MODE
+
+    first.write("page A")
+    second.write("page B")
+    first.close()
+    second.close(commit=False)
+    assert cache.get_pages("0" * 64, "pdfplumber") == ["page A"]
+    assert os.listdir(tmp_path / TEXT_TIER) == [os.path.basename(first.path)]
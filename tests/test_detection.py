@@ -0,0 +1,29 @@
+"""
+Détection de la banque par signatures pondérées : la banque la mieux notée
+l'emporte, une égalité en tête est signalée.
+"""
+import pytest
+
+from pdf_to_csv.bank_parsers import AmbiguousBankError, detect_bank
+from pdf_to_csv.bank_parsers.detection import score_banks
+
+
+def test_weighted_signatures_pick_clear_winner():
+    # Relevé Crédit Mutuel citant un paiement « CIC » dans un libellé
+    text = ("Crédit Mutuel - Relevé de compte\n"
+            "www.creditmutuel.fr\n"
+            "05/02/2024 PAIEMENT CB CIC PARIS 12,00\n")
+    scores = score_banks(text)
+    assert scores["CREDIT_MUTUEL"] == 18
+    assert scores["CIC"] == 6
+    assert detect_bank(text) == "CREDIT_MUTUEL"
+
+
+def test_acronym_inside_word_is_ignored():
+    assert detect_bank("CICERON LCLX") is None
+
+
+def test_tie_raises_ambiguous_bank_error():
+    with pytest.raises(AmbiguousBankError) as error:
+        detect_bank("CREDIT LYONNAIS\nBNP PARIBAS\n")
+    assert error.value.scores["LCL"] == error.value.scores["BNP"] == 10
@@ -0,0 +1,109 @@
+"""
+Un PDF que le moteur d'extraction du parser ne sait pas ouvrir est relu avec
+un autre moteur installé avant d'être considéré comme scanné ; un relevé
+scanné sans OCR disponible est signalé comme tel.
+"""
+import pytest
+
+from pdf_to_csv.bank_parsers import PARSERS, OcrUnavailableError, _detect
+from pdf_to_csv.utils import backends, document as document_module
+from pdf_to_csv.utils.document import PdfDocument
+
+from test_parsers import PAGES, make_parser
+
+
+class BrokenBackend(backends.TextBackend):
+    """Moteur qui échoue à l'ouverture du PDF"""
+
+    def __init__(self, source):
+        raise ValueError("PDF mal formé")
+
+    @classmethod
+    def available(cls):
+        return True
+
+
+class PagesBackend(backends.TextBackend):
+    """Moteur qui lit les pages d'un relevé synthétique"""
+
+    pages = PAGES["LCL"]
+
+    def __init__(self, source):
+        pass
+
+    @classmethod
+    def available(cls):
+        return True
+
+    @property
+    def page_count(self):
+        return len(self.pages)
+
+    def _page_text(self, index):
+        return self.pages[index], False
+
+
+@pytest.fixture
+def broken_pdfplumber(monkeypatch):
+    monkeypatch.setitem(backends.BACKENDS, "pdfplumber", BrokenBackend)
+    monkeypatch.setitem(backends.BACKENDS, "pypdfium2", BrokenBackend)
+    monkeypatch.setitem(backends.BACKENDS, "pypdf", PagesBackend)
+
+
+def test_page_count_tries_other_backends(broken_pdfplumber):
+    document = PdfDocument(b"%PDF-1.4", disk_cache=None, backend="pdfplumber")
+    assert document.page_count == len(PAGES["LCL"])
+    assert document.backend == "pypdf"
+    assert document.page_texts() == PAGES["LCL"]
+
+
+@pytest.mark.parametrize("method", ["extract_transactions", "iter_transactions"])
+def test_parser_falls_back_on_failing_backend(broken_pdfplumber, method):
+    document = PdfDocument(b"%PDF-1.4", disk_cache=None, backend="pdfplumber")
+    parser = PARSERS["LCL"]("releve.pdf", document, layout=False)
+    expected = list(make_parser("LCL").extract_transactions())
+    assert expected
+    assert list(getattr(parser, method)()) == expected
+
+
+def test_use_backend_forgets_scanned_state(broken_pdfplumber):
+    # État laissé par un moteur qui ne lisait pas le PDF
+    document = PdfDocument(b"%PDF-1.4", disk_cache=None, backend="pdfplumber", ocr=False)
+    document._text_layer_available = False
+    document._page_count = 3
+    document.use_backend("pypdf")
+    assert document.page_count == len(PAGES["LCL"])
+    assert document.page_texts() == PAGES["LCL"]
+
+
+class ScannedBackend(PagesBackend):
+    """Moteur qui lit une page scannée : images, sans couche texte"""
+
+    pages = [""]
+
+    def _page_text(self, index):
+        return "", True
+
+
+def tesseract_missing(*args, **kwargs):
+    raise FileNotFoundError("tesseract is not installed")
+
+
+@pytest.mark.parametrize("backend", [ScannedBackend, BrokenBackend])
+def test_scanned_statement_without_ocr(monkeypatch, backend):
+    for name in backends.BACKENDS:
+        monkeypatch.setitem(backends.BACKENDS, name, backend)
+    monkeypatch.setattr(document_module, "ocr_page_region", tesseract_missing)
+    monkeypatch.setattr(document_module, "ocr_pages", tesseract_missing)
+    monkeypatch.setattr(document_module, "pdf_page_count", tesseract_missing)
+    document = PdfDocument(b"%PDF-1.4", disk_cache=None, backend="pdfplumber")
+    with pytest.raises(OcrUnavailableError, match="OCR"):
+        _detect(document)
+
+
+def test_unknown_text_statement_is_not_reported_as_scanned(monkeypatch):
+    monkeypatch.setitem(backends.BACKENDS, "pdfplumber", PagesBackend)
+    monkeypatch.setattr(PagesBackend, "pages", ["RELEVE DE COMPTE\n01/03/2024 CARTE 12,00\n"])
+    monkeypatch.setattr(document_module, "ocr_page_region", tesseract_missing)
+    document = PdfDocument(b"%PDF-1.4", disk_cache=None, backend="pdfplumber")
+    assert _detect(document) is None
@@ -0,0 +1,89 @@
+"""
+Normalisation des transactions en colonnes typées (dates, centimes) et
+exports Parquet / Excel qui en découlent.
+"""
+from datetime import date, datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from openpyxl import load_workbook
+
+from pdf_to_csv.utils.date_utils import parse_date, statement_period
+from pdf_to_csv.utils.export_utils import EXCEL_AMOUNT_FORMAT, EXCEL_DATE_FORMAT, ParquetStreamWriter, excel_bytes
+from pdf_to_csv.utils.normalize import amounts_to_cents, typed_dataframe
+
+# Relevé LCL à cheval sur deux années : dates d'opération sans année
+PERIOD = statement_period("RELEVE DE COMPTE du 15.12.2023 au 14.01.2024")
+
+TRANSACTIONS = [
+    {'DATE': "28.12", 'DATE_VALEUR': None, 'LIBELLE': "CARTE A", 'DEBIT': "1234.56", 'CREDIT': None},
+    {'DATE': "03.01", 'DATE_VALEUR': None, 'LIBELLE': "VIREMENT B", 'DEBIT': None, 'CREDIT': "2000.00"},
+    {'DATE': "31.12", 'DATE_VALEUR': "02.01.24", 'LIBELLE': "PRLV C", 'DEBIT': "15.10", 'CREDIT': None},
+    {'DATE': "date ?", 'DATE_VALEUR': None, 'LIBELLE': "", 'DEBIT': None, 'CREDIT': None},
+]
+
+
+def test_statement_period_spans_new_year():
+    assert PERIOD == (date(2023, 12, 15), date(2024, 1, 14))
+    assert parse_date("28.12", PERIOD) == datetime(2023, 12, 28)
+    assert parse_date("03.01", PERIOD) == datetime(2024, 1, 3)
+
+
+def test_yearless_dates_take_the_period_year():
+    typed = typed_dataframe(TRANSACTIONS, "LCL", PERIOD)
+    assert typed['DATE'].tolist()[:3] == [pd.Timestamp(2023, 12, 28), pd.Timestamp(2024, 1, 3),
+                                          pd.Timestamp(2023, 12, 31)]
+    assert pd.isna(typed['DATE'][3])
+    # Sans période, la date de valeur fixe l'année quand elle est connue
+    typed = typed_dataframe(TRANSACTIONS, "LCL")
+    assert typed['DATE'][2] == pd.Timestamp(2023, 12, 31)
+    assert pd.isna(typed['DATE'][0])
+
+
+def test_amounts_to_cents_formats():
+    values = pd.Series(["1.234,56", "1 234,56", "1234.56", "-12.5", "-1.234,50",
+                        "0.005", "+5", None, "", "abc"], dtype=object)
+    cents = amounts_to_cents(values)
+    assert str(cents.dtype) == "Int64"
+    assert cents.tolist()[:7] == [123456, 123456, 123456, -1250, -123450, 1, 500]
+    assert cents[7:].isna().all()
+
+
+def test_typed_amounts_in_cents():
+    typed = typed_dataframe(TRANSACTIONS, "LCL", PERIOD)
+    assert typed['DEBIT_CENTS'].tolist()[:3] == [123456, pd.NA, 1510]
+    assert typed['MONTANT_CENTS'].tolist() == [-123456, 200000, -1510, 0]
+    assert typed['BANQUE'].tolist() == ["LCL"] * 4
+
+
+def test_parquet_stream_writer(tmp_path):
+    path = str(tmp_path / "releve.parquet")
+    with ParquetStreamWriter(path, "LCL", batch_size=3, period=PERIOD) as writer:
+        written = list(writer.tee(TRANSACTIONS))
+    assert written == TRANSACTIONS
+    assert writer.count == len(TRANSACTIONS)
+
+    table = pq.read_table(path)
+    # Parquet relit les date64 en date32 : seul le type date compte
+    assert pa.types.is_date(table.schema.field('DATE').type)
+    assert table.schema.field('MONTANT_CENTS').type == pa.int64()
+    assert table.column('DATE').to_pylist()[:2] == [date(2023, 12, 28), date(2024, 1, 3)]
+    assert table.column('DEBIT_CENTS').to_pylist() == [123456, None, 1510, None]
+
+
+def test_excel_cells_are_typed(tmp_path):
+    path = tmp_path / "releve.xlsx"
+    path.write_bytes(excel_bytes(TRANSACTIONS, "LCL", period=PERIOD))
+    rows = list(load_workbook(path).active.iter_rows(min_row=2))
+
+    date_cell, debit_cell = rows[0][0], rows[0][3]
+    assert date_cell.value == datetime(2023, 12, 28)
+    assert date_cell.number_format == EXCEL_DATE_FORMAT
+    assert debit_cell.value == 1234.56
+    assert debit_cell.number_format == EXCEL_AMOUNT_FORMAT
+    assert rows[1][4].value == 2000.0
+    assert rows[2][5].value == -15.1
+    # Date illisible : texte d'origine, montants absents
+    assert rows[3][0].value == "date ?"
+    assert rows[3][3].value is None
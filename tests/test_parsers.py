@@ -0,0 +1,175 @@
+"""
+Le parsing au fil des pages (``iter_transactions``) doit produire les mêmes
+transactions que le parsing du texte complet (``extract_transactions``),
+y compris quand une transaction est coupée par un saut de page.
+"""
+import pytest
+
+from pdf_to_csv.bank_parsers import PARSERS
+from pdf_to_csv.utils.cache_utils import ConversionCache
+
+# Relevés synthétiques, une chaîne par page : chaque page s'arrête au milieu
+# d'une transaction (suite du libellé ou montant sur la page suivante)
+PAGES = {
+    "SOCIETE_GENERALE": [
+        "SOCIETE GENERALE\n"
+        "Date Valeur Nature de l'opération Débit Crédit\n"
+        "01/03/2024 01/03/2024 CARTE X1 MAGASIN 12,50\n"
+        "DETAIL LIGNE 1\n"
+        "02/03/2024 02/03/2024 VIR RECU NUMERO 2 1.234,00\n",
+        "Date Valeur Nature de l'opération Débit Crédit\n"
+        "DETAIL LIGNE 2\n"
+        "03/03/2024 03/03/2024 CARTE X3 MAGASIN 8,10\n"
+        "DETAIL LIGNE 3\n",
+    ],
+    "CIC": [
+        "CIC\n"
+        "Date Date valeur Opération Débit Crédit\n"
+        "01/02/2024 01/02/2024 PAIEMENT CB A 12,00\n"
+        "02/02/2024 02/02/2024 VIR SEPA B\n",
+        "Date Date valeur Opération Débit Crédit\n"
+        "1.500,00\n"
+        "03/02/2024 03/02/2024 PRLV SEPA C 30,00\n",
+    ],
+    # Relevé Crédit Mutuel au format lu par CicParser
+    "CIC_CM": [
+        "CREDIT MUTUEL\n"
+        "Date Date valeur Opération Débit EUROS Crédit EUROS\n"
+        "01/02/2024 01/02/2024 PAIEMENT CB A 12,00\n"
+        "02/02/2024 02/02/2024 VIR SEPA B 1.500,00\n"
+        "03/02/2024 03/02/2024 PAIEMENT CB C\n",
+        "Date Date valeur Opération Débit EUROS Crédit EUROS\n"
+        "45,00\n"
+        "04/02/2024 04/02/2024 PRLV SEPA D 30,00\n"
+        "05/02/2024 05/02/2024 PAIEMENT CB E 7,20\n",
+    ],
+    "CREDIT_MUTUEL": [
+        "CREDIT MUTUEL\n"
+        "Date Date valeur Opération Débit Crédit\n"
+        "01/02/2024 01/02/2024 PAIEMENT CB A 12,00\n"
+        "02/02/2024 02/02/2024 VIR SEPA B 1 500,00\n"
+        "03/02/2024 03/02/2024 PAIEMENT CB C 45,00\n",
+        "ICS : FR00 RUM : 123\n"
+        "04/02/2024 04/02/2024 PRLV SEPA D 30,00\n",
+    ],
+    "LCL": [
+        "LCL CREDIT LYONNAIS\n"
+        "ECRITURES DE LA PERIODE\n"
+        "01.03 PAIEMENT 1 01.03.24 1,50\n"
+        "02.03 VIREMENT 2 02.03.24 200,00 .\n",
+        "LIBELLE: SALAIRE\n"
+        "03.03 PAIEMENT 3 03.03.24 3,50\n",
+    ],
+    "BNP": [
+        "BNP PARIBAS\n"
+        "VIREMENTS RECUS\n"
+        "01.03.24 VIR SEPA RECU 1 01.03.24 1 213,45\n"
+        "REF 1\n"
+        "02.03.24 VIR SEPA RECU 2 02.03.24 223,45\n",
+        "REF 2\n"
+        "Sous total...\n"
+        "PAIEMENTS PAR CARTES\n"
+        "03.03.24 DU 030324 MAGASIN 03.03.24 33,45\n"
+        "REF 3\n",
+    ],
+}
+
+
+class FakeDocument:
+    """Document déjà extrait : pages texte (ou mots positionnés) sans PDF ni cache disque"""
+
+    backend = "pdfplumber"
+    disk_cache = None
+
+    def __init__(self, pages, rows=None):
+        self.pages = pages
+        self.rows = rows
+
+    def use_backend(self, name):
+        pass
+
+    def iter_page_texts(self, cache=True):
+        return iter(self.pages)
+
+    def full_text(self):
+        return "\n".join(self.pages)
+
+    def iter_page_rows(self):
+        return enumerate(self.rows)
+
+    def close(self):
+        pass
+
+
+# Relevés lus par le parser d'une autre banque
+PARSER_OF = {"CIC_CM": "CIC"}
+
+
+def make_parser(case):
+    parser_class = PARSERS[PARSER_OF.get(case, case)]
+    return parser_class("releve.pdf", FakeDocument(PAGES[case]), layout=False)
+
+
+@pytest.mark.parametrize("case", sorted(PAGES))
+def test_iter_transactions_matches_extract(case):
+    extracted = list(make_parser(case).extract_transactions())
+    streamed = list(make_parser(case).iter_transactions())
+    assert extracted
+    assert streamed == extracted
+
+
+def words(top, *cells):
+    """Ligne de mots positionnés, une cellule ``(x0, texte)`` par colonne occupée"""
+    row = []
+    for x0, text in cells:
+        for token in text.split():
+            x1 = x0 + 5 * len(token)
+            row.append({'text': token, 'x0': x0, 'x1': x1, 'top': top, 'bottom': top + 10})
+            x0 = x1 + 3
+    return row
+
+
+CIC_HEADER = words(100, (20, "Date"), (80, "Date valeur"), (160, "Opération"),
+                   (400, "Débit"), (480, "Crédit"))
+
+# Relevé CIC en mode colonnes : le sens du montant découle de sa colonne
+CIC_ROWS = [
+    [
+        words(40, (20, "CIC"), (300, "Relevé de compte")),
+        CIC_HEADER,
+        words(120, (20, "01/02/2024"), (80, "01/02/2024"), (160, "PAIEMENT CB A"), (400, "12,00")),
+        words(132, (160, "SUITE LIBELLE")),
+        words(144, (20, "02/02/2024"), (80, "02/02/2024"), (160, "VIR SEPA B"), (480, "1.500,00")),
+    ],
+    [
+        CIC_HEADER,
+        words(120, (160, "ICS : FR00 RUM : 123 FIN B")),
+        words(132, (20, "03/02/2024"), (80, "04/02/2024"), (160, "PRLV SEPA C"), (400, "30,00")),
+    ],
+]
+
+
+@pytest.mark.parametrize("method", ["extract_transactions", "iter_transactions"])
+def test_layout_mode_reads_columns(method):
+    parser = PARSERS["CIC"]("releve.pdf", FakeDocument([], CIC_ROWS), layout=True)
+    assert list(getattr(parser, method)()) == [
+        {'DATE': "01/02/2024", 'DATE_VALEUR': "01/02/2024", 'LIBELLE': "PAIEMENT CB A SUITE LIBELLE",
+         'DEBIT': "12.00", 'CREDIT': None},
+        {'DATE': "02/02/2024", 'DATE_VALEUR': "02/02/2024", 'LIBELLE': "VIR SEPA B FIN B",
+         'DEBIT': None, 'CREDIT': "1500.00"},
+        {'DATE': "03/02/2024", 'DATE_VALEUR': "04/02/2024", 'LIBELLE': "PRLV SEPA C",
+         'DEBIT': "30.00", 'CREDIT': None},
+    ]
+
+
+def test_iter_transactions_fills_cache(tmp_path):
+    parser = make_parser("BNP")
+    parser.document.disk_cache = ConversionCache(str(tmp_path))
+    parser.document.sha256 = "0" * 64
+    streamed = list(parser.iter_transactions())
+    assert parser.document.disk_cache.get_transactions(*parser._cache_key()) == streamed
+    assert not list(tmp_path.rglob("*.tmp"))
+
+
+def test_every_parser_is_covered():
+    assert set(PARSERS) <= set(PAGES)
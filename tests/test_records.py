@@ -0,0 +1,48 @@
+"""
+La table compacte des transactions restitue exactement les dictionnaires des
+parsers, montants compris (centimes, ou texte d'origine s'il ne s'y ramène pas).
+"""
+import pytest
+
+from pdf_to_csv.utils.records import MISSING, TransactionTable, _to_cents, format_cents
+
+TRANSACTIONS = [
+    {'DATE': "01/03/2024", 'LIBELLE': "CARTE A", 'DEBIT': "1234.56", 'CREDIT': None},
+    {'DATE': "02/03/2024", 'LIBELLE': "VIREMENT B", 'DEBIT': None, 'CREDIT': "0.05"},
+    {'DATE': "03/03/2024", 'LIBELLE': "AVOIR C", 'DEBIT': "-12.30", 'CREDIT': None},
+    # Montants non reconstructibles depuis les centimes : gardés tels quels
+    {'DATE': "04/03/2024", 'LIBELLE': "D", 'DEBIT': "12,5", 'CREDIT': "-0.00"},
+    {'DATE': "05/03/2024", 'LIBELLE': "E", 'DEBIT': "007.00", 'CREDIT': 3.5},
+    # Champ apparu en cours de route : absent (None) pour les lignes précédentes
+    {'DATE': "06/03/2024", 'LIBELLE': "F", 'DEBIT': "10.00", 'CREDIT': None, 'SECTION': "CARTES"},
+]
+
+
+def test_to_dicts_round_trip():
+    table = TransactionTable(TRANSACTIONS)
+    expected = [dict({'SECTION': None}, **t) for t in TRANSACTIONS]
+    assert len(table) == len(TRANSACTIONS)
+    assert table.fields == ['DATE', 'LIBELLE', 'DEBIT', 'CREDIT', 'SECTION']
+    assert table.to_dicts() == expected
+    assert table[-1] == expected[-1]
+    assert TransactionTable(table.to_dicts()).to_dicts() == expected
+
+
+def test_amounts_stored_in_cents():
+    table = TransactionTable(TRANSACTIONS)
+    assert table.amount_cents('DEBIT').tolist() == [123456, MISSING, -1230, MISSING, MISSING, 1000]
+    assert table.amount_cents('CREDIT').tolist() == [MISSING, 5, MISSING, MISSING, MISSING, MISSING]
+    assert table.raw_amounts('DEBIT') == {3: "12,5", 4: "007.00"}
+    assert table.raw_amounts('CREDIT') == {3: "-0.00", 4: 3.5}
+    assert table.amount_values('CREDIT').tolist() == [0.0, 0.05, 0.0, 0.0, 3.5, 0.0]
+
+
+@pytest.mark.parametrize("text, cents", [
+    ("0.00", 0), ("0.05", 5), ("1234.56", 123456), ("-1234.56", -123456),
+    ("1234.5", None), ("1,234.56", None), ("+1.00", None), ("01.00", None),
+    ("-0.00", None), (".50", None), ("-.50", None), ("1.2a", None), (None, None),
+])
+def test_to_cents_only_when_text_is_rebuilt(text, cents):
+    assert _to_cents(text) == cents
+    if cents is not None:
+        assert format_cents(cents) == text